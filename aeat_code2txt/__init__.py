@@ -1,30 +1,84 @@
 """AEAT report rendering from XLSX/CSV layout definitions."""
+from __future__ import annotations
 
-from .parser import parse_layout_directory, parse_layout_file
-from .layout_loader import load_layout, load_layout_json
-from .reverse import parse_report, validate_report
-from .renderer import (
-    PostRecordHook,
-    PreRecordHook,
-    RenderContext,
-    ValueHook,
-    render_record,
-    render_report,
-    validate_data,
-)
-
-__all__ = [
-    "parse_layout_directory",
-    "parse_layout_file",
-    "load_layout_json",
-    "load_layout",
-    "parse_report",
-    "validate_report",
-    "PostRecordHook",
-    "PreRecordHook",
-    "RenderContext",
-    "ValueHook",
-    "render_record",
-    "render_report",
-    "validate_data",
-]
+from typing import TYPE_CHECKING, Any
+
+# Public names and the submodule defining them. They are imported on first
+# access, so e.g. ``from aeat_code2txt import render_report`` loads neither the
+# CSV parser nor the process pool machinery.
+_EXPORTS = {
+    "iter_reports": "archive",
+    "CompiledRecord": "compiler",
+    "CompiledReport": "compiler",
+    "compile_record": "compiler",
+    "compile_report": "compiler",
+    "ParallelRenderer": "parallel",
+    "parse_layout_directory": "parser",
+    "parse_layout_file": "parser",
+    "Instrumentation": "instrumentation",
+    "load_layout_json": "layout_loader",
+    "load_layout": "layout_loader",
+    "iter_issues": "reverse",
+    "parse_report": "reverse",
+    "parse_report_bytes": "reverse",
+    "validate_report": "reverse",
+    "RenderSession": "session",
+    "RenderService": "service",
+    "PayloadGenerator": "synthetic",
+    "FieldHook": "renderer",
+    "field_hook": "renderer",
+    "PostRecordHook": "renderer",
+    "PreRecordHook": "renderer",
+    "RenderContext": "renderer",
+    "RenderResult": "renderer",
+    "ValueHook": "renderer",
+    "render_many": "renderer",
+    "render_record": "renderer",
+    "render_report": "renderer",
+    "render_report_bytes": "renderer",
+    "render_to_stream": "renderer",
+    "validate_data": "renderer",
+}
+
+__all__ = list(_EXPORTS)
+
+if TYPE_CHECKING:
+    from .archive import iter_reports
+    from .compiler import CompiledRecord, CompiledReport, compile_record, compile_report
+    from .instrumentation import Instrumentation
+    from .layout_loader import load_layout, load_layout_json
+    from .parallel import ParallelRenderer
+    from .parser import parse_layout_directory, parse_layout_file
+    from .renderer import (
+        FieldHook,
+        PostRecordHook,
+        PreRecordHook,
+        RenderContext,
+        RenderResult,
+        ValueHook,
+        field_hook,
+        render_many,
+        render_record,
+        render_report,
+        render_report_bytes,
+        render_to_stream,
+        validate_data,
+    )
+    from .reverse import iter_issues, parse_report, parse_report_bytes, validate_report
+    from .service import RenderService
+    from .session import RenderSession
+    from .synthetic import PayloadGenerator
+
+
+def __getattr__(name: str) -> Any:
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    # Plain relative __import__ (unlike importlib) shows up in -X importtime.
+    value = getattr(__import__(module, globals(), None, [name], 1), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted(set(globals()) | set(__all__))
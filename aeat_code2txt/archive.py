@@ -0,0 +1,146 @@
+"""Scanning files that hold many concatenated declarations."""
+from __future__ import annotations
+
+import mmap
+import os
+from pathlib import Path
+from typing import Any, Iterable, Iterator
+
+from .layout import RecordLayout, ReportLayout
+from .reverse import Buffer, parse_report_bytes
+
+
+def declaration_marker(report: ReportLayout, encoding: str = "iso-8859-1") -> bytes:
+    """
+    Return the constant prefix every declaration of ``report`` starts with,
+    e.g. ``b"<T3030"`` for model 303: the run of constant fields at the start
+    of the first record.
+    """
+    marker = _leading_constant(report.records[0] if report.records else None, encoding)
+    if not marker.strip():
+        raise ValueError(f"Layout {report.name} has no constant declaration header")
+    return marker
+
+
+def detect_model(
+    buffer: Buffer,
+    models: Iterable[str] | None = None,
+    encoding: str = "iso-8859-1",
+) -> str | None:
+    """
+    Return the bundled model whose declaration marker starts ``buffer``, or
+    ``None`` when no model matches. ``models`` restricts the candidates
+    (default: every bundled layout); the longest matching marker wins.
+    """
+    from .layout_loader import bundled_models, load_layout
+
+    best = None
+    best_length = 0
+    for model in models or bundled_models():
+        try:
+            marker = declaration_marker(load_layout(model), encoding)
+        except ValueError:
+            continue
+        if len(marker) > best_length and buffer[: len(marker)] == marker:
+            best, best_length = model, len(marker)
+    return best
+
+
+def iter_declaration_offsets(
+    buffer: Buffer,
+    report: ReportLayout,
+    start: int = 0,
+    end: int | None = None,
+    encoding: str = "iso-8859-1",
+) -> Iterator[int]:
+    """
+    Yield the offsets of declarations whose header starts in ``[start, end)``.
+
+    A header only counts at the start of a line, and not where the line
+    carries the (longer) constant header of another record of the layout:
+    ``<T30301000>`` also starts with the 303 declaration marker ``<T3030``.
+    """
+    marker = declaration_marker(report, encoding)
+    others = tuple(
+        prefix
+        for prefix in (_leading_constant(record, encoding) for record in report.records[1:])
+        if len(prefix) > len(marker) and prefix.startswith(marker)
+    )
+    end = len(buffer) if end is None else end
+    pos = start
+    while True:
+        pos = buffer.find(marker, pos)
+        if pos < 0 or pos >= end:
+            return
+        if (pos == 0 or buffer[pos - 1] in b"\r\n") and not any(
+            buffer[pos : pos + len(prefix)] == prefix for prefix in others
+        ):
+            yield pos
+        pos += 1
+
+
+def iter_reports(
+    path: Path | str,
+    report: ReportLayout,
+    *,
+    fields: Iterable[str] | None = None,
+    typed: bool = False,
+    encoding: str = "iso-8859-1",
+    start: int = 0,
+    end: int | None = None,
+) -> Iterator[dict[str, Any]]:
+    """
+    Lazily parse every declaration of a multi-declaration TXT file.
+
+    The file is memory-mapped and declarations are delimited by the layout's
+    constant header (see ``declaration_marker``), so memory use does not
+    depend on the file size. Only declarations whose header starts in the
+    byte range ``[start, end)`` are yielded, which lets ``shard_ranges`` split
+    a file across processes without overlap. ``fields``, ``typed`` and
+    ``encoding`` are passed to ``parse_report_bytes``.
+    """
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            offsets = iter_declaration_offsets(mm, report, start, end, encoding)
+            offset = next(offsets, None)
+            while offset is not None:
+                following = next(offsets, None)
+                limit = following
+                if limit is None:
+                    # The declaration may run past ``end`` into the next shard.
+                    tail = iter_declaration_offsets(mm, report, offset + 1, None, encoding)
+                    limit = next(tail, None)
+                yield parse_report_bytes(
+                    mm,
+                    report,
+                    fields=fields,
+                    encoding=encoding,
+                    typed=typed,
+                    start=offset,
+                    end=limit,
+                )
+                offset = following
+
+
+def shard_ranges(path: Path | str, shards: int) -> list[tuple[int, int]]:
+    """
+    Split a file into ``shards`` contiguous byte ranges for ``iter_reports``.
+    """
+    if shards < 1:
+        raise ValueError("shards must be >= 1")
+    size = os.path.getsize(path)
+    bounds = [size * i // shards for i in range(shards + 1)]
+    return [(bounds[i], bounds[i + 1]) for i in range(shards)]
+
+
+def _leading_constant(record: RecordLayout | None, encoding: str) -> bytes:
+    prefix = ""
+    cursor = 1
+    for field in sorted(record.fields if record else (), key=lambda f: f.position):
+        if field.position != cursor or field.const_value is None:
+            break
+        prefix += field.const_value.ljust(field.length)
+        cursor += field.length
+    return prefix.encode(encoding)
@@ -0,0 +1,219 @@
+"""
+Columnar reading of fixed-width declaration files.
+
+Requires ``numpy``; ``pyarrow`` is only needed for ``as_arrow=True``.
+"""
+from __future__ import annotations
+
+import mmap
+import os
+from pathlib import Path
+from typing import Any, Iterable, NamedTuple
+
+from .archive import declaration_marker, iter_declaration_offsets
+from .compiler import compile_report
+from .layout import ReportLayout
+from .reverse import _projection
+
+# Integer columns are int64; 18 digits is the widest field that always fits.
+MAX_NUMERIC_DIGITS = 18
+
+
+class Column(NamedTuple):
+    key: str
+    offset: int
+    length: int
+    numeric: bool
+    decimals: int
+
+
+def read_columns(
+    source: Path | str | bytes,
+    report: ReportLayout,
+    *,
+    fields: Iterable[str] | None = None,
+    encoding: str = "iso-8859-1",
+    as_arrow: bool = False,
+) -> Any:
+    """
+    Read every declaration of a file (or bytes) into one array per field.
+
+    Each field is sliced out of all declarations in one vectorized step.
+    Numeric fields become ``int64`` arrays holding the amount scaled by
+    ``10 ** field.decimals`` (e.g. cents), negative for the ``N`` sign
+    prefix; other fields become unicode string arrays, stripped as in
+    ``parse_report``. ``fields`` selects codes/keys as in
+    ``parse_report_bytes``.
+
+    Returns a dict of numpy arrays, or a ``pyarrow.Table`` with ``as_arrow``
+    (numeric columns carry their ``decimals`` in the field metadata).
+
+    Declarations are located by their constant header and their records must
+    have the full layout length; otherwise ``ValueError`` is raised and
+    ``iter_reports`` should be used instead.
+    """
+    np = _numpy()
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        data = np.frombuffer(source, dtype=np.uint8)
+    elif os.path.getsize(source):
+        data = np.memmap(source, dtype=np.uint8, mode="r")
+    else:
+        data = np.zeros(0, dtype=np.uint8)
+    newline = _newline_width(data)
+    columns, row_ends, block = _column_plan(report, _projection(fields), newline)
+    starts, uniform = _declaration_starts(np, data, source, report, encoding, block, newline)
+    size = len(data)
+    for end in row_ends:
+        pos = starts + end
+        ok = pos == size
+        inside = pos < size
+        ok[inside] = np.isin(data[pos[inside]], (10, 13))
+        if not ok.all():
+            raise ValueError("Records do not have their layout length; use iter_reports")
+
+    rows = None
+    if uniform:
+        # Declarations are evenly spaced: view the file as a (declarations,
+        # block) matrix so each column is a plain strided slice.
+        rows = np.lib.stride_tricks.as_strided(
+            data, shape=(len(starts), block - newline), strides=(block, 1), writeable=False
+        )
+    out: dict[str, Any] = {}
+    for column in columns:
+        if rows is not None:
+            cells = rows[:, column.offset : column.offset + column.length]
+        else:
+            cells = data[starts[:, None] + (column.offset + np.arange(column.length))]
+        if column.numeric:
+            out[column.key] = _to_integers(np, cells, column)
+        else:
+            out[column.key] = _to_text(np, cells, column, encoding)
+    if as_arrow:
+        return _to_arrow(out, columns)
+    return out
+
+
+def _newline_width(data) -> int:
+    # Rendered files use CRLF; LF-only files are accepted too.
+    for byte in data[:4096].tobytes():
+        if byte in (10, 13):
+            return 2 if byte == 13 else 1
+    return 2
+
+
+def _column_plan(
+    report: ReportLayout, fields: frozenset[str] | None, newline: int
+) -> tuple[list[Column], list[int], int]:
+    compiled = compile_report(report)
+    cache_key = ("columns", fields, newline)
+    plan = compiled.cache.get(cache_key)
+    if plan is not None:
+        return plan
+    columns: dict[str, Column] = {}
+    row_ends: list[int] = []
+    found: set[str] = set()
+    base = 0
+    for record in compiled.records:
+        for field in record.fields:
+            key = field.code or field.key
+            if field.const_value is not None or not key:
+                continue
+            if fields is not None:
+                if key not in fields and field.key not in fields:
+                    continue
+                found.add(key if key in fields else field.key)
+            # Numeric-typed fields too wide for int64 (reserved areas) stay text.
+            numeric = (
+                field.raw_type.strip().startswith(("N", "Num"))
+                and field.length <= MAX_NUMERIC_DIGITS
+            )
+            # Later fields win on duplicate keys, as in parse_report.
+            columns.pop(key, None)
+            columns[key] = Column(
+                key=key,
+                offset=base + field.position - 1,
+                length=field.length,
+                numeric=numeric,
+                decimals=field.decimals or 0,
+            )
+        row_ends.append(base + record.length)
+        base += record.length + newline
+    if fields is not None and found != fields:
+        raise KeyError(f"Unknown fields: {sorted(fields - found)}")
+    plan = compiled.cache[cache_key] = (list(columns.values()), row_ends, base)
+    return plan
+
+
+def _declaration_starts(np, data, source, report, encoding, block, newline):
+    marker = np.frombuffer(declaration_marker(report, encoding), dtype=np.uint8)
+    size = len(data)
+    # The last declaration may lack its trailing line break.
+    if block and size and size % block in (0, block - newline):
+        # Uniform file: declarations start at every multiple of the block size.
+        starts = np.arange(0, size, block, dtype=np.int64)
+        if size - starts[-1] >= len(marker):
+            heads = data[starts[:, None] + np.arange(len(marker))]
+            if np.all(heads == marker):
+                return starts, True
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        offsets = iter_declaration_offsets(bytes(source), report, encoding=encoding)
+        return np.fromiter(offsets, np.int64), False
+    if not size:
+        # mmap cannot map an empty file; it holds no declarations either.
+        return np.zeros(0, dtype=np.int64), False
+    with open(source, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        offsets = iter_declaration_offsets(mm, report, encoding=encoding)
+        return np.fromiter(offsets, np.int64), False
+
+
+def _to_integers(np, block, column: Column):
+    negative = block[:, 0] == ord("N")
+    digits = block.astype(np.int64) - ord("0")
+    digits[:, 0][negative] = 0
+    blank = block == ord(" ")
+    digits[blank] = 0
+    if np.any((digits < 0) | (digits > 9)):
+        row = int(np.argmax(np.any((digits < 0) | (digits > 9), axis=1)))
+        raise ValueError(f"Invalid number in field {column.key} of declaration {row}")
+    powers = 10 ** np.arange(column.length - 1, -1, -1, dtype=np.int64)
+    values = digits @ powers
+    values[negative] *= -1
+    return values
+
+
+def _to_text(np, cells, column: Column, encoding: str):
+    # Trailing blanks become NULs, which numpy unicode arrays drop.
+    trailing = np.logical_and.accumulate((cells == ord(" "))[:, ::-1], axis=1)[:, ::-1]
+    cells = np.where(trailing, 0, cells)
+    if encoding.lower().replace("_", "-") in ("iso-8859-1", "latin-1", "latin1"):
+        # Latin-1 bytes are their own code points: widen and view as UCS-4.
+        text = cells.astype(np.uint32).view(f"U{column.length}").ravel()
+    else:
+        raw = np.ascontiguousarray(cells).view(f"S{column.length}").ravel()
+        text = np.char.decode(raw, encoding)
+    if np.any(cells[:, 0] == ord(" ")):
+        text = np.char.lstrip(text)
+    return text
+
+
+def _to_arrow(out: dict[str, Any], columns: list[Column]):
+    try:
+        import pyarrow as pa
+    except ImportError as exc:
+        raise ImportError("as_arrow=True requires pyarrow") from exc
+    arrow_fields = []
+    arrays = []
+    for column in columns:
+        metadata = {"decimals": str(column.decimals)} if column.numeric else None
+        array = pa.array(out[column.key])
+        arrow_fields.append(pa.field(column.key, array.type, metadata=metadata))
+        arrays.append(array)
+    return pa.Table.from_arrays(arrays, schema=pa.schema(arrow_fields))
+
+
+def _numpy():
+    try:
+        import numpy
+    except ImportError as exc:
+        raise ImportError("aeat_code2txt.columnar requires numpy") from exc
+    return numpy
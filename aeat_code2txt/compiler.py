@@ -0,0 +1,622 @@
+"""Precompiled render plans for record and report layouts."""
+from __future__ import annotations
+
+import weakref
+from decimal import Decimal
+from typing import Any, Callable, Hashable, Mapping, NamedTuple, Sequence
+
+from .formulas import FormulaGraph, build_formula_graph
+from .layout import Field, RecordLayout, ReportLayout
+
+
+class Slot(NamedTuple):
+    """A variable field of a compiled record and where it lands in the output."""
+
+    index: int
+    field: Field
+    code: str | None
+    key: str | None
+    length: int
+    numeric: bool
+    decimals: int
+    signed: bool
+    spec: str
+    blank: str | None
+
+
+class ReportImage(NamedTuple):
+    """
+    A report's declaration with every field blank, encoded once, plus where
+    each variable field lands in it.
+    """
+
+    blank: bytes
+    # Slots by the code/key they read, as (byte offset, slot).
+    slots: dict[str, tuple[tuple[int, Slot], ...]]
+    # Slots without a blank form, formatted on every render.
+    eager: tuple[tuple[int, Slot], ...]
+    encoding: str
+
+
+class HookTable(NamedTuple):
+    """``value_hooks`` resolved against the fields of one record."""
+
+    # Hooks to run per field, in ``CompiledRecord.fields`` order.
+    fields: tuple[tuple[Callable, ...], ...]
+    # (slot, hooks) for the slot fast path, or None when it cannot be used
+    # (untiled record, or hooks on constant fields).
+    slots: tuple[tuple[Slot, tuple[Callable, ...]], ...] | None
+    # Whether any field has a hook at all.
+    active: bool
+
+
+class CompiledRecord:
+    """
+    Render plan for a single record layout.
+
+    Constant fields and padding are baked into ``pieces`` once; rendering only
+    fills the variable ``slots`` and joins the pieces.
+    """
+
+    def __init__(self, record: RecordLayout) -> None:
+        self.name = record.name
+        self.fields: tuple[Field, ...] = tuple(record.fields)
+        self.length = record.length()
+        self.const_keys = frozenset(
+            key
+            for field in self.fields
+            if field.const_value is not None
+            for key in (field.key, field.code)
+            if key
+        )
+        self.known_keys = record.known_keys
+        self.formulas: FormulaGraph = build_formula_graph([record])
+        self.tiled = _is_tiled(self.fields)
+        pieces: list[str] = []
+        slots: list[Slot] = []
+        if self.tiled:
+            cursor = 1
+            pending = ""
+            for field in sorted(self.fields, key=lambda f: f.position):
+                if field.position > cursor:
+                    pending += " " * (field.position - cursor)
+                cursor = field.position + field.length
+                if field.const_value is not None:
+                    pending += _format_text(field.const_value, field.length)
+                    continue
+                if pending:
+                    pieces.append(pending)
+                    pending = ""
+                slots.append(_make_slot(len(pieces), field))
+                pieces.append("")
+            if pending:
+                pieces.append(pending)
+        self.pieces: tuple[str, ...] = tuple(pieces)
+        self.slots: tuple[Slot, ...] = tuple(slots)
+        self._hook_tables: dict[tuple, HookTable] = {}
+
+    @property
+    def template(self) -> str:
+        """The record text with constants in place and variable fields empty."""
+        return "".join(self.pieces)
+
+    def render(
+        self,
+        amounts: Mapping[str, Decimal],
+        values: Mapping[str, str],
+        overrides: Mapping[str, str],
+        computed: Mapping[str, Decimal],
+        value_hooks: Sequence[Callable] | None = None,
+        context: object | None = None,
+    ) -> str:
+        const_override = overrides and not self.const_keys.isdisjoint(overrides)
+        table = self.hook_table(value_hooks) if value_hooks else None
+        if table is not None and table.active:
+            if table.slots is None or const_override:
+                return self._render_fields(
+                    amounts, values, overrides, computed, table.fields, context
+                )
+            return self._render_hooked(amounts, values, overrides, computed, table.slots, context)
+        if const_override or not self.tiled:
+            return self._render_fields(amounts, values, overrides, computed, None, context)
+        out = list(self.pieces)
+        for slot in self.slots:
+            value = _resolve_slot(slot, amounts, values, overrides, computed)
+            if slot.numeric:
+                if value or slot.blank is None:
+                    out[slot.index] = _format_amount(slot, value)
+                else:
+                    out[slot.index] = slot.blank
+            elif value is None:
+                out[slot.index] = slot.blank
+            else:
+                out[slot.index] = _format_text(str(value), slot.length)
+        return "".join(out)
+
+    def hook_table(self, value_hooks: Sequence[Callable]) -> HookTable:
+        """
+        Resolve ``value_hooks`` against this record's fields, once per hook list.
+
+        Plain callables run on every field. Hooks with a
+        ``matches(record_name, field)`` method (``renderer.FieldHook``) have
+        their ``hook`` run only on the fields they match, so the other fields
+        keep the fast path.
+        """
+        key = tuple(value_hooks)
+        try:
+            table = self._hook_tables.get(key)
+        except TypeError:  # unhashable hook objects
+            return _build_hook_table(self, key)
+        if table is None:
+            if len(self._hook_tables) >= 32:
+                self._hook_tables.clear()
+            table = self._hook_tables[key] = _build_hook_table(self, key)
+        return table
+
+    def render_slot(
+        self,
+        slot: Slot,
+        amounts: Mapping[str, Decimal],
+        values: Mapping[str, str],
+        overrides: Mapping[str, str],
+        computed: Mapping[str, Decimal],
+    ) -> str:
+        """
+        Text of a single slot, as ``render`` would produce it (same conditions
+        as its fast path: tiled record, no hooks, no constant overrides).
+        """
+        value = _resolve_slot(slot, amounts, values, overrides, computed)
+        if slot.numeric:
+            if value or slot.blank is None:
+                return _format_amount(slot, value)
+            return slot.blank
+        if value is None:
+            return slot.blank
+        return _format_text(str(value), slot.length)
+
+    def render_scaled(
+        self,
+        amounts: Mapping[str, int],
+        values: Mapping[str, str],
+        overrides: Mapping[str, str],
+        computed: Mapping[str, int],
+        scale: int,
+    ) -> str:
+        """
+        Fixed-point variant of ``render``: integer amounts are scaled by
+        ``10 ** scale`` (see ``CompiledReport.scale``) and formatted without
+        going through ``Decimal``. Only valid for tiled records without
+        constant overrides or hooks.
+        """
+        out = list(self.pieces)
+        for slot in self.slots:
+            value = _resolve_slot(slot, amounts, values, overrides, computed)
+            if slot.numeric:
+                if type(value) is int:
+                    if value > 0 and slot.decimals == scale:
+                        # Common case inline: positive amount at the carried scale.
+                        text = str(value)
+                        if scale < len(text) <= slot.length:
+                            out[slot.index] = text.rjust(slot.length, "0")
+                            continue
+                    if value or slot.blank is None:
+                        out[slot.index] = _format_scaled(slot, value, scale)
+                    else:
+                        out[slot.index] = slot.blank
+                elif value or slot.blank is None:
+                    out[slot.index] = _format_amount(slot, value)
+                else:
+                    out[slot.index] = slot.blank
+            elif value is None:
+                out[slot.index] = slot.blank
+            else:
+                out[slot.index] = _format_text(str(value), slot.length)
+        return "".join(out)
+
+    def _render_hooked(
+        self,
+        amounts: Mapping[str, Decimal],
+        values: Mapping[str, str],
+        overrides: Mapping[str, str],
+        computed: Mapping[str, Decimal],
+        slots: tuple[tuple[Slot, tuple[Callable, ...]], ...],
+        context: object | None,
+    ) -> str:
+        # Fast path with hooks on some slots: only those go through the
+        # per-field formatting.
+        out = list(self.pieces)
+        for slot, hooks in slots:
+            if not hooks:
+                out[slot.index] = self.render_slot(slot, amounts, values, overrides, computed)
+                continue
+            field = slot.field
+            raw = _resolve_field_value(field, amounts, values, overrides, computed)
+            for hook in hooks:
+                raw = hook(field, raw, context)
+            formatted = _format_field(field, raw)
+            if len(formatted) != slot.length:
+                raise ValueError(
+                    f"Field length mismatch at pos {field.position}: "
+                    f"{len(formatted)} != {slot.length}"
+                )
+            out[slot.index] = formatted
+        return "".join(out)
+
+    def _render_fields(
+        self,
+        amounts: Mapping[str, Decimal],
+        values: Mapping[str, str],
+        overrides: Mapping[str, str],
+        computed: Mapping[str, Decimal],
+        field_hooks: Sequence[Sequence[Callable]] | None,
+        context: object | None,
+    ) -> str:
+        buffer = [" "] * self.length
+        for index, field in enumerate(self.fields):
+            raw = _resolve_field_value(field, amounts, values, overrides, computed)
+            if field_hooks:
+                for hook in field_hooks[index]:
+                    raw = hook(field, raw, context)
+            formatted = _format_field(field, raw)
+            _write(buffer, field.position, field.length, formatted)
+        return "".join(buffer)
+
+
+class CompiledReport:
+    """
+    Render plans for every record of a report layout, in layout order, plus
+    the formula graph spanning all of its records.
+    """
+
+    def __init__(self, report: ReportLayout) -> None:
+        self.name = getattr(report, "name", "")
+        self.records: tuple[CompiledRecord, ...] = tuple(
+            compile_record(record) for record in report.records
+        )
+        self.formulas: FormulaGraph = build_formula_graph(report.records)
+        # ``report`` may be any object with ``records``, so union the records' sets.
+        self.known_keys = frozenset().union(*(record.known_keys for record in self.records))
+        # Codes of text fields keep their Decimal value in fixed-point mode.
+        self.text_codes = frozenset(
+            field.code
+            for record in report.records
+            for field in record.fields
+            if field.code and field.raw_type.strip().startswith("A")
+        )
+        self.scale = _fixed_point_scale(self)
+        # Other per-layout plans (e.g. parse tables) built on demand by other modules.
+        self.cache: dict[Hashable, Any] = {}
+
+    def image(self, encoding: str = "iso-8859-1") -> ReportImage | None:
+        """
+        The blank declaration image for ``encoding``, built on first use.
+
+        ``None`` when the layout has untiled records or ``encoding`` is not one
+        byte per character for it.
+        """
+        key = ("image", encoding)
+        if key not in self.cache:
+            self.cache[key] = _build_image(self, encoding)
+        return self.cache[key]
+
+    def render_image(
+        self,
+        image: ReportImage,
+        amounts: Mapping[str, Decimal],
+        values: Mapping[str, str],
+        overrides: Mapping[str, str],
+        computed: Mapping[str, Decimal],
+        errors: str = "strict",
+    ) -> bytes | None:
+        """
+        Encoded declaration, as ``render`` of every record joined with CRLF
+        and encoded would give, built by copying ``image`` and patching only
+        the fields that carry data.
+
+        Needs the conditions of the ``render`` fast path (no hooks, no
+        constant overrides). Returns ``None`` when a value does not encode to
+        one byte per character, so the caller can encode the text instead.
+        """
+        touched: dict[int, Slot] = dict(image.eager)
+        slots = image.slots
+        for source in (overrides, computed, amounts, values):
+            for name, value in source.items():
+                entries = slots.get(name)
+                if entries is None:
+                    continue
+                if value:
+                    touched.update(entries)
+                elif value is not None and type(value) is not str:
+                    # Zero is blank for numbers but not for text fields; missing
+                    # and empty values are blank for both and already in the image.
+                    touched.update(entry for entry in entries if not entry[1].numeric)
+        # Format in layout order, so the first invalid field is the one
+        # ``render`` reports, and encode afterwards, as encoding the text would.
+        patches: list[tuple[int, str]] = []
+        for offset in sorted(touched):
+            slot = touched[offset]
+            value = _resolve_slot(slot, amounts, values, overrides, computed)
+            if slot.numeric:
+                if not value and slot.blank is not None:
+                    continue
+                patches.append((offset, _format_amount(slot, value)))
+            elif value is not None:
+                patches.append((offset, _format_text(str(value), slot.length)))
+        buffer = bytearray(image.blank)
+        view = memoryview(buffer)
+        encoding = image.encoding
+        for offset, text in patches:
+            data = text.encode(encoding, errors)
+            if len(data) != len(text):
+                return None
+            view[offset : offset + len(data)] = data
+        return bytes(buffer)
+
+
+_RECORD_CACHE: dict[int, tuple[weakref.ref, CompiledRecord]] = {}
+_REPORT_CACHE: dict[int, tuple[weakref.ref, CompiledReport]] = {}
+
+
+def compile_record(record: RecordLayout) -> CompiledRecord:
+    """
+    Return the render plan for a record, compiling it on first use.
+    """
+    return _cached(_RECORD_CACHE, record, CompiledRecord)
+
+
+def compile_report(report: ReportLayout) -> CompiledReport:
+    """
+    Return the render plans for a report, compiling them on first use.
+    """
+    return _cached(_REPORT_CACHE, report, CompiledReport)
+
+
+def _cached(cache: dict, layout, factory):
+    key = id(layout)
+    entry = cache.get(key)
+    if entry is not None and entry[0]() is layout:
+        return entry[1]
+    compiled = factory(layout)
+    ref = weakref.ref(layout, lambda _, key=key: cache.pop(key, None))
+    cache[key] = (ref, compiled)
+    return compiled
+
+
+def _fixed_point_scale(compiled: CompiledReport) -> int | None:
+    # Amounts are carried as integers at the largest decimals of the numeric
+    # code fields. Formulas over text codes would mix scaled and unscaled values, and
+    # untiled records have no slots, so such layouts cannot use fixed point.
+    if not all(record.tiled for record in compiled.records):
+        return None
+    for node in compiled.formulas.nodes:
+        if node.code in compiled.text_codes or not compiled.text_codes.isdisjoint(
+            node.compiled.codes
+        ):
+            return None
+    return max(
+        (
+            slot.decimals
+            for record in compiled.records
+            for slot in record.slots
+            if slot.numeric and slot.code
+        ),
+        default=0,
+    )
+
+
+def _build_image(compiled: CompiledReport, encoding: str) -> ReportImage | None:
+    if not all(record.tiled for record in compiled.records):
+        return None
+    texts: list[str] = []
+    slots: dict[str, list[tuple[int, Slot]]] = {}
+    eager: list[tuple[int, Slot]] = []
+    base = 0
+    for record in compiled.records:
+        pieces = list(record.pieces)
+        for slot in record.slots:
+            offset = base + slot.field.position - 1
+            pieces[slot.index] = slot.blank or " " * slot.length
+            if slot.blank is None:
+                eager.append((offset, slot))
+            for name in {slot.code, slot.key} - {None}:
+                slots.setdefault(name, []).append((offset, slot))
+        texts.append("".join(pieces))
+        base += len(texts[-1]) + 2
+    text = "\r\n".join(texts)
+    try:
+        blank = text.encode(encoding)
+    except UnicodeEncodeError:
+        return None
+    if len(blank) != len(text):
+        return None
+    return ReportImage(
+        blank=blank,
+        slots={name: tuple(entries) for name, entries in slots.items()},
+        eager=tuple(eager),
+        encoding=encoding,
+    )
+
+
+def _build_hook_table(record: CompiledRecord, value_hooks: tuple) -> HookTable:
+    per_field = []
+    for field in record.fields:
+        selected = []
+        for hook in value_hooks:
+            matches = getattr(hook, "matches", None)
+            if matches is None:
+                selected.append(hook)
+            elif matches(record.name, field):
+                selected.append(hook.hook)
+        per_field.append(tuple(selected))
+    slots = None
+    constants_hooked = any(
+        hooks for field, hooks in zip(record.fields, per_field) if field.const_value is not None
+    )
+    if record.tiled and not constants_hooked:
+        by_field = {id(field): hooks for field, hooks in zip(record.fields, per_field)}
+        slots = tuple((slot, by_field[id(slot.field)]) for slot in record.slots)
+    return HookTable(tuple(per_field), slots, any(per_field))
+
+
+def _is_tiled(fields: Sequence[Field]) -> bool:
+    cursor = 1
+    for field in sorted(fields, key=lambda f: f.position):
+        if field.position < cursor:
+            return False
+        cursor = field.position + field.length
+    return True
+
+
+def _make_slot(index: int, field: Field) -> Slot:
+    raw_type = field.raw_type.strip()
+    decimals = field.decimals if field.decimals is not None else 0
+    numeric = not raw_type.startswith("A")
+    if numeric:
+        # Zero and missing amounts all render as the formatted zero; it is only
+        # unusable when the zero itself does not fit (decimals >= length).
+        blank = _format_number("0", field.length, decimals, field.raw_type)
+        if len(blank) != field.length:
+            blank = None
+    else:
+        blank = " " * field.length
+    return Slot(
+        index=index,
+        field=field,
+        code=field.code,
+        key=field.key,
+        length=field.length,
+        numeric=numeric,
+        decimals=decimals,
+        signed=raw_type == "N",
+        spec=f".{decimals}f",
+        blank=blank,
+    )
+
+
+def _resolve_slot(
+    slot: Slot,
+    amounts: Mapping[str, Decimal],
+    values: Mapping[str, str],
+    overrides: Mapping[str, str],
+    computed: Mapping[str, Decimal],
+):
+    code = slot.code
+    if overrides:
+        if slot.key in overrides:
+            return str(overrides[slot.key])
+        if code and code in overrides:
+            return str(overrides[code])
+    if code:
+        if code in computed:
+            return computed[code]
+        if code in amounts:
+            return amounts[code]
+    if slot.key in values:
+        return values[slot.key]
+    return None
+
+
+def _format_amount(slot: Slot, value) -> str:
+    if type(value) is not Decimal:
+        value = Decimal(str(value) or "0")
+    sign = ""
+    if value < 0:
+        if not slot.signed:
+            raise ValueError(f"Negative value not allowed for type {slot.field.raw_type}")
+        sign = "N"
+    text = format(abs(value), slot.spec)
+    if slot.decimals:
+        text = text.replace(".", "")
+    text = sign + text.rjust(slot.length - len(sign), "0")
+    if len(text) != slot.length:
+        raise ValueError(
+            f"Field length mismatch at pos {slot.field.position}: {len(text)} != {slot.length}"
+        )
+    return text
+
+
+def _format_scaled(slot: Slot, value: int, scale: int) -> str:
+    if slot.decimals != scale:
+        # Fewer decimals need rounding: leave it to Decimal.
+        return _format_amount(slot, Decimal(value).scaleb(-scale))
+    sign = ""
+    if value < 0:
+        if not slot.signed:
+            raise ValueError(f"Negative value not allowed for type {slot.field.raw_type}")
+        sign = "N"
+        value = -value
+    digits = str(value)
+    if len(digits) <= scale:
+        # Keep the leading zero of amounts below one unit, as "0.05" -> "005".
+        digits = digits.rjust(scale + 1, "0")
+    text = sign + digits.rjust(slot.length - len(sign), "0")
+    if len(text) != slot.length:
+        raise ValueError(
+            f"Field length mismatch at pos {slot.field.position}: {len(text)} != {slot.length}"
+        )
+    return text
+
+
+def _resolve_field_value(
+    field: Field,
+    amounts: Mapping[str, Decimal],
+    values: Mapping[str, str],
+    overrides: Mapping[str, str],
+    computed: Mapping[str, Decimal],
+) -> str:
+    if field.key in overrides:
+        return str(overrides[field.key])
+    if field.code and field.code in overrides:
+        return str(overrides[field.code])
+    if field.const_value is not None:
+        return field.const_value
+    if field.code:
+        if field.code in computed:
+            return str(computed[field.code])
+        if field.code in amounts:
+            return str(amounts[field.code])
+    if field.key in values:
+        return str(values[field.key])
+    return ""
+
+
+def _format_field(field: Field, raw: str) -> str:
+    if raw is None:
+        raw = ""
+    if field.const_value is not None:
+        return _format_text(str(raw), field.length)
+    if field.raw_type.strip().startswith("A"):
+        return _format_text(str(raw), field.length)
+    if field.raw_type.strip().startswith("An"):
+        return _format_text(str(raw), field.length)
+
+    decimals = field.decimals if field.decimals is not None else 0
+    return _format_number(raw, field.length, decimals, field.raw_type)
+
+
+def _format_text(value: str, length: int) -> str:
+    if len(value) > length:
+        return value[:length]
+    return value.ljust(length)
+
+
+def _format_number(value: str, length: int, decimals: int, raw_type: str) -> str:
+    num = Decimal(str(value or "0"))
+    sign = ""
+    if num < 0:
+        if raw_type.strip() == "N":
+            sign = "N"
+        else:
+            raise ValueError(f"Negative value not allowed for type {raw_type}")
+    num = abs(num)
+    text = f"{num:.{decimals}f}".replace(".", "")
+    text = text.rjust(length - len(sign), "0")
+    return f"{sign}{text}"
+
+
+def _write(buffer: list[str], position: int, length: int, value: str) -> None:
+    start = position - 1
+    end = start + length
+    if len(value) != length:
+        raise ValueError(f"Field length mismatch at pos {position}: {len(value)} != {length}")
+    buffer[start:end] = list(value)
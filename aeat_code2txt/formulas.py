@@ -1,42 +1,143 @@
 from __future__ import annotations
 
 import re
+from dataclasses import dataclass
 from decimal import Decimal
-from typing import Mapping
+from functools import lru_cache
+from typing import Iterable, Mapping, NamedTuple
+
+from .layout import Field, RecordLayout
 
 TOKEN_RE = re.compile(r"\[(\d+)\]|[+-]")
+_ZERO = Decimal(0)
+
+
+@dataclass(frozen=True)
+class CompiledFormula:
+    """
+    A formula reduced to a flat list of ``(sign, code)`` terms, ``sign`` being 1 or -1.
+    """
+
+    formula: str
+    terms: tuple[tuple[int, str], ...]
+
+    @property
+    def codes(self) -> tuple[str, ...]:
+        return tuple(code for _, code in self.terms)
+
+    def evaluate(self, values: Mapping[str, Decimal], zero: Decimal | int = _ZERO) -> Decimal:
+        """
+        Sum the terms; ``zero`` is the starting total and the value of missing
+        codes (pass ``0`` to evaluate scaled integer amounts).
+        """
+        total = zero
+        for sign, code in self.terms:
+            value = values.get(code, zero)
+            if sign > 0:
+                total += value
+            else:
+                total -= value
+        return total
+
+
+@lru_cache(maxsize=1024)
+def compile_formula(formula: str) -> CompiledFormula:
+    """
+    Tokenize a formula of [NN] codes and + / - operators once.
+
+    Each code takes the sign of the operator closest before it (``+`` when
+    there is none). Results are cached, so repeated formulas are not re-parsed.
+    """
+    terms = []
+    sign = 1
+    for match in TOKEN_RE.finditer(formula):
+        code = match.group(1)
+        if code is None:
+            sign = 1 if match.group(0) == "+" else -1
+        else:
+            terms.append((sign, code))
+    return CompiledFormula(formula=formula, terms=tuple(terms))
 
 
 def evaluate_formula(formula: str, values: Mapping[str, Decimal]) -> Decimal:
     """
     Evaluate a simple formula containing [NN] codes and + / - operators.
     """
-    tokens = TOKEN_RE.findall(formula)
-    # TOKEN_RE.findall returns only code captures; we need a full scan.
-    parts = []
-    idx = 0
-    while idx < len(formula):
-        match = TOKEN_RE.search(formula, idx)
-        if not match:
-            break
-        if match.group(0) in ("+", "-"):
-            parts.append(match.group(0))
-        else:
-            parts.append(match.group(1))
-        idx = match.end()
-
-    if not parts:
-        return Decimal(0)
-
-    total = Decimal(0)
-    op = "+"
-    for part in parts:
-        if part in ("+", "-"):
-            op = part
-            continue
-        value = values.get(part, Decimal(0))
-        if op == "+":
-            total += value
-        else:
-            total -= value
-    return total
+    return compile_formula(formula).evaluate(values)
+
+
+class FormulaNode(NamedTuple):
+    code: str
+    formula: str
+    compiled: CompiledFormula
+    record: str
+    field: Field
+
+
+class FormulaGraph:
+    """
+    Formula fields of one or more records, in dependency order.
+
+    Formulas may reference codes computed in any record of the layout; every
+    node comes after the nodes it depends on, so a single pass evaluates the
+    whole graph.
+    """
+
+    def __init__(self, nodes: Iterable[FormulaNode]) -> None:
+        self.nodes: tuple[FormulaNode, ...] = tuple(nodes)
+        self.codes = frozenset(node.code for node in self.nodes)
+
+    def __len__(self) -> int:
+        return len(self.nodes)
+
+    def evaluate(
+        self, amounts: Mapping[str, Decimal], zero: Decimal | int = _ZERO
+    ) -> dict[str, Decimal]:
+        """
+        Return the value of every formula code given the input amounts.
+        """
+        store = dict(amounts)
+        computed: dict[str, Decimal] = {}
+        for node in self.nodes:
+            result = node.compiled.evaluate(store, zero)
+            store[node.code] = result
+            computed[node.code] = result
+        return computed
+
+
+def build_formula_graph(records: Iterable[RecordLayout]) -> FormulaGraph:
+    """
+    Collect the formula fields of ``records`` and sort them topologically.
+
+    Raises ``ValueError`` if the formulas reference each other in a cycle.
+    When a code carries more than one formula the first one wins.
+    """
+    nodes: dict[str, FormulaNode] = {}
+    for record in records:
+        for field in record.fields:
+            if field.code and field.formula and field.code not in nodes:
+                nodes[field.code] = FormulaNode(
+                    field.code, field.formula, compile_formula(field.formula), record.name, field
+                )
+
+    ordered: list[FormulaNode] = []
+    state: dict[str, int] = {}
+
+    def visit(code: str, path: list[str]) -> None:
+        mark = state.get(code)
+        if mark == 2:
+            return
+        if mark == 1:
+            cycle = path[path.index(code) :] + [code]
+            raise ValueError(f"Formula cycle: {' -> '.join(cycle)}")
+        state[code] = 1
+        node = nodes[code]
+        for dep in node.compiled.codes:
+            if dep in nodes:
+                visit(dep, path + [code])
+        state[code] = 2
+        ordered.append(node)
+
+    for code in nodes:
+        visit(code, [])
+    return FormulaGraph(ordered)
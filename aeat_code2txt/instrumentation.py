@@ -0,0 +1,295 @@
+"""Optional timings and counters for render_report, parse_report and validate_report."""
+from __future__ import annotations
+
+import threading
+import time
+import weakref
+from contextlib import contextmanager
+from typing import Any, Callable, Iterator, Mapping
+
+
+_HELP = {
+    "returns": "Returns processed.",
+    "records": "Records rendered, parsed or checked.",
+    "fields": "Fields rendered, parsed or checked.",
+    "errors": "Calls that raised an error.",
+    "issues": "Validation issues found, by type.",
+}
+
+
+class Instrumentation:
+    """
+    Collects where time goes in ``render_report``, ``parse_report`` and
+    ``validate_report`` when passed to them as ``instrumentation=``.
+
+    It keeps, per operation, the time and call count of each phase (e.g.
+    ``split``, ``formulas``, ``format`` for rendering), counters of returns,
+    records, fields, errors and validation issues by type, and the time spent
+    in each hook. Hook time is also part of the phase the hook runs in.
+
+    Calls merge their figures once, under a lock, so one instance can be
+    shared by every thread of a worker. Without it the functions run their
+    usual code path.
+    """
+
+    def __init__(self, clock: Callable[[], float] = time.perf_counter) -> None:
+        self.clock = clock
+        self._lock = threading.Lock()
+        # (operation, phase) -> [calls, seconds]
+        self.phases: dict[tuple[str, str], list] = {}
+        # (name, labels) -> value
+        self.counters: dict[tuple[str, tuple[tuple[str, str], ...]], int] = {}
+        # (kind, hook name) -> [calls, seconds]
+        self.hooks: dict[tuple[str, str], list] = {}
+        # hook -> {kind: timed wrapper}: repeated calls pass the same hook
+        # objects, so they hit the hook tables compiled for them.
+        self._wrappers: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+        # ``hooks`` of the call tracked in this thread, where the wrappers count.
+        self._current = threading.local()
+
+    def observe(
+        self,
+        operation: str,
+        phases: list[tuple[str, float]],
+        counts: Mapping[str, int],
+        hooks: Mapping[tuple[str, str], list] | None = None,
+        issues: Mapping[str, int] | None = None,
+    ) -> None:
+        """Merge the figures of one call."""
+        with self._lock:
+            for phase, seconds in phases:
+                entry = self.phases.setdefault((operation, phase), [0, 0.0])
+                entry[0] += 1
+                entry[1] += seconds
+            labels = (("operation", operation),)
+            for name, value in counts.items():
+                key = (name, labels)
+                self.counters[key] = self.counters.get(key, 0) + value
+            for kind, value in (issues or {}).items():
+                key = ("issues", (("type", kind),))
+                self.counters[key] = self.counters.get(key, 0) + value
+            for key, (calls, seconds) in (hooks or {}).items():
+                entry = self.hooks.setdefault(key, [0, 0.0])
+                entry[0] += calls
+                entry[1] += seconds
+
+    @contextmanager
+    def track(self, operation: str) -> Iterator[Call]:
+        """
+        Collect the figures of one call of ``operation`` in the yielded
+        ``Call`` and merge them when the block ends (counting an error if it
+        raises).
+        """
+        call = Call(self.clock)
+        previous = getattr(self._current, "hooks", None)
+        self._current.hooks = call.hooks
+        try:
+            yield call
+        except Exception:
+            call.counts["errors"] = 1
+            raise
+        finally:
+            self._current.hooks = previous
+            self.observe(operation, call.watch.phases, call.counts, call.hooks, call.issues)
+
+    def timed_hooks(self, hooks: list[Callable] | None, kind: str) -> list[Callable] | None:
+        """
+        ``hooks`` wrapped so their calls and time count towards the tracked
+        call. Each hook is wrapped once; later calls get the same wrapper.
+        """
+        if not hooks:
+            return hooks
+        timed = []
+        for hook in hooks:
+            if hasattr(hook, "matches"):
+                # Targeted hooks keep their selectors; only the callable is timed.
+                timed.append(hook._replace(hook=self._timed(hook.hook, kind)))
+            else:
+                timed.append(self._timed(hook, kind))
+        return timed
+
+    def _timed(self, hook: Callable, kind: str) -> Callable:
+        try:
+            wrappers = self._wrappers.setdefault(hook, {})
+        except TypeError:  # not weakly referenceable: wrap it for this call only
+            wrappers = {}
+        wrapper = wrappers.get(kind)
+        if wrapper is None:
+            wrapper = wrappers[kind] = _timed(hook, kind, self._current, self.clock)
+        return wrapper
+
+    @contextmanager
+    def timer(self, operation: str, phase: str) -> Iterator[None]:
+        """
+        Time a block of caller code as a phase, e.g. loading the layout::
+
+            with instrumentation.timer("render", "load"):
+                layout = load_layout("303")
+        """
+        start = self.clock()
+        try:
+            yield
+        finally:
+            self.observe(operation, [(phase, self.clock() - start)], {})
+
+    def snapshot(self) -> dict[str, Any]:
+        """A copy of the collected figures, as plain nested dicts."""
+        with self._lock:
+            return {
+                "phases": {
+                    f"{operation}.{phase}": {"calls": calls, "seconds": seconds}
+                    for (operation, phase), (calls, seconds) in self.phases.items()
+                },
+                "counters": {
+                    _series(name, labels): value for (name, labels), value in self.counters.items()
+                },
+                "hooks": {
+                    f"{kind}:{hook}": {"calls": calls, "seconds": seconds}
+                    for (kind, hook), (calls, seconds) in self.hooks.items()
+                },
+            }
+
+    def reset(self) -> None:
+        with self._lock:
+            self.phases.clear()
+            self.counters.clear()
+            self.hooks.clear()
+
+    def to_prometheus(self, prefix: str = "aeat_code2txt") -> str:
+        """The figures in the Prometheus text exposition format."""
+        with self._lock:
+            phases = sorted(self.phases.items())
+            counters = sorted(self.counters.items())
+            hooks = sorted(self.hooks.items())
+        lines: list[str] = []
+
+        def family(name: str, help_text: str, samples: list[tuple[tuple, float]]) -> None:
+            if not samples:
+                return
+            lines.append(f"# HELP {prefix}_{name} {help_text}")
+            lines.append(f"# TYPE {prefix}_{name} counter")
+            for labels, value in samples:
+                lines.append(f"{_series(f'{prefix}_{name}', labels)} {_number(value)}")
+
+        family(
+            "phase_seconds_total",
+            "Time spent per operation phase.",
+            [((("operation", op), ("phase", phase)), entry[1]) for (op, phase), entry in phases],
+        )
+        family(
+            "phase_calls_total",
+            "Times each operation phase ran.",
+            [((("operation", op), ("phase", phase)), entry[0]) for (op, phase), entry in phases],
+        )
+        names: dict[str, list] = {}
+        for (name, labels), value in counters:
+            names.setdefault(name, []).append((labels, value))
+        for name, samples in names.items():
+            family(f"{name}_total", _HELP.get(name, f"Number of {name}."), samples)
+        family(
+            "hook_seconds_total",
+            "Time spent in each hook.",
+            [((("kind", kind), ("hook", hook)), entry[1]) for (kind, hook), entry in hooks],
+        )
+        family(
+            "hook_calls_total",
+            "Calls of each hook.",
+            [((("kind", kind), ("hook", hook)), entry[0]) for (kind, hook), entry in hooks],
+        )
+        return "\n".join(lines) + "\n" if lines else ""
+
+
+def serve_prometheus(
+    instrumentation: Instrumentation, port: int = 9464, host: str = "127.0.0.1"
+):
+    """
+    Serve ``instrumentation`` for scraping (any path) from a daemon thread.
+
+    Returns the ``ThreadingHTTPServer``; call ``shutdown()`` to stop it.
+    """
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self) -> None:
+            body = instrumentation.to_prometheus().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format: str, *args: Any) -> None:
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+class Stopwatch:
+    """Splits one call into consecutive phases."""
+
+    __slots__ = ("clock", "last", "phases")
+
+    def __init__(self, clock: Callable[[], float]) -> None:
+        self.clock = clock
+        self.phases: list[tuple[str, float]] = []
+        self.last = clock()
+
+    def lap(self, phase: str) -> None:
+        now = self.clock()
+        self.phases.append((phase, now - self.last))
+        self.last = now
+
+
+class Call:
+    """The figures of one instrumented call (see ``Instrumentation.track``)."""
+
+    __slots__ = ("watch", "counts", "hooks", "issues")
+
+    def __init__(self, clock: Callable[[], float]) -> None:
+        self.watch = Stopwatch(clock)
+        self.counts: dict[str, int] = {"returns": 1}
+        # (kind, hook name) -> [calls, seconds]
+        self.hooks: dict[tuple[str, str], list] = {}
+        self.issues: dict[str, int] = {}
+
+
+def _timed(hook: Callable, kind: str, current: threading.local, clock) -> Callable:
+    key = (kind, _hook_name(hook))
+
+    def timed(*args):
+        start = clock()
+        try:
+            return hook(*args)
+        finally:
+            stats = getattr(current, "hooks", None)
+            if stats is not None:
+                entry = stats.get(key)
+                if entry is None:
+                    entry = stats[key] = [0, 0.0]
+                entry[0] += 1
+                entry[1] += clock() - start
+
+    return timed
+
+
+def _hook_name(hook: Callable) -> str:
+    name = getattr(hook, "__qualname__", None) or type(hook).__qualname__
+    module = getattr(hook, "__module__", None)
+    return f"{module}.{name}" if module else name
+
+
+def _series(name: str, labels: tuple[tuple[str, str], ...]) -> str:
+    if not labels:
+        return name
+    inner = ",".join(f'{key}="{_escape(str(value))}"' for key, value in labels)
+    return f"{name}{{{inner}}}"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _number(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
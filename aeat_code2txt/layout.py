@@ -1,7 +1,9 @@
 from __future__ import annotations
 
-from dataclasses import dataclass, field
-from typing import Iterable, Mapping, Sequence
+from dataclasses import FrozenInstanceError, dataclass, field
+from functools import cached_property
+from types import MappingProxyType
+from typing import Any, Iterable, Mapping, Sequence
 
 
 @dataclass(frozen=True)
@@ -20,27 +22,224 @@ class Field:
     key: str | None = None
 
 
+class CompactField:
+    """
+    Memory-lean, read-only stand-in for ``Field`` (see ``load_layout(compact=True)``).
+
+    Only the attributes used to render and parse are stored, in slots; the
+    descriptive ``description``, ``validation`` and ``content`` texts are
+    fetched from the layout source on first access.
+    """
+
+    __slots__ = (
+        "number",
+        "position",
+        "length",
+        "raw_type",
+        "code",
+        "formula",
+        "decimals",
+        "const_value",
+        "key",
+        "_text",
+        "_index",
+    )
+
+    def __init__(
+        self,
+        number: int,
+        position: int,
+        length: int,
+        raw_type: str,
+        code: str | None,
+        formula: str | None,
+        decimals: int | None,
+        const_value: str | None,
+        key: str | None,
+        text: Any,
+        index: int,
+    ) -> None:
+        values = (
+            number,
+            position,
+            length,
+            raw_type,
+            code,
+            formula,
+            decimals,
+            const_value,
+            key,
+            text,
+            index,
+        )
+        for name, value in zip(self.__slots__, values):
+            object.__setattr__(self, name, value)
+
+    @property
+    def description(self) -> str:
+        return self._text.get(self._index)[0]
+
+    @property
+    def validation(self) -> str:
+        return self._text.get(self._index)[1]
+
+    @property
+    def content(self) -> str:
+        return self._text.get(self._index)[2]
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise FrozenInstanceError(f"cannot assign to field '{name}'")
+
+    def __delattr__(self, name: str) -> None:
+        raise FrozenInstanceError(f"cannot delete field '{name}'")
+
+    def __reduce__(self):
+        return (CompactField, tuple(getattr(self, name) for name in self.__slots__))
+
+    def _values(self) -> tuple:
+        return tuple(getattr(self, name) for name in self.__slots__[:-2])
+
+    def __eq__(self, other: object) -> bool:
+        if other.__class__ is not CompactField:
+            return NotImplemented
+        return self._values() == other._values()
+
+    def __hash__(self) -> int:
+        return hash(self._values())
+
+    def __repr__(self) -> str:
+        args = ", ".join(f"{name}={getattr(self, name)!r}" for name in self.__slots__[:-2])
+        return f"CompactField({args})"
+
+
+class _Indexed:
+    """
+    Read-only lookup indexes cached on a frozen layout on first use (the
+    loaders build them at load time). They are left out of pickles and
+    rebuilt on the other side.
+    """
+
+    _DATA: tuple[str, ...] = ()
+
+    def _freeze(self, name: str) -> None:
+        # The indexes assume the contents never change: store sequences as tuples.
+        value = getattr(self, name)
+        if type(value) is not tuple:
+            object.__setattr__(self, name, tuple(value))
+
+    def __getstate__(self) -> dict[str, Any]:
+        return {name: self.__dict__[name] for name in self._DATA}
+
+
 @dataclass(frozen=True)
-class RecordLayout:
+class RecordLayout(_Indexed):
     name: str
     fields: Sequence[Field]
 
+    _DATA = ("name", "fields")
+
+    def __post_init__(self) -> None:
+        self._freeze("fields")
+
     def length(self) -> int:
+        return self._length
+
+    def field_by_code(self) -> Mapping[str, Field]:
+        return self._field_by_code
+
+    def field_by_key(self) -> Mapping[str, Field]:
+        return self._field_by_key
+
+    @cached_property
+    def known_keys(self) -> frozenset[str]:
+        """Every code and key a payload may use for this record."""
+        return frozenset(key for field in self.fields for key in (field.code, field.key) if key)
+
+    @cached_property
+    def _length(self) -> int:
         if not self.fields:
             return 0
         return max(field.position + field.length - 1 for field in self.fields)
 
-    def field_by_code(self) -> Mapping[str, Field]:
-        return {field.code: field for field in self.fields if field.code}
+    @cached_property
+    def _field_by_code(self) -> Mapping[str, Field]:
+        return MappingProxyType({field.code: field for field in self.fields if field.code})
 
-    def field_by_key(self) -> Mapping[str, Field]:
-        return {field.key: field for field in self.fields if field.key}
+    @cached_property
+    def _field_by_key(self) -> Mapping[str, Field]:
+        return MappingProxyType({field.key: field for field in self.fields if field.key})
 
 
 @dataclass(frozen=True)
-class ReportLayout:
+class ReportLayout(_Indexed):
     name: str
     records: Sequence[RecordLayout] = field(default_factory=tuple)
 
+    _DATA = ("name", "records")
+
+    def __post_init__(self) -> None:
+        self._freeze("records")
+
     def record_by_name(self) -> Mapping[str, RecordLayout]:
-        return {record.name: record for record in self.records}
+        return self._record_by_name
+
+    def field_by_code(self) -> Mapping[str, Field]:
+        """Fields by code across all records (the last one wins on duplicates)."""
+        return self._field_by_code
+
+    def field_by_key(self) -> Mapping[str, Field]:
+        """Fields by key across all records (the last one wins on duplicates)."""
+        return self._field_by_key
+
+    def record_by_code(self) -> Mapping[str, RecordLayout]:
+        """The record holding each code (the last one wins on duplicates)."""
+        return self._record_by_code
+
+    @cached_property
+    def known_keys(self) -> frozenset[str]:
+        """Every code and key a payload may use for this report."""
+        return frozenset().union(*(record.known_keys for record in self.records))
+
+    @cached_property
+    def record_lengths(self) -> tuple[int, ...]:
+        return tuple(record.length() for record in self.records)
+
+    @cached_property
+    def _record_by_name(self) -> Mapping[str, RecordLayout]:
+        return MappingProxyType({record.name: record for record in self.records})
+
+    @cached_property
+    def _field_by_code(self) -> Mapping[str, Field]:
+        merged: dict[str, Field] = {}
+        for record in self.records:
+            merged.update(record.field_by_code())
+        return MappingProxyType(merged)
+
+    @cached_property
+    def _field_by_key(self) -> Mapping[str, Field]:
+        merged: dict[str, Field] = {}
+        for record in self.records:
+            merged.update(record.field_by_key())
+        return MappingProxyType(merged)
+
+    @cached_property
+    def _record_by_code(self) -> Mapping[str, RecordLayout]:
+        return MappingProxyType(
+            {code: record for record in self.records for code in record.field_by_code()}
+        )
+
+    def build_indexes(self) -> ReportLayout:
+        """Compute every lookup index now rather than on first use; returns self."""
+        for record in self.records:
+            for name in ("_length", "_field_by_code", "_field_by_key", "known_keys"):
+                getattr(record, name)
+        for name in (
+            "_record_by_name",
+            "_field_by_code",
+            "_field_by_key",
+            "_record_by_code",
+            "known_keys",
+            "record_lengths",
+        ):
+            getattr(self, name)
+        return self
@@ -1,62 +1,295 @@
 from __future__ import annotations
 
+import dataclasses
+import hashlib
 import json
-from pathlib import Path
+import marshal
+import sys
 from importlib import resources
+from pathlib import Path
+from typing import Any, Mapping
 
-from .layout import Field, RecordLayout, ReportLayout
-
-
-def load_layout_json(path: Path) -> ReportLayout:
-    data = json.loads(path.read_text(encoding="utf-8"))
-    records = []
-    for rec in data.get("records", []):
-        fields = [
-            Field(
-                number=field["number"],
-                position=field["position"],
-                length=field["length"],
-                raw_type=field["raw_type"],
-                description=field["description"],
-                validation=field.get("validation", ""),
-                content=field.get("content", ""),
-                code=field.get("code"),
-                formula=field.get("formula"),
-                decimals=field.get("decimals"),
-                const_value=field.get("const_value"),
-                key=field.get("key"),
-            )
-            for field in rec.get("fields", [])
-        ]
-        records.append(RecordLayout(name=rec["name"], fields=fields))
-    return ReportLayout(name=data.get("name", path.stem), records=records)
+from .layout import CompactField, Field, RecordLayout, ReportLayout
+
+_FIELD_DEFAULTS: dict[str, Any] = {
+    "validation": "",
+    "content": "",
+    **{
+        item.name: item.default
+        for item in dataclasses.fields(Field)
+        if item.default is not dataclasses.MISSING
+    },
+}
+_FIELD_NAMES = tuple(item.name for item in dataclasses.fields(Field))
+
+# Precompiled layouts (``layouts_<model>.bin`` next to the JSON, built by
+# scripts/build_layout_blob.py): the magic, then a marshalled
+# (version, sha256 of the source JSON, name, records) tuple, each record being
+# (name, field rows) with the row values in ``Field`` attribute order.
+BLOB_MAGIC = b"AEATLAYOUT"
+BLOB_VERSION = 1
+
+_LAYOUTS: dict[str, tuple[Any, object, ReportLayout]] = {}
+_COMPACT_LAYOUTS: dict[str, tuple[Any, object, ReportLayout]] = {}
+_JSON_LAYOUTS: dict[tuple[Path, bool], tuple[int, ReportLayout]] = {}
+
+
+class _LayoutText:
+    """
+    Descriptive texts of a compact layout, read back from its JSON on first use.
+    """
+
+    def __init__(self, model: str | None = None, path: Path | None = None) -> None:
+        self.model = model
+        self.path = path
+        self._texts: list[tuple[str, str, str]] | None = None
+
+    def get(self, index: int) -> tuple[str, str, str]:
+        if self._texts is None:
+            data = _read_json(self.model, self.path)
+            self._texts = [
+                tuple(field.get(name, "") for name in ("description", "validation", "content"))
+                for record in data.get("records", [])
+                for field in record.get("fields", [])
+            ]
+        return self._texts[index]
+
+    def __reduce__(self):
+        # Workers re-read the texts themselves, if they ever need them.
+        return (_LayoutText, (self.model, self.path))
+
+
+def load_layout_json(path: Path, *, compact: bool = False) -> ReportLayout:
+    """
+    Load a layout JSON file, reusing the parsed layout while its mtime is unchanged.
+
+    ``compact`` is as in ``load_layout``.
+    """
+    path = Path(path).resolve()
+    mtime = path.stat().st_mtime_ns
+    cached = _JSON_LAYOUTS.get((path, compact))
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
+    layout = _load(
+        path.read_bytes(),
+        _read_optional(path.with_suffix(".bin")),
+        path.stem,
+        _LayoutText(path=path) if compact else None,
+    )
+    _JSON_LAYOUTS[(path, compact)] = (mtime, layout)
+    return layout
 
 
-def load_layout(model: str) -> ReportLayout:
+def load_layout(model: str, *, compact: bool = False) -> ReportLayout:
     """
     Load a bundled layout by model code (e.g., "303", "390").
+
+    Layouts are parsed once per process and shared; call ``invalidate`` to
+    force a reload. With ``compact`` the fields are ``CompactField`` objects,
+    which keep only what rendering and parsing need and read their
+    descriptive texts back from the JSON on demand.
+
+    A precompiled ``layouts_<model>.bin`` is used instead of parsing the JSON
+    when it is present and was built from the current JSON.
+    """
+    cache = _COMPACT_LAYOUTS if compact else _LAYOUTS
+    cached = cache.get(model)
+    if cached is not None:
+        resource, version, layout = cached
+        if _resource_version(resource) == version:
+            return layout
+    resource = _resource(model)
+    version = _resource_version(resource)
+    layout = _load(
+        resource.read_bytes(),
+        _read_optional(_resource(model, ".bin")),
+        model,
+        _LayoutText(model=model) if compact else None,
+    )
+    cache[model] = (resource, version, layout)
+    return layout
+
+
+def preload(*models: str) -> None:
+    """
+    Load bundled layouts ahead of time (all bundled models when none are given).
+    """
+    for model in models or bundled_models():
+        load_layout(model)
+
+
+def invalidate(model: str | None = None) -> None:
+    """
+    Drop cached layouts: one bundled model, or every cached layout when omitted.
+    """
+    if model is None:
+        _LAYOUTS.clear()
+        _COMPACT_LAYOUTS.clear()
+        _JSON_LAYOUTS.clear()
+    else:
+        _LAYOUTS.pop(model, None)
+        _COMPACT_LAYOUTS.pop(model, None)
+
+
+def bundled_models() -> list[str]:
+    """
+    Return the model codes of the bundled layouts.
+    """
+    names = (item.name for item in resources.files("aeat_code2txt.layouts").iterdir())
+    return sorted(
+        name[len("layouts_") : -len(".json")]
+        for name in names
+        if name.startswith("layouts_") and name.endswith(".json")
+    )
+
+
+def dump_layout_blob(source: bytes) -> bytes:
+    """
+    Compile the bytes of a layout JSON into the precompiled form ``load_layout``
+    prefers (see ``BLOB_MAGIC``).
     """
-    name = f"layouts_{model}.json"
-    with resources.files("aeat_code2txt.layouts").joinpath(name).open("r", encoding="utf-8") as f:
-        data = json.load(f)
-    records = []
-    for rec in data.get("records", []):
-        fields = [
-            Field(
-                number=field["number"],
-                position=field["position"],
-                length=field["length"],
-                raw_type=field["raw_type"],
-                description=field["description"],
-                validation=field.get("validation", ""),
-                content=field.get("content", ""),
-                code=field.get("code"),
-                formula=field.get("formula"),
-                decimals=field.get("decimals"),
-                const_value=field.get("const_value"),
-                key=field.get("key"),
+    data = json.loads(source)
+    digest = hashlib.sha256(source).hexdigest()
+    payload = (BLOB_VERSION, digest, data.get("name"), _field_rows(data))
+    return BLOB_MAGIC + marshal.dumps(payload)
+
+
+def _load(
+    source: bytes, blob: bytes | None, default_name: str, text: _LayoutText | None
+) -> ReportLayout:
+    layout = None
+    if blob is not None:
+        layout = _load_blob(blob, source, default_name, text)
+    if layout is None:
+        layout = _build_layout(json.loads(source), default_name, text)
+    return layout.build_indexes()
+
+
+def _load_blob(
+    blob: bytes, source: bytes, default_name: str, text: _LayoutText | None
+) -> ReportLayout | None:
+    # Stale, foreign or damaged blobs are ignored in favour of the JSON.
+    if not blob.startswith(BLOB_MAGIC):
+        return None
+    try:
+        version, digest, name, records = marshal.loads(memoryview(blob)[len(BLOB_MAGIC) :])
+    except (EOFError, ValueError, TypeError):
+        return None
+    if version != BLOB_VERSION or digest != hashlib.sha256(source).hexdigest():
+        return None
+    if text is not None:
+        return _build_compact_rows(name or default_name, records, text)
+    new = object.__new__
+    built = []
+    for record_name, rows in records:
+        fields = []
+        for row in rows:
+            field = new(Field)
+            field.__dict__.update(zip(_FIELD_NAMES, row))
+            fields.append(field)
+        built.append(RecordLayout(name=record_name, fields=tuple(fields)))
+    return ReportLayout(name=name or default_name, records=tuple(built))
+
+
+def _read_optional(resource) -> bytes | None:
+    try:
+        return resource.read_bytes()
+    except OSError:
+        return None
+
+
+def _resource(model: str, suffix: str = ".json"):
+    return resources.files("aeat_code2txt.layouts").joinpath(f"layouts_{model}{suffix}")
+
+
+def _read_json(model: str | None, path: Path | None) -> dict[str, Any]:
+    if path is not None:
+        return json.loads(path.read_text(encoding="utf-8"))
+    with _resource(model).open("r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _resource_version(resource) -> object:
+    try:
+        stat = Path(resource).stat()
+    except (TypeError, OSError):
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+def _build_layout(
+    data: Mapping[str, Any], default_name: str, text: _LayoutText | None = None
+) -> ReportLayout:
+    if text is not None:
+        return _build_compact_layout(data, default_name, text)
+    records = tuple(
+        RecordLayout(
+            name=rec["name"],
+            fields=tuple(_build_field(field) for field in rec.get("fields", [])),
+        )
+        for rec in data.get("records", [])
+    )
+    return ReportLayout(name=data.get("name", default_name), records=records)
+
+
+def _build_compact_layout(
+    data: Mapping[str, Any], default_name: str, text: _LayoutText
+) -> ReportLayout:
+    return _build_compact_rows(data.get("name", default_name), _field_rows(data), text)
+
+
+def _build_compact_rows(name: str, records: Any, text: _LayoutText) -> ReportLayout:
+    index = 0
+    built = []
+    for record_name, rows in records:
+        fields = []
+        for row in rows:
+            # Skip description, validation and content (row[4:7]).
+            number, position, length, raw_type = row[:4]
+            code, formula, decimals, const_value, key = row[7:]
+            fields.append(
+                CompactField(
+                    number,
+                    position,
+                    length,
+                    sys.intern(raw_type),
+                    _intern(code),
+                    formula,
+                    decimals,
+                    _intern(const_value),
+                    key,
+                    text,
+                    index,
+                )
             )
-            for field in rec.get("fields", [])
-        ]
-        records.append(RecordLayout(name=rec["name"], fields=fields))
-    return ReportLayout(name=data.get("name", model), records=records)
+            index += 1
+        built.append(RecordLayout(name=record_name, fields=tuple(fields)))
+    return ReportLayout(name=name, records=tuple(built))
+
+
+def _field_rows(data: Mapping[str, Any]) -> tuple:
+    # (record name, field value rows in ``Field`` attribute order) per record.
+    return tuple(
+        (
+            rec["name"],
+            tuple(
+                tuple(raw[name] if name in raw else _FIELD_DEFAULTS[name] for name in _FIELD_NAMES)
+                for raw in rec.get("fields", [])
+            ),
+        )
+        for rec in data.get("records", [])
+    )
+
+
+def _intern(value: str | None) -> str | None:
+    return None if value is None else sys.intern(value)
+
+
+def _build_field(raw: Mapping[str, Any]) -> Field:
+    # Field is frozen, so its generated __init__ goes through object.__setattr__
+    # once per attribute; filling __dict__ directly is several times faster.
+    field = object.__new__(Field)
+    field.__dict__.update(
+        {name: raw[name] if name in raw else _FIELD_DEFAULTS[name] for name in _FIELD_NAMES}
+    )
+    return field
@@ -0,0 +1,145 @@
+"""Multi-process batch rendering."""
+from __future__ import annotations
+
+import itertools
+import os
+import pickle
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor
+from decimal import Decimal
+from typing import Any, Hashable, Iterable, Iterator, Mapping
+
+from .layout import ReportLayout
+from .renderer import (
+    PostRecordHook,
+    PreRecordHook,
+    RenderResult,
+    ValueHook,
+    _with_ids,
+    render_many,
+)
+
+_WORKER: dict[str, Any] = {}
+
+
+class ParallelRenderer:
+    """
+    Render batches of returns in a pool of worker processes.
+
+    The layout and render options are sent to each worker once, through the
+    pool initializer; tasks only carry chunks of input payloads. Hooks must be
+    picklable, i.e. importable top-level callables.
+
+    Use as a context manager, or call ``close()`` when done.
+    """
+
+    def __init__(
+        self,
+        report: ReportLayout,
+        *,
+        workers: int | None = None,
+        chunksize: int = 256,
+        overrides: Mapping[str, str] | None = None,
+        strict: bool = False,
+        pre_record_hooks: list[PreRecordHook] | None = None,
+        value_hooks: list[ValueHook] | None = None,
+        post_record_hooks: list[PostRecordHook] | None = None,
+        fixed_point: bool = False,
+        mp_context: Any = None,
+    ) -> None:
+        if chunksize < 1:
+            raise ValueError("chunksize must be >= 1")
+        options = {
+            "overrides": overrides,
+            "strict": strict,
+            "pre_record_hooks": pre_record_hooks,
+            "value_hooks": value_hooks,
+            "post_record_hooks": post_record_hooks,
+            "fixed_point": fixed_point,
+        }
+        try:
+            pickle.dumps(options)
+        except (pickle.PicklingError, TypeError, AttributeError) as exc:
+            raise TypeError(
+                f"Render options must be picklable (use top-level hook functions): {exc}"
+            ) from exc
+        self.workers = workers or os.cpu_count() or 1
+        self.chunksize = chunksize
+        self._executor: Executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=mp_context,
+            initializer=_init_worker,
+            initargs=(report, options),
+        )
+
+    def __enter__(self) -> ParallelRenderer:
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=True)
+
+    def render_many(
+        self,
+        items: Iterable[Mapping[str, str | int | float | Decimal]],
+        *,
+        ids: Iterable[Hashable] | None = None,
+    ) -> Iterator[RenderResult]:
+        """
+        Like ``renderer.render_many``, spread over the pool.
+
+        Results come back in input order. Input is consumed lazily, with at
+        most two chunks per worker in flight.
+        """
+        pairs = _with_ids(items, ids)
+        pending: deque = deque()
+        max_pending = self.workers * 2
+        while True:
+            while len(pending) < max_pending:
+                chunk = list(itertools.islice(pairs, self.chunksize))
+                if not chunk:
+                    break
+                pending.append(self._executor.submit(_render_chunk, chunk))
+            if not pending:
+                return
+            yield from pending.popleft().result()
+
+
+def render_many_parallel(
+    report: ReportLayout,
+    items: Iterable[Mapping[str, str | int | float | Decimal]],
+    *,
+    workers: int | None = None,
+    chunksize: int = 256,
+    ids: Iterable[Hashable] | None = None,
+    **options: Any,
+) -> Iterator[RenderResult]:
+    """
+    Render a batch with a temporary ``ParallelRenderer``.
+    """
+    with ParallelRenderer(report, workers=workers, chunksize=chunksize, **options) as renderer:
+        yield from renderer.render_many(items, ids=ids)
+
+
+def _init_worker(report: ReportLayout, options: dict[str, Any]) -> None:
+    _WORKER["report"] = report
+    _WORKER["options"] = options
+
+
+def _render_chunk(chunk: list[tuple[Hashable, Mapping[str, Any]]]) -> list[RenderResult]:
+    ids = [item_id for item_id, _ in chunk]
+    items = [data for _, data in chunk]
+    results = list(render_many(_WORKER["report"], items, ids=ids, **_WORKER["options"]))
+    return [_picklable(result) for result in results]
+
+
+def _picklable(result: RenderResult) -> RenderResult:
+    if result.error is None:
+        return result
+    try:
+        pickle.dumps(result.error)
+    except Exception:
+        return result._replace(error=RuntimeError(repr(result.error)))
+    return result
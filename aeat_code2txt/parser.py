@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import csv
+import json
 import re
 import unicodedata
 from pathlib import Path
@@ -18,7 +19,7 @@ def parse_layout_directory(csv_dir: Path) -> ReportLayout:
     records: list[RecordLayout] = []
     for path in sorted(csv_dir.glob("*.csv")):
         records.append(parse_layout_file(path))
-    return ReportLayout(name=csv_dir.name, records=records)
+    return ReportLayout(name=csv_dir.name, records=records).build_indexes()
 
 
 def parse_layout_file(csv_path: Path) -> RecordLayout:
@@ -68,6 +69,72 @@ def parse_layout_file(csv_path: Path) -> RecordLayout:
     return RecordLayout(name=csv_path.stem, fields=fields)
 
 
+def dump_layout_json(layout: ReportLayout) -> str:
+    """The layout JSON bundled in ``aeat_code2txt/layouts`` (see ``load_layout_json``)."""
+    payload = {
+        "name": layout.name,
+        "records": [
+            {
+                "name": record.name,
+                "fields": [
+                    {
+                        "number": field.number,
+                        "position": field.position,
+                        "length": field.length,
+                        "raw_type": field.raw_type,
+                        "description": field.description,
+                        "validation": field.validation,
+                        "content": field.content,
+                        "code": field.code,
+                        "formula": field.formula,
+                        "decimals": field.decimals,
+                        "const_value": field.const_value,
+                        "key": field.key,
+                    }
+                    for field in record.fields
+                ],
+            }
+            for record in layout.records
+        ],
+    }
+    return json.dumps(payload, indent=2, ensure_ascii=False)
+
+
+def dump_field_catalog(layout: ReportLayout) -> str:
+    """Every field with its record and metadata, as JSON (``examples/fields_*.json``)."""
+    fields = []
+    for record in layout.records:
+        for field in record.fields:
+            fields.append(
+                {
+                    "record": record.name,
+                    "number": field.number,
+                    "position": field.position,
+                    "length": field.length,
+                    "type": field.raw_type.strip(),
+                    "code": field.code,
+                    "key": field.key,
+                    "const": field.const_value,
+                    "decimals": field.decimals,
+                    "formula": field.formula,
+                    "description": field.description,
+                    "validation": field.validation,
+                    "content": field.content,
+                }
+            )
+    payload = {
+        "layout": layout.name,
+        "fields": fields,
+    }
+    return json.dumps(payload, indent=2, ensure_ascii=False)
+
+
+def dump_field_keys(layout: ReportLayout) -> str:
+    """The non-code field keys with empty values, as a JSON template."""
+    keys = (key for key, field in layout.field_by_key().items() if not field.code)
+    return json.dumps(dict.fromkeys(sorted(keys), ""), indent=2, ensure_ascii=False)
+
+
 def _read_csv(path: Path) -> list[list[str]]:
     with path.open("r", encoding="utf-8") as f:
         return [row for row in csv.reader(f)]
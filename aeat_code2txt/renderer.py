@@ -1,13 +1,28 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
+import itertools
 import re
 from decimal import Decimal
-from typing import Callable, Mapping
-
-from .formulas import evaluate_formula
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    BinaryIO,
+    Callable,
+    Hashable,
+    Iterable,
+    Iterator,
+    Mapping,
+    NamedTuple,
+)
+
+from .compiler import CompiledRecord, CompiledReport, compile_record, compile_report
+from .formulas import FormulaGraph
 from .layout import Field, RecordLayout, ReportLayout
 
+if TYPE_CHECKING:
+    from .instrumentation import Call, Instrumentation
+
 
 @dataclass
 class RenderContext:
@@ -23,6 +38,66 @@ PostRecordHook = Callable[[RecordLayout, str, RenderContext], str]
 CODE_KEY_RE = re.compile(r"^\d+$")
 
 
+class FieldHook(NamedTuple):
+    """
+    A value hook that only runs on the fields matching all of its selectors
+    (``None`` matches anything). Build it with ``field_hook``.
+    """
+
+    hook: ValueHook
+    codes: frozenset[str] | None = None
+    keys: frozenset[str] | None = None
+    records: frozenset[str] | None = None
+    raw_types: frozenset[str] | None = None
+
+    def matches(self, record_name: str, field: Field) -> bool:
+        return (
+            (self.codes is None or field.code in self.codes)
+            and (self.keys is None or field.key in self.keys)
+            and (self.records is None or record_name in self.records)
+            and (self.raw_types is None or field.raw_type.strip() in self.raw_types)
+        )
+
+
+def field_hook(
+    hook: ValueHook,
+    *,
+    code: str | Iterable[str] | None = None,
+    key: str | Iterable[str] | None = None,
+    record: str | Iterable[str] | None = None,
+    raw_type: str | Iterable[str] | None = None,
+) -> FieldHook:
+    """
+    Restrict ``hook`` to the fields with one of the given codes, keys, record
+    names and raw types (each a value or several).
+
+    Pass the result in ``value_hooks``, alongside plain hooks which keep
+    running on every field. Selectors are resolved once per record layout,
+    and fields without hooks keep the fast rendering path.
+    """
+    return FieldHook(
+        hook,
+        codes=_selector(code),
+        keys=_selector(key),
+        records=_selector(record),
+        raw_types=_selector(raw_type),
+    )
+
+
+def _selector(value: str | Iterable[str] | None) -> frozenset[str] | None:
+    if value is None:
+        return None
+    if isinstance(value, str):
+        return frozenset((value.strip(),))
+    return frozenset(item.strip() for item in value)
+
+
+class RenderResult(NamedTuple):
+    id: Hashable
+    text: str | None
+    error: Exception | None
+
+
 def render_report(
     report: ReportLayout,
     *,
@@ -34,26 +109,481 @@ def render_report(
     pre_record_hooks: list[PreRecordHook] | None = None,
     value_hooks: list[ValueHook] | None = None,
     post_record_hooks: list[PostRecordHook] | None = None,
+    fixed_point: bool = False,
+    instrumentation: Instrumentation | None = None,
 ) -> str:
+    """
+    Render every record of ``report`` and join them with CRLF.
+
+    With ``fixed_point`` amounts are carried as integers scaled to the
+    layout's decimals (e.g. cents) through formulas and formatting, which
+    avoids ``Decimal`` arithmetic. The output is identical; returns that
+    cannot use it (hooks, constant overrides, amounts with more decimals than
+    the layout) silently render the regular way.
+
+    ``instrumentation`` collects phase timings, counters and hook times (see
+    ``instrumentation.Instrumentation``).
+    """
+    if instrumentation is None:
+        return _render_report(
+            report,
+            amounts,
+            values,
+            overrides or {},
+            data,
+            strict,
+            pre_record_hooks,
+            value_hooks,
+            post_record_hooks,
+            fixed_point,
+        )
+    with instrumentation.track("render") as call:
+        return _render_report(
+            report,
+            amounts,
+            values,
+            overrides or {},
+            data,
+            strict,
+            instrumentation.timed_hooks(pre_record_hooks, "pre_record"),
+            instrumentation.timed_hooks(value_hooks, "value"),
+            instrumentation.timed_hooks(post_record_hooks, "post_record"),
+            fixed_point,
+            call,
+        )
+
+
+def _render_report(
+    report: ReportLayout,
+    amounts: Mapping[str, Decimal] | None,
+    values: Mapping[str, str] | None,
+    overrides: Mapping[str, str],
+    data: Mapping[str, str | int | float | Decimal] | None,
+    strict: bool,
+    pre_record_hooks: list[PreRecordHook] | None,
+    value_hooks: list[ValueHook] | None,
+    post_record_hooks: list[PostRecordHook] | None,
+    fixed_point: bool,
+    call: Call | None = None,
+) -> str:
+    # ``call`` (instrumented renders only) times the phases and counts.
+    compiled = compile_report(report)
+    if call is not None:
+        call.watch.lap("compile")
+    fixed = fixed_point and _fixed_point_ready(
+        compiled, pre_record_hooks, value_hooks, post_record_hooks
+    )
+    amounts, values = _split_inputs(amounts, values, data, convert=not fixed)
+    if strict:
+        _check_known(compiled.known_keys, amounts, values)
+    if call is not None:
+        call.watch.lap("split")
+        call.counts["records"] = len(compiled.records)
+        call.counts["fields"] = sum(len(plan.fields) for plan in compiled.records)
+    if fixed:
+        text = _render_fixed(compiled, amounts, values, overrides, convert=data is not None)
+        if call is not None:
+            call.watch.lap("fixed_point")
+        if text is not None:
+            return text
+        if data is not None:
+            amounts = _decimal_amounts(amounts)
+    return _render_report_compiled(
+        report,
+        compiled,
+        amounts,
+        values,
+        overrides,
+        pre_record_hooks,
+        value_hooks,
+        post_record_hooks,
+        call,
+    )
+
+
+def render_many(
+    report: ReportLayout,
+    items: Iterable[Mapping[str, str | int | float | Decimal]],
+    *,
+    ids: Iterable[Hashable] | None = None,
+    overrides: Mapping[str, str] | None = None,
+    strict: bool = False,
+    pre_record_hooks: list[PreRecordHook] | None = None,
+    value_hooks: list[ValueHook] | None = None,
+    post_record_hooks: list[PostRecordHook] | None = None,
+    workers: int | None = None,
+    chunksize: int = 256,
+    fixed_point: bool = False,
+) -> Iterator[RenderResult]:
+    """
+    Render a batch of single-JSON inputs (as passed to ``render_report(data=...)``).
+
+    Yields one ``RenderResult`` per item, in input order. Items are identified
+    by ``ids`` when given, otherwise by their index; ``ids`` and ``items``
+    of different lengths raise ``ValueError``. A failing item yields its
+    exception in ``error`` and the batch carries on.
+
+    With ``workers`` > 1 the batch is rendered in a process pool of that size,
+    in chunks of ``chunksize`` items (see ``parallel.ParallelRenderer``).
+    ``fixed_point`` is as in ``render_report``.
+    """
+    if workers is not None and workers > 1:
+        from .parallel import render_many_parallel
+
+        yield from render_many_parallel(
+            report,
+            items,
+            workers=workers,
+            chunksize=chunksize,
+            ids=ids,
+            overrides=overrides,
+            strict=strict,
+            pre_record_hooks=pre_record_hooks,
+            value_hooks=value_hooks,
+            post_record_hooks=post_record_hooks,
+            fixed_point=fixed_point,
+        )
+        return
+    compiled = compile_report(report)
+    overrides = overrides or {}
+    fixed = fixed_point and _fixed_point_ready(
+        compiled, pre_record_hooks, value_hooks, post_record_hooks
+    )
+
+    def render(amounts: Mapping[str, Any], values: Mapping[str, str]) -> str:
+        if fixed:
+            text = _render_fixed(compiled, amounts, values, overrides, convert=True)
+            if text is not None:
+                return text
+            amounts = _decimal_amounts(amounts)
+        return _render_report_compiled(
+            report,
+            compiled,
+            amounts,
+            values,
+            overrides,
+            pre_record_hooks,
+            value_hooks,
+            post_record_hooks,
+        )
+
+    yield from _render_batch(compiled, items, ids, strict, render, convert=not fixed)
+
+
+def _with_ids(
+    items: Iterable[Any], ids: Iterable[Hashable] | None
+) -> Iterator[tuple[Hashable, Any]]:
+    # Items paired with their ids (default: their index). Raises ValueError
+    # once ``ids`` and ``items`` turn out to differ in length.
+    if ids is None:
+        return zip(itertools.count(), items)
+    return zip(ids, items, strict=True)
+
+
+def _render_batch(
+    compiled: CompiledReport,
+    items: Iterable[Mapping[str, str | int | float | Decimal]],
+    ids: Iterable[Hashable] | None,
+    strict: bool,
+    render: Callable[[Mapping[str, Any], Mapping[str, str]], Any],
+    *,
+    convert: bool = True,
+    reraise: type[Exception] | tuple[type[Exception], ...] = (),
+) -> Iterator[RenderResult]:
+    # The batch loop shared by the ``render_many`` variants: pair items with
+    # their ids, split and check each one, and report its error per item
+    # (except for ``reraise``).
+    code_keys: dict[str, bool] = {}
+    for item_id, data in _with_ids(items, ids):
+        try:
+            amounts, values = _split_data(data, code_keys, convert=convert)
+            if strict:
+                _check_known(compiled.known_keys, amounts, values)
+            output = render(amounts, values)
+        except reraise:
+            raise
+        except Exception as exc:
+            yield RenderResult(item_id, None, exc)
+        else:
+            yield RenderResult(item_id, output, None)
+
+
+def render_to_stream(
+    report: ReportLayout,
+    items: Iterable[Mapping[str, str | int | float | Decimal]],
+    fp: BinaryIO,
+    *,
+    encoding: str = "iso-8859-1",
+    errors: str = "strict",
+    newline: str = "\r\n",
+    buffer_size: int = 1 << 20,
+    on_error: Callable[[RenderResult], None] | None = None,
+    **options: Any,
+) -> int:
+    """
+    Render a batch straight into a binary file handle and return the number
+    of declarations written.
+
+    Each declaration is encoded (AEAT expects ISO-8859-1) and followed by
+    ``newline``. Output is flushed whenever ``buffer_size`` bytes are pending,
+    so memory use does not grow with the batch. A failing item raises its
+    error unless ``on_error`` is given, in which case it receives the failed
+    ``RenderResult`` and the item is skipped. Other keyword arguments are
+    passed to ``render_many``.
+    """
+    separator = newline.encode(encoding, errors)
+    pending: list[bytes] = []
+    pending_size = 0
+    written = 0
+    for result in _render_many_encoded(report, items, encoding, errors, **options):
+        if result.error is not None:
+            if on_error is None:
+                raise result.error
+            on_error(result)
+            continue
+        chunk = result.text + separator
+        pending.append(chunk)
+        pending_size += len(chunk)
+        written += 1
+        if pending_size >= buffer_size:
+            fp.write(b"".join(pending))
+            pending.clear()
+            pending_size = 0
+    if pending:
+        fp.write(b"".join(pending))
+    return written
+
+
+def render_report_bytes(
+    report: ReportLayout,
+    *,
+    amounts: Mapping[str, Decimal] | None = None,
+    values: Mapping[str, str] | None = None,
+    overrides: Mapping[str, str] | None = None,
+    data: Mapping[str, str | int | float | Decimal] | None = None,
+    strict: bool = False,
+    pre_record_hooks: list[PreRecordHook] | None = None,
+    value_hooks: list[ValueHook] | None = None,
+    post_record_hooks: list[PostRecordHook] | None = None,
+    encoding: str = "iso-8859-1",
+    errors: str = "strict",
+) -> bytes:
+    """
+    Render ``report`` as ``render_report`` does and return it encoded.
+
+    Without hooks or constant overrides the declaration is built by copying a
+    per-layout blank image (constants and padding already encoded) and
+    patching in only the fields that carry data; otherwise the rendered text
+    is encoded.
+    """
+    compiled = compile_report(report)
     amounts, values = _split_inputs(amounts, values, data)
+    overrides = overrides or {}
     if strict:
-        unknown = validate_data(report, amounts=amounts, values=values)
-        if unknown:
-            raise ValueError(f"Unknown data keys: {sorted(unknown)}")
-    records = []
-    for record in report.records:
-        records.append(
-            render_record(
+        _check_known(compiled.known_keys, amounts, values)
+    if not (pre_record_hooks or value_hooks or post_record_hooks):
+        encoded = _render_image(compiled, amounts, values, overrides, encoding, errors)
+        if encoded is not None:
+            return encoded
+    text = _render_report_compiled(
+        report,
+        compiled,
+        amounts,
+        values,
+        overrides,
+        pre_record_hooks,
+        value_hooks,
+        post_record_hooks,
+    )
+    return text.encode(encoding, errors)
+
+
+def _render_image(
+    compiled: CompiledReport,
+    amounts: Mapping[str, Decimal],
+    values: Mapping[str, str],
+    overrides: Mapping[str, str],
+    encoding: str,
+    errors: str,
+) -> bytes | None:
+    # ``None`` when the blank image cannot be used for this layout or input.
+    image = compiled.image(encoding)
+    if image is None:
+        return None
+    if overrides and any(not plan.const_keys.isdisjoint(overrides) for plan in compiled.records):
+        return None
+    computed = compiled.formulas.evaluate(amounts)
+    return compiled.render_image(image, amounts, values, overrides, computed, errors)
+
+
+def _render_many_encoded(
+    report: ReportLayout,
+    items: Iterable[Mapping[str, str | int | float | Decimal]],
+    encoding: str,
+    errors: str,
+    *,
+    ids: Iterable[Hashable] | None = None,
+    overrides: Mapping[str, str] | None = None,
+    strict: bool = False,
+    pre_record_hooks: list[PreRecordHook] | None = None,
+    value_hooks: list[ValueHook] | None = None,
+    post_record_hooks: list[PostRecordHook] | None = None,
+    **options: Any,
+) -> Iterator[RenderResult]:
+    # ``render_many`` with ``text`` encoded (as bytes). Encoding errors are
+    # raised rather than reported per item, as when encoding the text.
+    hooks = pre_record_hooks or value_hooks or post_record_hooks
+    if hooks or options.get("fixed_point") or (options.get("workers") or 0) > 1:
+        for result in render_many(
+            report,
+            items,
+            ids=ids,
+            overrides=overrides,
+            strict=strict,
+            pre_record_hooks=pre_record_hooks,
+            value_hooks=value_hooks,
+            post_record_hooks=post_record_hooks,
+            **options,
+        ):
+            if result.error is None:
+                result = result._replace(text=result.text.encode(encoding, errors))
+            yield result
+        return
+    compiled = compile_report(report)
+    overrides = overrides or {}
+
+    def render(amounts: Mapping[str, Decimal], values: Mapping[str, str]) -> bytes:
+        encoded = _render_image(compiled, amounts, values, overrides, encoding, errors)
+        if encoded is None:
+            text = _render_report_compiled(
+                report, compiled, amounts, values, overrides, None, None, None
+            )
+            encoded = text.encode(encoding, errors)
+        return encoded
+
+    yield from _render_batch(compiled, items, ids, strict, render, reraise=UnicodeEncodeError)
+
+
+def _render_report_compiled(
+    report: ReportLayout,
+    compiled: CompiledReport,
+    amounts: Mapping[str, Decimal],
+    values: Mapping[str, str],
+    overrides: Mapping[str, str],
+    pre_record_hooks: list[PreRecordHook] | None,
+    value_hooks: list[ValueHook] | None,
+    post_record_hooks: list[PostRecordHook] | None,
+    call: Call | None = None,
+) -> str:
+    computed = compiled.formulas.evaluate(amounts)
+    if call is not None:
+        call.watch.lap("formulas")
+    if not (pre_record_hooks or value_hooks or post_record_hooks):
+        records = [plan.render(amounts, values, overrides, computed) for plan in compiled.records]
+    else:
+        records = [
+            _render_compiled(
                 record,
-                amounts=amounts,
-                values=values,
-                overrides=overrides,
-                pre_record_hooks=pre_record_hooks,
-                value_hooks=value_hooks,
-                post_record_hooks=post_record_hooks,
+                plan,
+                compiled.formulas,
+                amounts,
+                values,
+                overrides,
+                computed,
+                pre_record_hooks,
+                value_hooks,
+                post_record_hooks,
             )
-        )
-    return "\r\n".join(records)
+            for record, plan in zip(report.records, compiled.records)
+        ]
+    if call is None:
+        return "\r\n".join(records)
+    call.watch.lap("format")
+    text = "\r\n".join(records)
+    call.watch.lap("join")
+    return text
+
+
+def _fixed_point_ready(compiled: CompiledReport, *hooks: list | None) -> bool:
+    return compiled.scale is not None and not any(hooks)
+
+
+def _render_fixed(
+    compiled: CompiledReport,
+    amounts: Mapping[str, Any],
+    values: Mapping[str, str],
+    overrides: Mapping[str, str],
+    convert: bool,
+) -> str | None:
+    # Returns None when the return has to be rendered with Decimal amounts.
+    if overrides and any(not plan.const_keys.isdisjoint(overrides) for plan in compiled.records):
+        return None
+    scale = compiled.scale
+    text_codes = compiled.text_codes
+    scaled: dict[str, Any] = {}
+    for code, value in amounts.items():
+        if code in text_codes:
+            scaled[code] = value if not convert or type(value) is Decimal else Decimal(str(value))
+            continue
+        if type(value) is str:
+            # Inline the common "123.45" case of _to_scaled.
+            whole, dot, fraction = value.partition(".")
+            if (
+                len(fraction) <= scale
+                and whole.isdecimal()
+                and (fraction.isdecimal() or not dot)
+            ):
+                scaled[code] = int(whole + fraction) * 10 ** (scale - len(fraction))
+                continue
+        value = _to_scaled(value, scale)
+        if value is None:
+            return None
+        scaled[code] = value
+    computed = compiled.formulas.evaluate(scaled, 0)
+    return "\r\n".join(
+        plan.render_scaled(scaled, values, overrides, computed, scale)
+        for plan in compiled.records
+    )
+
+
+def _to_scaled(value: Any, scale: int) -> int | None:
+    """
+    Return ``value`` as an integer multiple of ``10 ** -scale``, or None when
+    it has more decimals than that (it would have to be rounded) or is not finite.
+    """
+    kind = type(value)
+    if kind is int:
+        return value * 10**scale
+    if kind is float:
+        # Same text as the Decimal(str(value)) conversion of regular mode.
+        value = str(value)
+        kind = str
+    if kind is str:
+        # Plain "[-]digits[.digits]" text; anything else goes through Decimal.
+        whole, _, fraction = value.partition(".")
+        if len(fraction) > scale:
+            fraction = fraction.rstrip("0")
+            if len(fraction) > scale:
+                return None
+        digits = whole[1:] if whole[:1] == "-" else whole
+        if digits.isdecimal() and (not fraction or fraction.isdecimal()):
+            return int(whole + fraction) * 10 ** (scale - len(fraction))
+    if kind is not Decimal:
+        value = Decimal(str(value))
+    if not value.is_finite():
+        return None
+    scaled = value.scaleb(scale)
+    integral = scaled.to_integral_value()
+    if scaled != integral:
+        return None
+    return int(integral)
+
+
+def _decimal_amounts(amounts: Mapping[str, Any]) -> dict[str, Decimal]:
+    return {
+        code: value if type(value) is Decimal else Decimal(str(value))
+        for code, value in amounts.items()
+    }
 
 
 def render_record(
@@ -71,29 +601,44 @@ def render_record(
     amounts, values = _split_inputs(amounts, values, data)
     values = values or {}
     overrides = overrides or {}
+    plan = compile_record(record)
     if strict:
-        unknown = validate_data(record, amounts=amounts, values=values)
-        if unknown:
-            raise ValueError(f"Unknown data keys: {sorted(unknown)}")
+        _check_known(plan.known_keys, amounts, values)
+    return _render_compiled(
+        record,
+        plan,
+        plan.formulas,
+        amounts,
+        values,
+        overrides,
+        plan.formulas.evaluate(amounts),
+        pre_record_hooks,
+        value_hooks,
+        post_record_hooks,
+    )
+
+
+def _render_compiled(
+    record: RecordLayout,
+    plan: CompiledRecord,
+    formulas: FormulaGraph,
+    amounts: Mapping[str, Decimal],
+    values: Mapping[str, str],
+    overrides: Mapping[str, str],
+    computed: Mapping[str, Decimal],
+    pre_record_hooks: list[PreRecordHook] | None,
+    value_hooks: list[ValueHook] | None,
+    post_record_hooks: list[PostRecordHook] | None,
+) -> str:
     context = RenderContext(amounts=amounts, values=values, overrides=overrides)
 
     if pre_record_hooks:
         for hook in pre_record_hooks:
             hook(record, context)
+        # Hooks may adjust the inputs, so formulas see their changes.
+        computed = formulas.evaluate(amounts)
 
-    computed = _compute_values(record, amounts)
-    length = record.length()
-    buffer = [" "] * length
-
-    for field in record.fields:
-        raw = _resolve_field_value(field, amounts, values, overrides, computed)
-        if value_hooks:
-            for hook in value_hooks:
-                raw = hook(field, raw, context)
-        formatted = _format_field(field, raw)
-        _write(buffer, field.position, field.length, formatted)
-
-    text = "".join(buffer)
+    text = plan.render(amounts, values, overrides, computed, value_hooks, context)
     if post_record_hooks:
         for hook in post_record_hooks:
             text = hook(record, text, context)
@@ -104,18 +649,32 @@ def _split_inputs(
     amounts: Mapping[str, Decimal] | None,
     values: Mapping[str, str] | None,
     data: Mapping[str, str | int | float | Decimal] | None,
+    convert: bool = True,
 ) -> tuple[Mapping[str, Decimal], Mapping[str, str]]:
     if data is None:
         return amounts or {}, values or {}
     if amounts or values:
         raise ValueError("Provide either data or amounts/values, not both.")
+    return _split_data(data, {}, convert)
+
+
+def _split_data(
+    data: Mapping[str, str | int | float | Decimal],
+    code_keys: dict[str, bool],
+    convert: bool = True,
+) -> tuple[dict[str, Decimal], dict[str, str]]:
+    # With ``convert`` False amounts keep their input type (fixed-point mode).
     amt: dict[str, Decimal] = {}
     vals: dict[str, str] = {}
     for key, value in data.items():
-        if CODE_KEY_RE.match(str(key)):
-            amt[str(key)] = Decimal(str(value))
+        key = str(key)
+        is_code = code_keys.get(key)
+        if is_code is None:
+            is_code = code_keys[key] = CODE_KEY_RE.match(key) is not None
+        if is_code:
+            amt[key] = value if not convert or type(value) is Decimal else Decimal(str(value))
         else:
-            vals[str(key)] = str(value)
+            vals[key] = str(value)
     return amt, vals
 
 
@@ -125,102 +684,23 @@ def validate_data(
     amounts: Mapping[str, Decimal] | None = None,
     values: Mapping[str, str] | None = None,
 ) -> set[str]:
-    amounts = amounts or {}
-    values = values or {}
-    known = set()
-    if isinstance(target, ReportLayout):
-        records = target.records
-    else:
-        records = [target]
-    for record in records:
-        for field in record.fields:
-            if field.code:
-                known.add(field.code)
-            if field.key:
-                known.add(field.key)
-    provided = set(map(str, amounts.keys())) | set(map(str, values.keys()))
-    return provided - known
-
-
-def _compute_values(record: RecordLayout, amounts: Mapping[str, Decimal]) -> dict[str, Decimal]:
-    computed: dict[str, Decimal] = {}
+    return _unknown_keys(target.known_keys, amounts or {}, values or {})
 
-    def compute(field: Field) -> Decimal:
-        if field.code in computed:
-            return computed[field.code]
-        if not field.formula:
-            return amounts.get(field.code, Decimal(0))
-        values = {**amounts, **computed}
-        result = evaluate_formula(field.formula, values)
-        computed[field.code] = result
-        return result
 
-    for field in record.fields:
-        if field.code and field.formula:
-            compute(field)
-    return computed
+def _unknown_keys(
+    known: frozenset[str],
+    amounts: Mapping[str, Decimal],
+    values: Mapping[str, str],
+) -> set[str]:
+    provided = set(map(str, amounts.keys())) | set(map(str, values.keys()))
+    return provided - known
 
 
-def _resolve_field_value(
-    field: Field,
+def _check_known(
+    known: frozenset[str],
     amounts: Mapping[str, Decimal],
     values: Mapping[str, str],
-    overrides: Mapping[str, str],
-    computed: Mapping[str, Decimal],
-) -> str:
-    if field.key in overrides:
-        return str(overrides[field.key])
-    if field.code and field.code in overrides:
-        return str(overrides[field.code])
-    if field.const_value is not None:
-        return field.const_value
-    if field.code:
-        if field.code in computed:
-            return str(computed[field.code])
-        if field.code in amounts:
-            return str(amounts[field.code])
-    if field.key in values:
-        return str(values[field.key])
-    return ""
-
-
-def _format_field(field: Field, raw: str) -> str:
-    if raw is None:
-        raw = ""
-    if field.const_value is not None:
-        return _format_text(str(raw), field.length)
-    if field.raw_type.strip().startswith("A"):
-        return _format_text(str(raw), field.length)
-    if field.raw_type.strip().startswith("An"):
-        return _format_text(str(raw), field.length)
-
-    decimals = field.decimals if field.decimals is not None else 0
-    return _format_number(raw, field.length, decimals, field.raw_type)
-
-
-def _format_text(value: str, length: int) -> str:
-    if len(value) > length:
-        return value[:length]
-    return value.ljust(length)
-
-
-def _format_number(value: str, length: int, decimals: int, raw_type: str) -> str:
-    num = Decimal(str(value or "0"))
-    sign = ""
-    if num < 0:
-        if raw_type.strip() == "N":
-            sign = "N"
-        else:
-            raise ValueError(f"Negative value not allowed for type {raw_type}")
-    num = abs(num)
-    text = f"{num:.{decimals}f}".replace(".", "")
-    text = text.rjust(length - len(sign), "0")
-    return f"{sign}{text}"
-
-
-def _write(buffer: list[str], position: int, length: int, value: str) -> None:
-    start = position - 1
-    end = start + length
-    if len(value) != length:
-        raise ValueError(f"Field length mismatch at pos {position}: {len(value)} != {length}")
-    buffer[start:end] = list(value)
+) -> None:
+    unknown = _unknown_keys(known, amounts, values)
+    if unknown:
+        raise ValueError(f"Unknown data keys: {sorted(unknown)}")
@@ -1,12 +1,20 @@
 from __future__ import annotations
 
+import io
+import itertools
 from dataclasses import dataclass
 from decimal import Decimal
-from typing import Mapping
+from typing import TYPE_CHECKING, Any, Callable, Iterable, Iterator, Mapping, NamedTuple
 
-from .formulas import evaluate_formula
+from .compiler import compile_report
+from .formulas import FormulaNode
 from .layout import Field, ReportLayout
 
+if TYPE_CHECKING:
+    from .instrumentation import Call, Instrumentation
+
+Buffer = Any  # bytes, bytearray, memoryview or mmap.mmap
+
 
 @dataclass
 class ValidationIssue:
@@ -17,82 +25,304 @@ class ValidationIssue:
     message: str
 
 
-def parse_report(text: str, report: ReportLayout) -> dict[str, str]:
+class FieldSlice(NamedTuple):
+    offset: int
+    length: int
+    key: str
+    converter: Callable[[bytes], Any]
+
+
+class RecordSlices(NamedTuple):
+    name: str
+    length: int
+    slices: tuple[FieldSlice, ...]
+
+
+def parse_report(
+    text: str, report: ReportLayout, *, instrumentation: Instrumentation | None = None
+) -> dict[str, str]:
     """
     Parse a rendered report into a flat dictionary of codes + keys.
+
+    ``instrumentation`` collects phase timings and counters.
     """
+    if instrumentation is None:
+        return _parse_report(text, report)
+    with instrumentation.track("parse") as call:
+        return _parse_report(text, report, call)
+
+
+def _parse_report(text: str, report: ReportLayout, call: Call | None = None) -> dict[str, str]:
+    plan = _parse_plan(report, None, "", False)
+    if call is not None:
+        call.watch.lap("plan")
     lines = text.splitlines()
+    if call is not None:
+        call.watch.lap("split")
     data: dict[str, str] = {}
-    for record, line in zip(report.records, lines):
+    for record, line in zip(plan, lines):
+        for offset, length, key, _ in record.slices:
+            data[key] = line[offset : offset + length].strip()
+    if call is not None:
+        call.watch.lap("slice")
+        parsed = plan[: len(lines)]
+        call.counts["records"] = len(parsed)
+        call.counts["fields"] = sum(len(record.slices) for record in parsed)
+    return data
+
+
+def parse_report_bytes(
+    buffer: Buffer,
+    report: ReportLayout,
+    *,
+    fields: Iterable[str] | None = None,
+    encoding: str = "iso-8859-1",
+    typed: bool = False,
+    start: int = 0,
+    end: int | None = None,
+) -> dict[str, Any]:
+    """
+    Parse one declaration from a bytes-like buffer (bytes, memoryview, mmap).
+
+    Records are located by their layout lengths, so only the requested
+    ``fields`` (codes such as ``"71"`` / ``"[71]"`` or keys) are copied and
+    decoded; records without requested fields are skipped untouched. With
+    ``typed`` numeric fields are returned as ``Decimal``, otherwise values are
+    stripped strings as in ``parse_report``. ``encoding`` must be single-byte
+    (AEAT files are ISO-8859-1) so byte offsets match field positions.
+
+    ``start``/``end`` bound the declaration inside a larger buffer.
+    """
+    plan = _parse_plan(report, _projection(fields), encoding, typed)
+    data: dict[str, Any] = {}
+    size = len(buffer) if end is None else min(end, len(buffer))
+    pos = start
+    for record in plan:
+        if pos >= size:
+            break
+        line_end = _line_end(buffer, pos, record.length, size)
+        for offset, length, key, converter in record.slices:
+            a = pos + offset
+            b = min(a + length, line_end)
+            data[key] = converter(bytes(buffer[a:b]) if a < b else b"")
+        pos = _next_line(buffer, line_end, size)
+    return data
+
+
+def _projection(fields: Iterable[str] | None) -> frozenset[str] | None:
+    if fields is None:
+        return None
+    return frozenset(str(name).strip().strip("[]") for name in fields)
+
+
+def _parse_plan(
+    report: ReportLayout,
+    fields: frozenset[str] | None,
+    encoding: str,
+    typed: bool,
+) -> tuple[RecordSlices, ...]:
+    compiled = compile_report(report)
+    cache_key = ("parse", fields, encoding, typed)
+    plan = compiled.cache.get(cache_key)
+    if plan is not None:
+        return plan
+
+    def text(raw: bytes) -> str:
+        return raw.decode(encoding).strip()
+
+    found: set[str] = set()
+    records = []
+    for record in compiled.records:
+        slices = []
         for field in record.fields:
-            raw = _slice(line, field.position, field.length)
             if field.const_value is not None:
                 continue
             key = field.code or field.key
             if not key:
                 continue
-            data[key] = raw.strip()
-    return data
+            if fields is not None:
+                if key not in fields and field.key not in fields:
+                    continue
+                found.add(key if key in fields else field.key)
+            converter = text
+            if typed and field.raw_type.strip().startswith(("N", "Num")):
+                converter = _number_converter(encoding, field.decimals)
+            slices.append(FieldSlice(field.position - 1, field.length, key, converter))
+        records.append(RecordSlices(record.name, record.length, tuple(slices)))
+    if fields is not None and found != fields:
+        raise KeyError(f"Unknown fields: {sorted(fields - found)}")
+    # Trailing records without requested fields need not be visited at all.
+    while records and not records[-1].slices:
+        records.pop()
+    plan = compiled.cache[cache_key] = tuple(records)
+    return plan
 
 
-def validate_report(text: str, report: ReportLayout) -> list[ValidationIssue]:
-    lines = text.splitlines()
-    issues: list[ValidationIssue] = []
-    values: dict[str, Decimal] = {}
+def _number_converter(encoding: str, decimals: int | None) -> Callable[[bytes], Decimal]:
+    def convert(raw: bytes) -> Decimal:
+        return _parse_number(raw.decode(encoding), decimals)
 
-    for record, line in zip(report.records, lines):
-        for field in record.fields:
-            raw = _slice(line, field.position, field.length)
-            if field.const_value is not None:
-                if raw != field.const_value.ljust(field.length):
-                    issues.append(
-                        ValidationIssue(
-                            record=record.name,
-                            field_number=field.number,
-                            key=field.key,
-                            code=field.code,
-                            message=f"Const mismatch: '{raw}'",
-                        )
-                    )
+    return convert
+
+
+def _line_end(buffer: Buffer, pos: int, length: int, size: int) -> int:
+    end = pos + length
+    if end >= size or buffer[end] in b"\r\n":
+        return min(end, size)
+    # Line does not have its layout length: look for the actual line break.
+    end = pos
+    while end < size and buffer[end] not in b"\r\n":
+        end += 1
+    return end
+
+
+def _next_line(buffer: Buffer, end: int, size: int) -> int:
+    if end < size and buffer[end] == 13:
+        end += 1
+    if end < size and buffer[end] == 10:
+        end += 1
+    return end
+
+
+def validate_report(
+    text: str,
+    report: ReportLayout,
+    *,
+    max_issues: int | None = None,
+    fail_fast: bool = False,
+    instrumentation: Instrumentation | None = None,
+) -> list[ValidationIssue]:
+    """
+    Check constants, numeric fields and formulas of a rendered report.
+
+    Stops after ``max_issues`` issues, or at the first one with ``fail_fast``.
+    ``instrumentation`` collects phase timings and counters, issues by type.
+    """
+    limit = 1 if fail_fast else max_issues
+    if instrumentation is None:
+        return list(itertools.islice(iter_issues(text, report), limit))
+    with instrumentation.track("validate") as call:
+        call.counts.update(records=0, fields=0)
+        plan = _validation_plan(report)
+        call.watch.lap("plan")
+        issues = list(itertools.islice(_iter_issues(text, plan, call.counts), limit))
+        call.watch.lap("checks")
+        for issue in issues:
+            kind = _issue_type(issue)
+            call.issues[kind] = call.issues.get(kind, 0) + 1
+        return issues
+
+
+def iter_issues(text: str, report: ReportLayout) -> Iterator[ValidationIssue]:
+    """
+    Yield validation issues as they are found, in a single pass over the lines.
+
+    Each formula is checked right after the last record holding its inputs,
+    so consumers can stop at the first issue without reading the rest.
+    """
+    yield from _iter_issues(text, _validation_plan(report))
+
+
+def _iter_issues(
+    text: str, plan: tuple[_RecordChecks, ...], stats: dict[str, int] | None = None
+) -> Iterator[ValidationIssue]:
+    values: dict[str, Decimal] = {}
+    processed = 0
+    for record, line in zip(plan, _iter_lines(text)):
+        processed += 1
+        if stats is not None:
+            stats["records"] += 1
+            stats["fields"] += len(record.checks)
+        for field, expected, numeric in record.checks:
+            raw = line[field.position - 1 : field.position - 1 + field.length]
+            if expected is not None:
+                if raw != expected:
+                    yield _issue(record.name, field, f"Const mismatch: '{raw}'")
                 continue
-            if field.code and field.raw_type.strip().startswith(("N", "Num")):
+            if numeric:
                 try:
                     values[field.code] = _parse_number(raw, field.decimals)
                 except ValueError as exc:
-                    issues.append(
-                        ValidationIssue(
-                            record=record.name,
-                            field_number=field.number,
-                            key=field.key,
-                            code=field.code,
-                            message=str(exc),
-                        )
-                    )
-
-    for record, line in zip(report.records, lines):
+                    yield _issue(record.name, field, str(exc))
+                except ArithmeticError:
+                    yield _issue(record.name, field, f"Invalid number: '{raw}'")
+        yield from _check_formulas(record.formulas, values)
+    # Formulas waiting on records missing from the text use what was read.
+    for record in plan[processed:]:
+        yield from _check_formulas(record.formulas, values)
+
+
+def _issue_type(issue: ValidationIssue) -> str:
+    if issue.message.startswith("Const mismatch"):
+        return "const"
+    if issue.message.startswith("Formula mismatch"):
+        return "formula"
+    return "number"
+
+
+class _RecordChecks(NamedTuple):
+    name: str
+    checks: tuple[tuple[Field, str | None, bool], ...]
+    formulas: tuple[FormulaNode, ...]
+
+
+def _validation_plan(report: ReportLayout) -> tuple[_RecordChecks, ...]:
+    compiled = compile_report(report)
+    plan = compiled.cache.get("validate")
+    if plan is not None:
+        return plan
+    checks = []
+    last_seen: dict[str, int] = {}
+    for index, record in enumerate(compiled.records):
+        record_checks = []
         for field in record.fields:
-            if field.code and field.formula:
-                expected = evaluate_formula(field.formula, values)
-                actual = values.get(field.code)
-                if actual is None:
-                    continue
-                if actual != expected:
-                    issues.append(
-                        ValidationIssue(
-                            record=record.name,
-                            field_number=field.number,
-                            key=field.key,
-                            code=field.code,
-                            message=f"Formula mismatch: {actual} != {expected}",
-                        )
-                    )
-    return issues
-
-
-def _slice(line: str, position: int, length: int) -> str:
-    start = position - 1
-    end = start + length
-    return line[start:end]
+            if field.const_value is not None:
+                record_checks.append((field, field.const_value.ljust(field.length), False))
+            elif field.code and field.raw_type.strip().startswith(("N", "Num")):
+                record_checks.append((field, None, True))
+                last_seen[field.code] = index
+        checks.append(tuple(record_checks))
+
+    scheduled: list[list[FormulaNode]] = [[] for _ in checks]
+    last = len(checks) - 1
+    for node in compiled.formulas.nodes:
+        if node.code not in last_seen:
+            continue  # never parsed, so never checked
+        ready = max(last_seen.get(code, 0) for code in (node.code, *node.compiled.codes))
+        scheduled[min(ready, last)].append(node)
+    plan = compiled.cache["validate"] = tuple(
+        _RecordChecks(record.name, record_checks, tuple(nodes))
+        for record, record_checks, nodes in zip(compiled.records, checks, scheduled)
+    )
+    return plan
+
+
+def _check_formulas(
+    nodes: Iterable[FormulaNode], values: Mapping[str, Decimal]
+) -> Iterator[ValidationIssue]:
+    for node in nodes:
+        actual = values.get(node.code)
+        if actual is None:
+            continue
+        expected = node.compiled.evaluate(values)
+        if actual != expected:
+            yield _issue(node.record, node.field, f"Formula mismatch: {actual} != {expected}")
+
+
+def _issue(record: str, field: Field, message: str) -> ValidationIssue:
+    return ValidationIssue(
+        record=record,
+        field_number=field.number,
+        key=field.key,
+        code=field.code,
+        message=message,
+    )
+
+
+def _iter_lines(text: str) -> Iterator[str]:
+    # Lazy equivalent of text.splitlines() for \r\n, \n and \r line breaks.
+    for line in io.StringIO(text, newline=""):
+        yield line.rstrip("\r\n")
 
 
 def _parse_number(raw: str, decimals: int | None) -> Decimal:
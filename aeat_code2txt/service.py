@@ -0,0 +1,383 @@
+"""
+Asyncio front end rendering and validating in a shared process pool.
+
+    python -m aeat_code2txt.service --port 8080 303 390
+
+starts a small stdlib HTTP server for local testing:
+
+    POST /render/<model>     JSON payload (as render_report(data=...)) -> text
+    POST /validate/<model>   declaration text -> JSON list of issues
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import dataclasses
+import json
+import logging
+import os
+import pickle
+from concurrent.futures import Executor, Future, ProcessPoolExecutor
+from decimal import Decimal
+from typing import Any, Iterable, Mapping
+
+from .layout_loader import bundled_models, load_layout
+from .renderer import render_report
+from .reverse import ValidationIssue, validate_report
+
+_LAYOUTS: dict[str, Any] = {}
+
+logger = logging.getLogger(__name__)
+
+
+class ServiceOverloaded(RuntimeError):
+    """Raised when the queue of waiting requests is full."""
+
+
+class RenderService:
+    """
+    Render and validate from asyncio code without blocking the event loop.
+
+    Work runs in a process pool shared by every request; each worker loads
+    ``models`` once when it starts. Requests arriving in the same loop
+    iteration are sent to the pool together, in batches of up to
+    ``batch_size``, so per-task overhead is paid per batch.
+
+    At most ``max_in_flight`` requests are in the pool at a time; the others
+    wait for a slot (backpressure), and once ``max_waiting`` are waiting new
+    requests fail with ``ServiceOverloaded``. ``timeout`` (seconds, per
+    request, queueing included) raises ``asyncio.TimeoutError``; a request
+    already running in a worker finishes there but its result is dropped.
+
+    Use as an async context manager, or await ``close()`` when done.
+    """
+
+    def __init__(
+        self,
+        models: Iterable[str] | None = None,
+        *,
+        workers: int | None = None,
+        max_in_flight: int = 1024,
+        max_waiting: int | None = None,
+        timeout: float | None = 30.0,
+        batch_size: int = 64,
+        mp_context: Any = None,
+    ) -> None:
+        if max_in_flight < 1 or batch_size < 1:
+            raise ValueError("max_in_flight and batch_size must be >= 1")
+        self.models = tuple(bundled_models() if models is None else models)
+        self.workers = workers or os.cpu_count() or 1
+        self.max_in_flight = max_in_flight
+        self.max_waiting = max_waiting
+        self.timeout = timeout
+        self.batch_size = batch_size
+        self._executor: Executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=mp_context,
+            initializer=_init_worker,
+            initargs=(self.models,),
+        )
+        self._slots: asyncio.Semaphore | None = None
+        self._in_flight = 0
+        self._waiting = 0
+        self._batch: list[tuple[tuple, asyncio.Future]] = []
+        self._flush_scheduled = False
+
+    async def __aenter__(self) -> RenderService:
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+    async def close(self) -> None:
+        await asyncio.get_running_loop().run_in_executor(None, self._executor.shutdown)
+
+    @property
+    def in_flight(self) -> int:
+        """Requests currently holding a pool slot."""
+        return self._in_flight
+
+    @property
+    def waiting(self) -> int:
+        """Requests waiting for a pool slot."""
+        return self._waiting
+
+    async def render(
+        self,
+        model: str,
+        data: Mapping[str, str | int | float | Decimal],
+        *,
+        overrides: Mapping[str, str] | None = None,
+        strict: bool = False,
+        fixed_point: bool = False,
+        timeout: float | None = None,
+    ) -> str:
+        """``render_report(load_layout(model), data=data, ...)`` in the pool."""
+        options = {"overrides": overrides, "strict": strict, "fixed_point": fixed_point}
+        return await self._submit(("render", model, data, options), timeout)
+
+    async def validate(
+        self,
+        model: str,
+        text: str,
+        *,
+        max_issues: int | None = None,
+        fail_fast: bool = False,
+        timeout: float | None = None,
+    ) -> list[ValidationIssue]:
+        """``validate_report(text, load_layout(model), ...)`` in the pool."""
+        options = {"max_issues": max_issues, "fail_fast": fail_fast}
+        return await self._submit(("validate", model, text, options), timeout)
+
+    async def _submit(self, task: tuple, timeout: float | None) -> Any:
+        if task[1] not in self.models:
+            raise ValueError(f"Model {task[1]!r} is not served (loaded: {list(self.models)})")
+        timeout = self.timeout if timeout is None else timeout
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_in_flight)
+        if self._slots.locked():
+            if self.max_waiting is not None and self._waiting >= self.max_waiting:
+                raise ServiceOverloaded(f"{self._waiting} requests already waiting")
+        return await asyncio.wait_for(self._run(task), timeout)
+
+    async def _run(self, task: tuple) -> Any:
+        self._waiting += 1
+        try:
+            await self._slots.acquire()
+        finally:
+            self._waiting -= 1
+        self._in_flight += 1
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._batch.append((task, future))
+        if len(self._batch) >= self.batch_size:
+            self._flush()
+        elif not self._flush_scheduled:
+            self._flush_scheduled = True
+            loop.call_soon(self._flush)
+        return await future
+
+    def _flush(self) -> None:
+        self._flush_scheduled = False
+        batch, self._batch = self._batch, []
+        live = []
+        for task, future in batch:
+            if future.done():
+                # Timed out or cancelled before reaching the pool.
+                self._release()
+            else:
+                live.append((task, future))
+        if not live:
+            return
+        loop = asyncio.get_running_loop()
+        try:
+            pool_future = self._executor.submit(_run_batch, [task for task, _ in live])
+        except Exception as exc:
+            self._finish(live, None, exc)
+            return
+        pool_future.add_done_callback(
+            lambda done: loop.call_soon_threadsafe(self._collect, live, done)
+        )
+
+    def _collect(self, live: list, done: Future) -> None:
+        try:
+            results = done.result()
+        except Exception as exc:
+            self._finish(live, None, exc)
+        else:
+            self._finish(live, results, None)
+
+    def _finish(self, live: list, results: list | None, error: Exception | None) -> None:
+        for index, (_, future) in enumerate(live):
+            self._release()
+            if future.done():
+                continue
+            if results is None:
+                future.set_exception(error)
+                continue
+            value, exc = results[index]
+            if exc is None:
+                future.set_result(value)
+            else:
+                future.set_exception(exc)
+
+    def _release(self) -> None:
+        self._in_flight -= 1
+        self._slots.release()
+
+
+def _init_worker(models: tuple[str, ...]) -> None:
+    for model in models:
+        _LAYOUTS[model] = load_layout(model)
+
+
+def _run_batch(tasks: list[tuple]) -> list[tuple[Any, Exception | None]]:
+    results = []
+    for kind, model, payload, options in tasks:
+        try:
+            layout = _LAYOUTS[model]
+            if kind == "render":
+                value = render_report(layout, data=payload, **options)
+            else:
+                value = validate_report(payload, layout, **options)
+        except Exception as exc:
+            results.append((None, _picklable(exc)))
+        else:
+            results.append((value, None))
+    return results
+
+
+def _picklable(exc: Exception) -> Exception:
+    try:
+        pickle.dumps(exc)
+    except Exception:
+        return RuntimeError(repr(exc))
+    return exc
+
+
+# --- stdlib HTTP stand-in --------------------------------------------------
+
+_REASONS = {
+    200: "OK",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    413: "Payload Too Large",
+    500: "Internal Server Error",
+    503: "Service Unavailable",
+    504: "Gateway Timeout",
+}
+
+
+async def serve(
+    service: RenderService,
+    host: str = "127.0.0.1",
+    port: int = 8080,
+    *,
+    max_body: int = 1 << 20,
+) -> asyncio.AbstractServer:
+    """
+    Start a minimal HTTP/1.1 server (keep-alive, ``Content-Length`` bodies)
+    over ``service``. Meant for local testing, not as a production front end.
+    """
+
+    async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                request = await _read_request(reader, max_body)
+                if request is None:
+                    break
+                method, path, body, keep_alive = request
+                status, content_type, payload = await _dispatch(service, method, path, body)
+                writer.write(
+                    f"HTTP/1.1 {status} {_REASONS[status]}\r\n"
+                    f"Content-Type: {content_type}\r\n"
+                    f"Content-Length: {len(payload)}\r\n"
+                    f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode(
+                        "ascii"
+                    )
+                    + payload
+                )
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            # Dropped connection or malformed request line/headers.
+            pass
+        finally:
+            writer.close()
+
+    return await asyncio.start_server(handle, host, port)
+
+
+async def _read_request(
+    reader: asyncio.StreamReader, max_body: int
+) -> tuple[str, str, bytes, bool] | None:
+    line = await reader.readline()
+    if not line:
+        return None
+    method, path, version = line.decode("latin-1").split()
+    headers = {}
+    while True:
+        header = await reader.readline()
+        if header in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = header.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+    length = int(headers.get("content-length", 0))
+    if length > max_body:
+        return method, "", b"", False
+    body = await reader.readexactly(length) if length else b""
+    connection = headers.get("connection", "").lower()
+    keep_alive = connection != "close" if version == "HTTP/1.1" else connection == "keep-alive"
+    return method, path, body, keep_alive
+
+
+async def _dispatch(
+    service: RenderService, method: str, path: str, body: bytes
+) -> tuple[int, str, bytes]:
+    if not path:
+        return _error(413, "request body too large")
+    _, action, model = (path.split("?", 1)[0].rstrip("/").split("/") + ["", ""])[:3]
+    if action not in ("render", "validate") or not model:
+        return _error(404, "use /render/<model> or /validate/<model>")
+    if model not in service.models:
+        return _error(404, f"model {model!r} is not served")
+    if method != "POST":
+        return _error(405, "use POST")
+    try:
+        if action == "render":
+            data = json.loads(body)
+            if not isinstance(data, dict):
+                return _error(400, "expected a JSON object")
+            text = await service.render(model, data)
+            return 200, "text/plain; charset=iso-8859-1", text.encode("iso-8859-1")
+        issues = await service.validate(model, body.decode("iso-8859-1"))
+        payload = json.dumps([dataclasses.asdict(issue) for issue in issues])
+        return 200, "application/json", payload.encode("utf-8")
+    except asyncio.TimeoutError:
+        return _error(504, "timed out")
+    except ServiceOverloaded as exc:
+        return _error(503, str(exc))
+    except (ValueError, TypeError, LookupError, ArithmeticError) as exc:
+        return _error(400, str(exc) or type(exc).__name__)
+    except Exception:
+        logger.exception("%s %s failed", method, path)
+        return _error(500, "internal error")
+
+
+def _error(status: int, message: str) -> tuple[int, str, bytes]:
+    return status, "application/json", json.dumps({"error": message}).encode("utf-8")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Local HTTP stand-in for RenderService")
+    parser.add_argument("models", nargs="*", help="Models preloaded per worker (default: all)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--max-in-flight", type=int, default=1024)
+    parser.add_argument("--timeout", type=float, default=30.0)
+    args = parser.parse_args()
+
+    async def run() -> None:
+        async with RenderService(
+            args.models or None,
+            workers=args.workers,
+            max_in_flight=args.max_in_flight,
+            timeout=args.timeout,
+        ) as service:
+            server = await serve(service, args.host, args.port)
+            print(f"listening on http://{args.host}:{args.port}")
+            async with server:
+                await server.serve_forever()
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,215 @@
+"""Incremental re-rendering of a single declaration."""
+from __future__ import annotations
+
+from collections import ChainMap
+from decimal import Decimal
+from typing import Any, Mapping, NamedTuple
+
+from .compiler import CompiledReport, Slot, compile_report
+from .layout import ReportLayout
+from .renderer import CODE_KEY_RE, _check_known, _split_data
+
+
+class _SessionIndex(NamedTuple):
+    # Slots of tiled records by the code/key they read, as (record index, slot).
+    slots: dict[str, tuple[tuple[int, Slot], ...]]
+    # Records by the codes/keys they know, for records rendered as a whole.
+    records: dict[str, tuple[int, ...]]
+    # Formula codes depending (transitively) on each code.
+    dependents: dict[str, frozenset[str]]
+    # Position of each formula code in the evaluation order.
+    order: dict[str, int]
+
+
+class RenderSession:
+    """
+    A rendered declaration kept in memory for cheap edits.
+
+    The session renders ``data`` once and keeps each record's pieces and the
+    computed formula values. ``update`` then re-evaluates only the formulas
+    that depend on the changed inputs and re-formats only the slots reading a
+    changed code or key, so its cost follows the size of the change rather
+    than the layout. Records that cannot be patched slot by slot (untiled,
+    or with constants replaced through ``overrides``) are re-rendered whole
+    when touched.
+
+    Hooks are not supported; use ``render_report`` for them.
+    """
+
+    def __init__(
+        self,
+        report: ReportLayout,
+        data: Mapping[str, Any] | None = None,
+        *,
+        overrides: Mapping[str, str] | None = None,
+        strict: bool = False,
+    ) -> None:
+        self.report = report
+        self.strict = strict
+        self._compiled = compile_report(report)
+        self._index = _session_index(self._compiled)
+        self._overrides = dict(overrides or {})
+        amounts, values = _split_data(data or {}, {})
+        if strict:
+            _check_known(self._compiled.known_keys, amounts, values)
+        self._amounts: dict[str, Decimal] = amounts
+        self._values: dict[str, str] = values
+        self._computed = self._compiled.formulas.evaluate(amounts)
+        self._pieces: list[list[str] | None] = []
+        self._records: list[str] = []
+        for plan in self._compiled.records:
+            if plan.tiled and (
+                not self._overrides or plan.const_keys.isdisjoint(self._overrides)
+            ):
+                pieces = list(plan.pieces)
+                for slot in plan.slots:
+                    pieces[slot.index] = plan.render_slot(
+                        slot, amounts, values, self._overrides, self._computed
+                    )
+                self._pieces.append(pieces)
+                self._records.append("".join(pieces))
+            else:
+                self._pieces.append(None)
+                self._records.append(
+                    plan.render(amounts, values, self._overrides, self._computed)
+                )
+        self._text: str | None = None
+
+    @property
+    def text(self) -> str:
+        """The current declaration, records joined with CRLF."""
+        if self._text is None:
+            self._text = "\r\n".join(self._records)
+        return self._text
+
+    @property
+    def records(self) -> tuple[str, ...]:
+        """The current text of each record, in layout order."""
+        return tuple(self._records)
+
+    @property
+    def computed(self) -> Mapping[str, Decimal]:
+        """The current value of every formula code."""
+        return dict(self._computed)
+
+    def update(self, changes: Mapping[str, Any]) -> str:
+        """
+        Apply new input values (as in ``render_report(data=...)``; ``None``
+        removes an input) and return the updated text.
+
+        The update is atomic: if a changed value cannot be rendered, the
+        error is raised and the session keeps its previous state.
+        """
+        amounts, values = _split_data(
+            {key: value for key, value in changes.items() if value is not None}, {}
+        )
+        removed = [str(key) for key, value in changes.items() if value is None]
+        if self.strict:
+            _check_known(self._compiled.known_keys, amounts, values)
+        new_amounts = dict(self._amounts)
+        new_values = dict(self._values)
+        for key in removed:
+            target = new_amounts if CODE_KEY_RE.match(key) else new_values
+            target.pop(key, None)
+        new_amounts.update(amounts)
+        new_values.update(values)
+
+        changed = set(amounts) | set(values) | set(removed)
+        computed = self._evaluate(changed, new_amounts)
+        changed.update(
+            code for code, value in computed.items() if self._computed.get(code) != value
+        )
+        new_computed = {**self._computed, **computed} if computed else self._computed
+
+        patched: dict[int, list[str]] = {}
+        whole: set[int] = set()
+        index = self._index
+        for name in changed:
+            for record_index, slot in index.slots.get(name, ()):
+                pieces = self._pieces[record_index]
+                if pieces is None:
+                    continue
+                if record_index not in patched:
+                    patched[record_index] = list(pieces)
+                plan = self._compiled.records[record_index]
+                patched[record_index][slot.index] = plan.render_slot(
+                    slot, new_amounts, new_values, self._overrides, new_computed
+                )
+            for record_index in index.records.get(name, ()):
+                if self._pieces[record_index] is None:
+                    whole.add(record_index)
+        rendered = {
+            record_index: self._compiled.records[record_index].render(
+                new_amounts, new_values, self._overrides, new_computed
+            )
+            for record_index in whole
+        }
+
+        self._amounts, self._values, self._computed = new_amounts, new_values, new_computed
+        for record_index, pieces in patched.items():
+            self._pieces[record_index] = pieces
+            self._records[record_index] = "".join(pieces)
+        for record_index, text in rendered.items():
+            self._records[record_index] = text
+        if patched or rendered:
+            self._text = None
+        return self.text
+
+    def _evaluate(self, changed: set[str], amounts: Mapping[str, Decimal]) -> dict[str, Decimal]:
+        # Re-evaluate the formulas downstream of ``changed``, in graph order.
+        index = self._index
+        affected: set[str] = set()
+        for name in changed:
+            affected |= index.dependents.get(name, frozenset())
+        if not affected:
+            return {}
+        nodes = self._compiled.formulas.nodes
+        computed: dict[str, Decimal] = {}
+        store = ChainMap(computed, self._computed, amounts)
+        for position in sorted(index.order[code] for code in affected):
+            node = nodes[position]
+            computed[node.code] = node.compiled.evaluate(store)
+        return computed
+
+
+def _session_index(compiled: CompiledReport) -> _SessionIndex:
+    index = compiled.cache.get("session")
+    if index is not None:
+        return index
+    slots: dict[str, list[tuple[int, Slot]]] = {}
+    records: dict[str, list[int]] = {}
+    for record_index, plan in enumerate(compiled.records):
+        for slot in plan.slots:
+            for name in {slot.code, slot.key} - {None}:
+                slots.setdefault(name, []).append((record_index, slot))
+        for name in plan.known_keys:
+            records.setdefault(name, []).append(record_index)
+
+    nodes = compiled.formulas.nodes
+    direct: dict[str, set[str]] = {}
+    for node in nodes:
+        for code in node.compiled.codes:
+            direct.setdefault(code, set()).add(node.code)
+    dependents: dict[str, frozenset[str]] = {}
+    # Nodes are in dependency order, so walking them backwards sees every
+    # formula's dependents before the formula itself.
+    for node in reversed(nodes):
+        closure = set()
+        for parent in direct.get(node.code, ()):
+            closure.add(parent)
+            closure |= dependents[parent]
+        dependents[node.code] = frozenset(closure)
+    for code, parents in direct.items():
+        if code not in dependents:
+            closure = set(parents)
+            for parent in parents:
+                closure |= dependents[parent]
+            dependents[code] = frozenset(closure)
+
+    index = compiled.cache["session"] = _SessionIndex(
+        slots={name: tuple(entries) for name, entries in slots.items()},
+        records={name: tuple(entries) for name, entries in records.items()},
+        dependents=dependents,
+        order={node.code: position for position, node in enumerate(nodes)},
+    )
+    return index
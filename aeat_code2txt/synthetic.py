@@ -0,0 +1,352 @@
+"""
+Random input payloads shaped by a layout, for load and soak tests.
+
+    python -m aeat_code2txt.synthetic 303 --count 1000000 --seed 7 --workers 4 > 303.jsonl
+
+writes one JSON payload per line, ready for ``render_report(layout, data=...)``.
+"""
+from __future__ import annotations
+
+import argparse
+import itertools
+import json
+import os
+import random
+import sys
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import IO, Any, Iterator, NamedTuple
+
+from .compiler import Slot, _format_scaled, _make_slot, compile_report
+from .layout import ReportLayout
+
+# Payloads drawn from one random stream; chunk ``n`` of seed ``s`` is seeded
+# with "s:n", so the output does not depend on the number of workers.
+CHUNK_SIZE = 1024
+
+# Integer digits of generated amounts, at most (up to 999 999 999).
+MAX_DIGITS = 9
+
+_TEXT = "ABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789 "
+_DIGITS = "0123456789"
+_WORKER: dict[str, Any] = {}
+
+
+class _Input(NamedTuple):
+    name: str
+    numeric: bool
+    alphabet: str
+    # Text: maximum length. Numbers: maximum integer digits.
+    size: int
+    decimals: int
+    signed: bool
+
+
+class PayloadGenerator:
+    """
+    Random returns for ``report`` that render without errors.
+
+    Every input field (not constant, not computed by a formula) gets a value
+    within its format: text up to the field length, numbers with the field's
+    decimals and at most its integer digits, negative only for signed ``N``
+    fields (with probability ``negative_rate``). A key feeding several fields
+    gets a value that fits all of them, and is left out when none can. With
+    ``fill`` below 1 each input is only set with that probability.
+
+    Inputs added into an unsigned formula total are drawn non-negative, and a
+    total that still comes out negative gets the inputs it subtracts drawn
+    again. Draws whose formula results would not render anyway (a total too
+    long for its field) are discarded and drawn again. With ``computed`` the
+    formula results are included in the payload as well, as an upstream
+    system would send them; rendering recomputes the same values.
+    """
+
+    def __init__(
+        self,
+        report: ReportLayout,
+        *,
+        negative_rate: float = 0.2,
+        fill: float = 1.0,
+        computed: bool = True,
+        max_tries: int = 100,
+    ) -> None:
+        self.negative_rate = negative_rate
+        self.fill = fill
+        self.computed = computed
+        self.max_tries = max_tries
+        self.formulas = compile_report(report).formulas
+        groups: dict[str, list] = {}
+        outputs: list[tuple[str, Slot]] = []
+        for record in report.records:
+            for field in record.fields:
+                name = field.code or field.key
+                if not name or field.const_value is not None:
+                    continue
+                if field.code in self.formulas.codes:
+                    if not field.raw_type.strip().startswith("A"):
+                        outputs.append((field.code, _make_slot(0, field)))
+                    continue
+                groups.setdefault(name, []).append(field)
+        # Each formula code as a sum of input codes: code -> {input: coefficient}.
+        sums: dict[str, dict[str, int]] = {}
+        for node in self.formulas.nodes:
+            terms: dict[str, int] = {}
+            for sign, code in node.compiled.terms:
+                for name, coefficient in sums.get(code, {code: 1}).items():
+                    terms[name] = terms.get(name, 0) + sign * coefficient
+            sums[node.code] = terms
+        unsigned = [sums[code] for code, slot in outputs if not slot.signed]
+        added = {
+            name for terms in unsigned for name, coefficient in terms.items() if coefficient > 0
+        }
+        self.inputs: tuple[_Input, ...] = tuple(
+            spec._replace(signed=False) if spec.signed and name in added else spec
+            for name, fields in groups.items()
+            if (spec := _input(name, fields))
+        )
+        numbers = {spec.name: spec for spec in self.inputs if spec.numeric}
+        self._decimals = {name: spec.decimals for name, spec in numbers.items()}
+        self._outputs = tuple(outputs)
+        # Unsigned total -> the numeric inputs it subtracts, redrawn when it is negative.
+        self._subtracted = {
+            code: tuple(
+                numbers[name]
+                for name, coefficient in sums[code].items()
+                if coefficient < 0 and name in numbers
+            )
+            for code, slot in outputs
+            if not slot.signed
+        }
+        self.scale = max(
+            [spec.decimals for spec in self.inputs] + [slot.decimals for _, slot in outputs],
+            default=0,
+        )
+
+    def payload(self, rng: random.Random) -> dict[str, str]:
+        """One payload drawn from ``rng``."""
+        evaluate = self.formulas.evaluate
+        scale = self.scale
+        for _ in range(self.max_tries):
+            drawn, amounts = self._draw(rng)
+            computed = evaluate(amounts, 0)
+            for _ in range(self.max_tries):
+                code = self._misfit(computed)
+                if code is None:
+                    return self._payload(drawn, computed)
+                terms = [spec for spec in self._subtracted.get(code, ()) if spec.name in drawn]
+                if not terms or computed[code] >= 0:
+                    break
+                for spec in terms:
+                    units = self._units(spec, rng)
+                    drawn[spec.name] = units
+                    amounts[spec.name] = units * 10 ** (scale - spec.decimals)
+                computed = evaluate(amounts, 0)
+        raise ValueError(
+            f"No renderable payload in {self.max_tries} draws; the formula totals "
+            "rarely fit their fields (try a lower negative_rate)"
+        )
+
+    def payloads(self, count: int, *, seed: int | str = 0, start: int = 0) -> Iterator[dict]:
+        """
+        ``count`` payloads of the stream for ``seed``, from position ``start``.
+
+        The same seed always yields the same stream, however it is split.
+        """
+        position = start
+        end = start + count
+        while position < end:
+            chunk, offset = divmod(position, CHUNK_SIZE)
+            rng = random.Random(f"{seed}:{chunk}")
+            for _ in range(offset):
+                self.payload(rng)
+            for _ in range(min(CHUNK_SIZE - offset, end - position)):
+                yield self.payload(rng)
+                position += 1
+
+    def _draw(self, rng: random.Random) -> tuple[dict[str, Any], dict[str, int]]:
+        # Texts as drawn and numbers as integers in units of 10**-decimals;
+        # numbers only become text once a draw is accepted (see _payload).
+        # Amounts are in units of 10**-scale, so formulas evaluate exactly
+        # without Decimal arithmetic.
+        drawn: dict[str, Any] = {}
+        amounts: dict[str, int] = {}
+        random_ = rng.random
+        fill = self.fill
+        negative_rate = self.negative_rate
+        scale = self.scale
+        for name, numeric, alphabet, size, decimals, signed in self.inputs:
+            if fill < 1 and random_() >= fill:
+                continue
+            if not numeric:
+                k = int(random_() * size) + 1
+                text = "".join(rng.choices(alphabet, k=k)).strip() or alphabet[0]
+                drawn[name] = text
+                if name.isdigit():
+                    amounts[name] = int(text) * 10**scale
+                continue
+            # As _units, inlined for speed.
+            units = int(10 ** (random_() * size + decimals))
+            if signed and random_() < negative_rate:
+                units = -units
+            drawn[name] = units
+            amounts[name] = units * 10 ** (scale - decimals)
+        return drawn, amounts
+
+    def _units(self, spec: _Input, rng: random.Random) -> int:
+        # Log-uniform in [10**decimals, 10**(size + decimals)) units of
+        # 10**-decimals, so amounts from 1 up to 10**size: magnitudes spread
+        # evenly, as real amounts are.
+        units = int(10 ** (rng.random() * spec.size + spec.decimals))
+        if spec.signed and rng.random() < self.negative_rate:
+            units = -units
+        return units
+
+    def _misfit(self, computed: dict[str, int]) -> str | None:
+        """The first formula code whose result does not fit its field."""
+        scale = self.scale
+        for code, slot in self._outputs:
+            try:
+                _format_scaled(slot, computed[code], scale)
+            except ValueError:
+                return code
+        return None
+
+    def _payload(self, drawn: dict[str, Any], computed: dict[str, int]) -> dict[str, str]:
+        payload = {}
+        decimals = self._decimals
+        for name, value in drawn.items():
+            # _amount_text, inlined: this runs for every numeric input.
+            places = decimals.get(name)
+            if places:
+                digits = str(abs(value)).rjust(places + 1, "0")
+                value = f"{'-' if value < 0 else ''}{digits[:-places]}.{digits[-places:]}"
+            elif places is not None:
+                value = str(value)
+            payload[name] = value
+        if self.computed:
+            scale = self.scale
+            for code, units in computed.items():
+                payload[code] = _amount_text(units, scale)
+        return payload
+
+
+def _amount_text(units: int, decimals: int) -> str:
+    if not decimals:
+        return str(units)
+    digits = str(abs(units)).rjust(decimals + 1, "0")
+    return f"{'-' if units < 0 else ''}{digits[:-decimals]}.{digits[-decimals:]}"
+
+
+def _input(name: str, fields: list) -> _Input | None:
+    kinds = {field.raw_type.strip() for field in fields}
+    length = min(field.length for field in fields)
+    if all(kind.startswith("A") for kind in kinds):
+        # Numeric names are read as amounts, so only digits fit there.
+        return _Input(name, False, _DIGITS if name.isdigit() else _TEXT, length, 0, False)
+    if any(kind.startswith("A") for kind in kinds):
+        return None
+    decimals = min(field.decimals or 0 for field in fields)
+    signed = kinds == {"N"}
+    # Leave headroom for the formula totals adding up several inputs.
+    digits = min(min(field.length - (field.decimals or 0) for field in fields) - signed, MAX_DIGITS)
+    if digits <= 0:
+        return None
+    return _Input(name, True, "", digits, decimals, signed)
+
+
+def iter_payloads(
+    report: ReportLayout, count: int, *, seed: int | str = 0, **options: Any
+) -> Iterator[dict[str, str]]:
+    """``count`` payloads for ``report``; ``options`` go to ``PayloadGenerator``."""
+    return PayloadGenerator(report, **options).payloads(count, seed=seed)
+
+
+def write_jsonl(
+    report: ReportLayout,
+    count: int,
+    fp: IO[bytes],
+    *,
+    seed: int | str = 0,
+    workers: int = 1,
+    mp_context: Any = None,
+    **options: Any,
+) -> int:
+    """
+    Write ``count`` payloads to the binary stream ``fp`` as UTF-8 JSON lines.
+
+    With ``workers`` > 1 the chunks are generated in a process pool and
+    written in order, so the file is the same as with one worker. Returns the
+    number of payloads written.
+    """
+    chunks = range(0, count, CHUNK_SIZE)
+    if workers <= 1:
+        generator = PayloadGenerator(report, **options)
+        for start in chunks:
+            fp.write(_jsonl(generator, start, min(CHUNK_SIZE, count - start), seed))
+        return count
+    executor: Executor = ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=mp_context,
+        initializer=_init_worker,
+        initargs=(report, options),
+    )
+    with executor:
+        pending: deque = deque()
+        starts = iter(chunks)
+        while True:
+            # At most two chunks per worker in flight.
+            for start in itertools.islice(starts, workers * 2 - len(pending)):
+                size = min(CHUNK_SIZE, count - start)
+                pending.append(executor.submit(_worker_chunk, start, size, seed))
+            if not pending:
+                return count
+            fp.write(pending.popleft().result())
+
+
+def _jsonl(generator: PayloadGenerator, start: int, size: int, seed: int | str) -> bytes:
+    dumps = json.JSONEncoder(ensure_ascii=False, separators=(",", ":")).encode
+    lines = [dumps(payload) for payload in generator.payloads(size, seed=seed, start=start)]
+    return ("\n".join(lines) + "\n").encode("utf-8")
+
+
+def _init_worker(report: ReportLayout, options: dict[str, Any]) -> None:
+    _WORKER["generator"] = PayloadGenerator(report, **options)
+
+
+def _worker_chunk(start: int, size: int, seed: int | str) -> bytes:
+    return _jsonl(_WORKER["generator"], start, size, seed)
+
+
+def main() -> int:
+    from .layout_loader import load_layout
+
+    parser = argparse.ArgumentParser(description="Write random payloads for a model as JSONL")
+    parser.add_argument("model")
+    parser.add_argument("--count", type=int, default=1000)
+    parser.add_argument("--seed", default="0")
+    parser.add_argument("--workers", type=int, default=1, help="0: one per CPU")
+    parser.add_argument("--negative-rate", type=float, default=0.2)
+    parser.add_argument("--fill", type=float, default=1.0)
+    parser.add_argument("--inputs-only", action="store_true", help="Leave out formula results")
+    parser.add_argument("--output", default="-", help="File to write (default: stdout)")
+    args = parser.parse_args()
+
+    options = {
+        "seed": args.seed,
+        "workers": args.workers or os.cpu_count() or 1,
+        "negative_rate": args.negative_rate,
+        "fill": args.fill,
+        "computed": not args.inputs_only,
+    }
+    layout = load_layout(args.model)
+    if args.output == "-":
+        write_jsonl(layout, args.count, sys.stdout.buffer, **options)
+        sys.stdout.flush()
+    else:
+        with open(args.output, "wb") as fp:
+            write_jsonl(layout, args.count, fp, **options)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1 @@
+"""Micro-benchmarks for aeat_code2txt (run with ``python -m benchmarks.<name>``)."""
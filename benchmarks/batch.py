@@ -0,0 +1,57 @@
+"""
+Compare render_many against calling render_report once per return.
+
+    python -m benchmarks.batch [--fixed-point]
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import time
+from pathlib import Path
+
+from aeat_code2txt import load_layout, render_many, render_report
+
+EXAMPLE = Path(__file__).resolve().parents[1] / "examples" / "data_303.json"
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--count", type=int, default=5000, help="Returns per batch")
+    parser.add_argument("--strict", action="store_true", help="Reject unknown keys")
+    parser.add_argument(
+        "--fixed-point", action="store_true", help="Also time render_many(fixed_point=True)"
+    )
+    args = parser.parse_args()
+
+    layout = load_layout("303")
+    data = json.loads(EXAMPLE.read_text(encoding="utf-8"))
+    items = [dict(data) for _ in range(args.count)]
+    render_report(layout, data=data)
+
+    start = time.perf_counter()
+    single = [render_report(layout, data=item, strict=args.strict) for item in items]
+    loop_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    batch = [result.text for result in render_many(layout, items, strict=args.strict)]
+    batch_seconds = time.perf_counter() - start
+
+    assert batch == single
+    timings = [("render_report loop", loop_seconds), ("render_many", batch_seconds)]
+    if args.fixed_point:
+        start = time.perf_counter()
+        fixed = [
+            result.text
+            for result in render_many(layout, items, strict=args.strict, fixed_point=True)
+        ]
+        timings.append(("render_many fixed", time.perf_counter() - start))
+        assert fixed == single
+    for name, seconds in timings:
+        print(f"  {name:20s} {seconds / args.count * 1e6:8.1f} us/return")
+    print(f"  speedup x{loop_seconds / batch_seconds:.2f}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,75 @@
+"""
+Compare the pre-tokenized formula path with the legacy regex scan on the
+real 303 formulas.
+
+    python -m benchmarks.formulas
+"""
+from __future__ import annotations
+
+import argparse
+import timeit
+from decimal import Decimal
+from typing import Mapping
+
+from aeat_code2txt import load_layout
+from aeat_code2txt.formulas import TOKEN_RE, compile_formula, evaluate_formula
+
+
+def legacy_evaluate_formula(formula: str, values: Mapping[str, Decimal]) -> Decimal:
+    """The regex-scanning implementation that evaluate_formula replaced."""
+    parts = []
+    idx = 0
+    while idx < len(formula):
+        match = TOKEN_RE.search(formula, idx)
+        if not match:
+            break
+        if match.group(0) in ("+", "-"):
+            parts.append(match.group(0))
+        else:
+            parts.append(match.group(1))
+        idx = match.end()
+
+    total = Decimal(0)
+    op = "+"
+    for part in parts:
+        if part in ("+", "-"):
+            op = part
+            continue
+        value = values.get(part, Decimal(0))
+        if op == "+":
+            total += value
+        else:
+            total -= value
+    return total
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--number", type=int, default=2000, help="Passes over all formulas")
+    args = parser.parse_args()
+
+    layout = load_layout("303")
+    formulas = [f.formula for r in layout.records for f in r.fields if f.code and f.formula]
+    values = {str(code): Decimal(code) / 7 for code in range(1, 200)}
+    compiled = [compile_formula(formula) for formula in formulas]
+
+    for formula in formulas:
+        assert evaluate_formula(formula, values) == legacy_evaluate_formula(formula, values)
+
+    cases = {
+        "legacy regex scan": lambda: [legacy_evaluate_formula(f, values) for f in formulas],
+        "evaluate_formula (cached)": lambda: [evaluate_formula(f, values) for f in formulas],
+        "CompiledFormula.evaluate": lambda: [c.evaluate(values) for c in compiled],
+    }
+    baseline = None
+    print(f"{len(formulas)} formulas x {args.number} passes")
+    for name, func in cases.items():
+        seconds = min(timeit.repeat(func, number=args.number, repeat=3))
+        per_eval = seconds / (args.number * len(formulas)) * 1e6
+        baseline = baseline or per_eval
+        print(f"  {name:28s} {per_eval:7.2f} us/eval  x{baseline / per_eval:.1f}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,64 @@
+"""
+Compare encoding render_report's text against render_report_bytes, which
+patches a precomputed blank image of the declaration.
+
+    python -m benchmarks.image
+"""
+from __future__ import annotations
+
+import argparse
+import io
+import json
+import time
+from pathlib import Path
+
+from aeat_code2txt import load_layout, render_report, render_report_bytes, render_to_stream
+
+EXAMPLE = Path(__file__).resolve().parents[1] / "examples" / "data_303.json"
+
+
+def _best(func, repeat: int, count: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(count):
+            func()
+        best = min(best, time.perf_counter() - start)
+    return best / count
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--data", type=Path, default=EXAMPLE)
+    parser.add_argument("--count", type=int, default=2000, help="Renders per run")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs (best is kept)")
+    args = parser.parse_args()
+
+    layout = load_layout("303")
+    data = json.loads(args.data.read_text(encoding="utf-8"))
+    expected = render_report(layout, data=data).encode("iso-8859-1")
+    assert render_report_bytes(layout, data=data) == expected
+    sparse = {key: value for key, value in data.items() if value not in ("", 0, 0.0)}
+
+    print(f"payload {args.data.name}: {len(data)} keys, {len(sparse)} non-empty")
+    for label, payload in (("full", data), ("non-empty", sparse)):
+        text = _best(
+            lambda: render_report(layout, data=payload).encode("iso-8859-1"),
+            args.repeat,
+            args.count,
+        )
+        image = _best(lambda: render_report_bytes(layout, data=payload), args.repeat, args.count)
+        print(
+            f"  {label:10s} encode(render_report) {text * 1e6:7.1f} us  "
+            f"render_report_bytes {image * 1e6:7.1f} us  x{text / image:.2f}"
+        )
+
+    items = [data] * args.count
+    start = time.perf_counter()
+    render_to_stream(layout, items, io.BytesIO())
+    print(f"  render_to_stream {(time.perf_counter() - start) / args.count * 1e6:7.1f} us/return")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
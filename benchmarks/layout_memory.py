@@ -0,0 +1,43 @@
+"""
+Compare the resident size of regular and compact bundled layouts.
+
+    python -m benchmarks.layout_memory
+"""
+from __future__ import annotations
+
+import argparse
+import gc
+import pickle
+import tracemalloc
+
+from aeat_code2txt import layout_loader
+
+
+def _footprint(model: str, compact: bool) -> tuple[int, int]:
+    layout_loader.load_layout(model, compact=compact)
+    layout_loader.invalidate(model)
+    gc.collect()
+    tracemalloc.start()
+    layout = layout_loader.load_layout(model, compact=compact)
+    gc.collect()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return size, len(pickle.dumps(layout))
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("models", nargs="*", help="Bundled models (default: all)")
+    args = parser.parse_args()
+
+    for model in args.models or layout_loader.bundled_models():
+        regular, regular_pickle = _footprint(model, compact=False)
+        compact, compact_pickle = _footprint(model, compact=True)
+        print(f"layout {model}")
+        print(f"  resident  {regular / 1024:8.1f} KiB -> {compact / 1024:8.1f} KiB")
+        print(f"  pickled   {regular_pickle / 1024:8.1f} KiB -> {compact_pickle / 1024:8.1f} KiB")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
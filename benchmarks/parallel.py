@@ -0,0 +1,56 @@
+"""
+Measure how ParallelRenderer throughput scales with the number of workers.
+
+    python -m benchmarks.parallel --count 100000 --workers 1 2 4 8
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import time
+from pathlib import Path
+
+from aeat_code2txt import ParallelRenderer, load_layout, render_many
+
+EXAMPLE = Path(__file__).resolve().parents[1] / "examples" / "data_303.json"
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--count", type=int, default=20000, help="Returns per run")
+    parser.add_argument("--chunksize", type=int, default=256, help="Items per task")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        nargs="+",
+        default=sorted({1, 2, os.cpu_count() or 1}),
+        help="Pool sizes to measure",
+    )
+    args = parser.parse_args()
+
+    layout = load_layout("303")
+    data = json.loads(EXAMPLE.read_text(encoding="utf-8"))
+    items = [data] * args.count
+
+    start = time.perf_counter()
+    for _ in render_many(layout, items):
+        pass
+    serial = time.perf_counter() - start
+    print(f"  serial      {args.count / serial:10.0f} returns/s")
+
+    for workers in args.workers:
+        with ParallelRenderer(layout, workers=workers, chunksize=args.chunksize) as renderer:
+            start = time.perf_counter()
+            for _ in renderer.render_many(items):
+                pass
+            seconds = time.perf_counter() - start
+        print(
+            f"  workers={workers:<3d} {args.count / seconds:10.0f} returns/s"
+            f"  x{serial / seconds:.2f} vs serial"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,46 @@
+"""
+Throughput of RenderService under many concurrent requests.
+
+    python -m benchmarks.service --workers 4 --requests 20000
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import time
+from pathlib import Path
+
+from aeat_code2txt.service import RenderService
+
+EXAMPLE = Path(__file__).resolve().parents[1] / "examples" / "data_303.json"
+
+
+async def _run(args: argparse.Namespace) -> None:
+    data = json.loads(EXAMPLE.read_text(encoding="utf-8"))
+    async with RenderService(
+        ["303"], workers=args.workers, max_in_flight=args.max_in_flight, batch_size=args.batch_size
+    ) as service:
+        await service.render("303", data)
+        start = time.perf_counter()
+        await asyncio.gather(*(service.render("303", data) for _ in range(args.requests)))
+        seconds = time.perf_counter() - start
+    print(
+        f"workers {args.workers}  batch {args.batch_size}  in-flight {args.max_in_flight}: "
+        f"{args.requests / seconds:8.0f} renders/s"
+    )
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--requests", type=int, default=10000)
+    parser.add_argument("--max-in-flight", type=int, default=1024)
+    parser.add_argument("--batch-size", type=int, default=64)
+    args = parser.parse_args()
+    asyncio.run(_run(args))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
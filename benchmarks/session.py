@@ -0,0 +1,51 @@
+"""
+Compare RenderSession.update against a full render_report per edit.
+
+    python -m benchmarks.session
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import time
+from pathlib import Path
+
+from aeat_code2txt import RenderSession, load_layout, render_report
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--layout", default="303", help="Bundled model")
+    parser.add_argument("--data", type=Path, default=ROOT / "examples" / "data_303.json")
+    parser.add_argument("--code", default="01", help="Code edited on each step")
+    parser.add_argument("--edits", type=int, default=5000)
+    args = parser.parse_args()
+
+    layout = load_layout(args.layout)
+    data = json.loads(args.data.read_text(encoding="utf-8"))
+    session = RenderSession(layout, data)
+
+    start = time.perf_counter()
+    for value in range(args.edits):
+        session.update({args.code: value})
+    session_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for value in range(args.edits):
+        data[args.code] = value
+        render_report(layout, data=data)
+    full_seconds = time.perf_counter() - start
+
+    print(f"edits {args.edits} on [{args.code}]")
+    print(f"  render_report  {full_seconds / args.edits * 1e6:8.1f} us/edit")
+    print(
+        f"  session.update {session_seconds / args.edits * 1e6:8.1f} us/edit"
+        f"  x{full_seconds / session_seconds:.1f}"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,77 @@
+"""
+Compare cold layout loading from JSON against the precompiled blob.
+
+    python scripts/build_layout_blob.py
+    python -m benchmarks.startup
+"""
+from __future__ import annotations
+
+import argparse
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+from aeat_code2txt import layout_loader
+
+ROOT = Path(__file__).resolve().parents[1]
+
+# Fresh interpreter: build one layout from its files (import time excluded).
+_SNIPPET = """
+import sys, time
+from aeat_code2txt.layout_loader import _load, _read_optional, _resource
+model, use_blob = sys.argv[1], sys.argv[2] == "1"
+start = time.perf_counter()
+blob = _read_optional(_resource(model, ".bin")) if use_blob else None
+_load(_resource(model).read_bytes(), blob, model, None)
+print(time.perf_counter() - start)
+"""
+
+
+def _in_process(model: str, use_blob: bool, repeat: int) -> float:
+    source = layout_loader._resource(model).read_bytes()
+    blob = layout_loader._read_optional(layout_loader._resource(model, ".bin"))
+    if use_blob and blob is None:
+        raise SystemExit(f"No blob for {model}; run scripts/build_layout_blob.py first")
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        layout_loader._load(source, blob if use_blob else None, model, None)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def _cold(model: str, use_blob: bool, repeat: int) -> float:
+    times = []
+    for _ in range(repeat):
+        out = subprocess.run(
+            [sys.executable, "-c", _SNIPPET, model, "1" if use_blob else "0"],
+            capture_output=True,
+            text=True,
+            check=True,
+            cwd=ROOT,
+        )
+        times.append(float(out.stdout))
+    return min(times)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("models", nargs="*", help="Bundled models (default: all)")
+    parser.add_argument("--repeat", type=int, default=10, help="Runs per measurement")
+    args = parser.parse_args()
+
+    for model in args.models or layout_loader.bundled_models():
+        print(f"layout {model}")
+        for label, measure in (("warm process", _in_process), ("fresh process", _cold)):
+            json_seconds = measure(model, False, args.repeat)
+            blob_seconds = measure(model, True, args.repeat)
+            print(
+                f"  {label:14s} json {json_seconds * 1e3:7.2f} ms  "
+                f"blob {blob_seconds * 1e3:7.2f} ms  x{json_seconds / blob_seconds:.1f}"
+            )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,207 @@
+"""
+Benchmark suite: load, render, parse and validate for the bundled models.
+
+    python -m benchmarks.suite                              # 1, 1k and 100k returns
+    python -m benchmarks.suite --sizes 1 1000 --output new.json --baseline old.json
+
+Each case records operations/s, p50/p99 latency per operation and peak
+traced memory (tracemalloc, in a separate pass so it does not skew the
+timings). Inputs are synthetic returns (``aeat_code2txt.synthetic``) filling
+every input field of the layout. Results are written as JSON; with
+``--baseline`` the run fails (exit code 1) when a case's operations/s drop by
+more than ``--threshold``.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable, Iterator
+
+from aeat_code2txt import layout_loader, parse_report, render_report, validate_report
+from aeat_code2txt.layout import ReportLayout
+from aeat_code2txt.synthetic import PayloadGenerator
+
+ROOT = Path(__file__).resolve().parents[1]
+DEFAULT_OUTPUT = ROOT / "benchmarks" / "results" / "latest.json"
+OPERATIONS = ("load", "render", "parse", "validate")
+# Distinct synthetic returns per model; larger runs cycle over them.
+POOL_SIZE = 1000
+# Operations traced for peak memory (it does not grow with streaming runs).
+MEMORY_SAMPLE = 200
+# Cold layout loads per model.
+LOAD_REPEAT = 20
+# Cases with fewer operations are reported but too noisy to fail a run.
+GATE_MIN_OPS = 20
+
+
+class Case:
+    """One benchmark: ``run`` performs a single operation on the n-th input."""
+
+    def __init__(self, model: str, operation: str, returns: int, run: Callable[[int], Any]):
+        self.model = model
+        self.operation = operation
+        self.returns = returns
+        self.run = run
+
+    @property
+    def key(self) -> str:
+        return f"{self.model}/{self.operation}/{self.returns}"
+
+    def measure(self) -> dict[str, Any]:
+        run = self.run
+        clock = time.perf_counter_ns
+        latencies = []
+        start = clock()
+        for index in range(self.returns):
+            before = clock()
+            run(index)
+            latencies.append(clock() - before)
+        total = (clock() - start) / 1e9
+        latencies.sort()
+
+        tracemalloc.start()
+        for index in range(min(self.returns, MEMORY_SAMPLE)):
+            run(index)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+        return {
+            "model": self.model,
+            "operation": self.operation,
+            "returns": self.returns,
+            "seconds": round(total, 6),
+            "ops_per_s": round(self.returns / total, 1),
+            "p50_us": round(_percentile(latencies, 0.50) / 1e3, 2),
+            "p99_us": round(_percentile(latencies, 0.99) / 1e3, 2),
+            "peak_kib": round(peak / 1024, 1),
+        }
+
+
+def build_cases(
+    models: list[str], operations: list[str], sizes: list[int], seed: int
+) -> Iterator[Case]:
+    for model in models:
+        layout = layout_loader.load_layout(model)
+        generator = PayloadGenerator(layout, computed=False)
+        payloads = list(generator.payloads(min(POOL_SIZE, max(sizes)), seed=f"{seed}:{model}"))
+        texts = [render_report(layout, data=payload) for payload in payloads]
+        pool = len(payloads)
+
+        def load(_: int, model: str = model) -> None:
+            layout_loader.invalidate(model)
+            layout_loader.load_layout(model)
+
+        def render(index: int, layout: ReportLayout = layout) -> None:
+            render_report(layout, data=payloads[index % pool])
+
+        def parse(index: int, layout: ReportLayout = layout) -> None:
+            parse_report(texts[index % pool], layout)
+
+        def validate(index: int, layout: ReportLayout = layout) -> None:
+            validate_report(texts[index % pool], layout)
+
+        runs = {"render": render, "parse": parse, "validate": validate}
+        for operation in operations:
+            if operation == "load":
+                # Cold loads do not depend on the number of returns.
+                yield Case(model, operation, LOAD_REPEAT, load)
+                continue
+            for size in sizes:
+                yield Case(model, operation, size, runs[operation])
+        layout_loader.invalidate(model)
+
+
+def compare(results: list[dict], baseline: dict, threshold: float) -> list[str]:
+    """Cases whose ops/s fell by more than ``threshold`` (a fraction)."""
+    previous = {_key(result): result for result in baseline.get("results", [])}
+    regressions = []
+    for result in results:
+        before = previous.get(_key(result))
+        if before is None or result["returns"] < GATE_MIN_OPS:
+            continue
+        change = result["ops_per_s"] / before["ops_per_s"] - 1
+        if change < -threshold:
+            regressions.append(
+                f"{_key(result)}: {before['ops_per_s']:.1f} -> {result['ops_per_s']:.1f} "
+                f"ops/s ({change:+.1%})"
+            )
+    return regressions
+
+
+def _key(result: dict) -> str:
+    return f"{result['model']}/{result['operation']}/{result['returns']}"
+
+
+def _percentile(ordered: list[int], fraction: float) -> float:
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def _metadata() -> dict[str, Any]:
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            cwd=ROOT,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--models", nargs="+", default=None, help="Default: all bundled")
+    parser.add_argument("--operations", nargs="+", choices=OPERATIONS, default=list(OPERATIONS))
+    parser.add_argument("--sizes", nargs="+", type=int, default=[1, 1000, 100000])
+    parser.add_argument("--seed", type=int, default=0, help="Synthetic payload seed")
+    parser.add_argument("--output", type=Path, default=DEFAULT_OUTPUT, help="JSON results file")
+    parser.add_argument("--baseline", type=Path, default=None, help="JSON results to compare")
+    parser.add_argument(
+        "--threshold", type=float, default=0.15, help="Allowed ops/s drop (fraction)"
+    )
+    args = parser.parse_args()
+
+    results = []
+    cases = build_cases(
+        args.models or layout_loader.bundled_models(), args.operations, sorted(args.sizes), args.seed
+    )
+    for case in cases:
+        result = case.measure()
+        results.append(result)
+        print(
+            f"{case.key:22s} {result['ops_per_s']:10.1f} ops/s  p50 {result['p50_us']:9.1f} us  "
+            f"p99 {result['p99_us']:9.1f} us  peak {result['peak_kib']:8.1f} KiB",
+            flush=True,
+        )
+
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    args.output.write_text(
+        json.dumps({"meta": _metadata(), "results": results}, indent=2) + "\n", encoding="utf-8"
+    )
+    print(f"results written to {args.output}")
+
+    if args.baseline is not None:
+        baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
+        regressions = compare(results, baseline, args.threshold)
+        for line in regressions:
+            print(f"REGRESSION {line}", file=sys.stderr)
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,31 @@
+#!/usr/bin/env python3
+"""Precompile layout JSON files into the binary form load_layout prefers."""
+from __future__ import annotations
+
+import argparse
+from pathlib import Path
+
+from aeat_code2txt.layout_loader import dump_layout_blob
+
+LAYOUTS_DIR = Path(__file__).resolve().parents[1] / "aeat_code2txt" / "layouts"
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "layout_json",
+        type=Path,
+        nargs="*",
+        help="Layout JSON files (default: every bundled layouts_*.json)",
+    )
+    args = parser.parse_args()
+
+    for path in args.layout_json or sorted(LAYOUTS_DIR.glob("layouts_*.json")):
+        output = path.with_suffix(".bin")
+        output.write_bytes(dump_layout_blob(path.read_bytes()))
+        print(f"{path} -> {output}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -2,10 +2,10 @@
 from __future__ import annotations
 
 import argparse
-import json
 from pathlib import Path
 
 from aeat_code2txt import parse_layout_directory
+from aeat_code2txt.parser import dump_field_catalog
 
 
 def main() -> int:
@@ -14,33 +14,7 @@ def main() -> int:
     parser.add_argument("--output", type=Path, help="Output JSON file")
     args = parser.parse_args()
 
-    layout = parse_layout_directory(args.layout_dir)
-    fields = []
-    for record in layout.records:
-        for field in record.fields:
-            fields.append(
-                {
-                    "record": record.name,
-                    "number": field.number,
-                    "position": field.position,
-                    "length": field.length,
-                    "type": field.raw_type.strip(),
-                    "code": field.code,
-                    "key": field.key,
-                    "const": field.const_value,
-                    "decimals": field.decimals,
-                    "formula": field.formula,
-                    "description": field.description,
-                    "validation": field.validation,
-                    "content": field.content,
-                }
-            )
-
-    payload = {
-        "layout": layout.name,
-        "fields": fields,
-    }
-    text = json.dumps(payload, indent=2, ensure_ascii=False)
+    text = dump_field_catalog(parse_layout_directory(args.layout_dir))
     if args.output:
         args.output.write_text(text, encoding="utf-8")
     else:
@@ -2,10 +2,10 @@
 from __future__ import annotations
 
 import argparse
-import json
 from pathlib import Path
 
 from aeat_code2txt import parse_layout_directory
+from aeat_code2txt.parser import dump_field_keys
 
 
 def main() -> int:
@@ -14,16 +14,7 @@ def main() -> int:
     parser.add_argument("--output", type=Path, help="Output JSON file")
     args = parser.parse_args()
 
-    layout = parse_layout_directory(args.layout_dir)
-    keys = {}
-    for record in layout.records:
-        for field in record.fields:
-            if field.code:
-                continue
-            keys[field.key] = ""
-
-    payload = dict(sorted(keys.items()))
-    text = json.dumps(payload, indent=2, ensure_ascii=False)
+    text = dump_field_keys(parse_layout_directory(args.layout_dir))
     if args.output:
         args.output.write_text(text, encoding="utf-8")
     else:
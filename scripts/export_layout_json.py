@@ -2,10 +2,10 @@
 from __future__ import annotations
 
 import argparse
-import json
 from pathlib import Path
 
 from aeat_code2txt import parse_layout_directory
+from aeat_code2txt.parser import dump_layout_json
 
 
 def main() -> int:
@@ -15,37 +15,7 @@ def main() -> int:
     args = parser.parse_args()
 
     layout = parse_layout_directory(args.csv_dir)
-    payload = {
-        "name": layout.name,
-        "records": [
-            {
-                "name": record.name,
-                "fields": [
-                    {
-                        "number": field.number,
-                        "position": field.position,
-                        "length": field.length,
-                        "raw_type": field.raw_type,
-                        "description": field.description,
-                        "validation": field.validation,
-                        "content": field.content,
-                        "code": field.code,
-                        "formula": field.formula,
-                        "decimals": field.decimals,
-                        "const_value": field.const_value,
-                        "key": field.key,
-                    }
-                    for field in record.fields
-                ],
-            }
-            for record in layout.records
-        ],
-    }
-
-    args.output_json.write_text(
-        json.dumps(payload, indent=2, ensure_ascii=False),
-        encoding="utf-8",
-    )
+    args.output_json.write_text(dump_layout_json(layout), encoding="utf-8")
     return 0
 
 
@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+"""
+Regenerate the layout artifacts of every model from its XLSX/CSV sources.
+
+Each CSV sheet is parsed once (in a process pool across sheets and models)
+and every artifact is written from that one layout: the bundled layout JSON
+and binary blob, plus the examples for 303. A manifest of content hashes
+makes runs incremental: the XLSX is only converted when it changed, only the
+sheets whose CSV changed are parsed again (the others are taken from the
+previous layout JSON), and models with nothing changed are skipped.
+
+    python3 scripts/regenerate.py                      # all models
+    python3 scripts/regenerate.py --models 390 --from-csv
+"""
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import NamedTuple
+
+from aeat_code2txt import render_report
+from aeat_code2txt.layout import RecordLayout, ReportLayout
+from aeat_code2txt.layout_loader import dump_layout_blob, load_layout_json
+from aeat_code2txt.parser import (
+    dump_field_catalog,
+    dump_field_keys,
+    dump_layout_json,
+    parse_layout_file,
+)
+
+ROOT = Path(__file__).resolve().parents[1]
+MANIFEST = ".regenerate_manifest.json"
+
+
+class Model(NamedTuple):
+    xlsx: str
+    csv_dir: str
+    # Also write the examples/ files (field catalog, keys, merged data, render).
+    examples: bool
+
+
+MODELS = {
+    "303": Model("data/DR303e26v101.xlsx", "csv_x2c_303", examples=True),
+    "390": Model("data/dr390e2025.xlsx", "csv_x2c_390", examples=False),
+}
+
+
+class Plan(NamedTuple):
+    model: str
+    csv_dir: Path
+    sheets: dict[str, str]
+    reused: dict[str, RecordLayout]
+    parse: list[Path]
+    inputs: dict[str, str]
+
+
+def _sha256(path: Path) -> str | None:
+    try:
+        return hashlib.sha256(path.read_bytes()).hexdigest()
+    except FileNotFoundError:
+        return None
+
+
+def _convert(xlsx: Path, csv_dir: Path) -> None:
+    from xlsx_to_csv import convert_with_openpyxl, convert_with_xlsx2csv, normalize_filenames
+
+    if not convert_with_xlsx2csv(xlsx, csv_dir):
+        convert_with_openpyxl(xlsx, csv_dir)
+    normalize_filenames(csv_dir)
+
+
+def _outputs(root: Path, model: str, spec: Model) -> dict[str, Path]:
+    layouts = root / "aeat_code2txt" / "layouts"
+    outputs = {
+        "layout": layouts / f"layouts_{model}.json",
+        "blob": layouts / f"layouts_{model}.bin",
+    }
+    if spec.examples:
+        examples = root / "examples"
+        outputs.update(
+            fields=examples / f"fields_{model}.json",
+            keys=examples / f"keys_{model}.json",
+            data=examples / f"data_{model}.json",
+            output=examples / f"output_{model}.txt",
+        )
+    return outputs
+
+
+def plan_model(
+    root: Path,
+    model: str,
+    spec: Model,
+    previous: dict,
+    *,
+    xlsx: Path | None,
+    from_csv: bool,
+    force: bool,
+) -> Plan | None:
+    """What to parse for ``model``; ``None`` when it is up to date."""
+    csv_dir = root / spec.csv_dir
+    inputs = {}
+    if not from_csv:
+        xlsx = xlsx or root / spec.xlsx
+        digest = _sha256(xlsx)
+        if digest is None:
+            if not csv_dir.is_dir():
+                raise SystemExit(f"{model}: neither {xlsx} nor {csv_dir} found")
+            print(f"{model}: {xlsx} not found, using the CSV sheets in {csv_dir}")
+        else:
+            inputs["xlsx"] = digest
+            if force or previous.get("inputs", {}).get("xlsx") != digest:
+                _convert(xlsx, csv_dir)
+    if spec.examples:
+        inputs["amounts"] = _sha256(root / "examples" / f"amounts_{model}.json")
+
+    sheets = {path.name: _sha256(path) for path in sorted(csv_dir.glob("*.csv"))}
+    outputs = _outputs(root, model, spec)
+    written = previous.get("outputs", {})
+    intact = all(
+        written.get(name) is not None and _sha256(path) == written[name]
+        for name, path in outputs.items()
+    )
+    if not force and intact and previous.get("sheets") == sheets and (
+        previous.get("inputs") == inputs
+    ):
+        return None
+
+    reused: dict[str, RecordLayout] = {}
+    layout_digest = written.get("layout")
+    if not force and layout_digest and layout_digest == _sha256(outputs["layout"]):
+        # Records of unchanged sheets come from the layout JSON written last time.
+        records = load_layout_json(outputs["layout"]).record_by_name()
+        old = previous.get("sheets", {})
+        for name, digest in sheets.items():
+            stem = Path(name).stem
+            if old.get(name) == digest and stem in records:
+                reused[stem] = records[stem]
+    parse = [csv_dir / name for name in sheets if Path(name).stem not in reused]
+    return Plan(model, csv_dir, sheets, reused, parse, inputs)
+
+
+def parse_sheets(paths: list[Path], workers: int) -> dict[Path, RecordLayout]:
+    """Parse ``paths``, across a process pool when there are several."""
+    if workers <= 1 or len(paths) <= 1:
+        return {path: parse_layout_file(path) for path in paths}
+    with ProcessPoolExecutor(max_workers=min(workers, len(paths))) as executor:
+        return dict(zip(paths, executor.map(parse_layout_file, paths)))
+
+
+def artifacts(root: Path, model: str, spec: Model, layout: ReportLayout) -> dict[str, bytes]:
+    """Every artifact of ``model``, built from the one parsed ``layout``."""
+    source = dump_layout_json(layout).encode("utf-8")
+    built = {"layout": source, "blob": dump_layout_blob(source)}
+    if spec.examples:
+        keys = dump_field_keys(layout)
+        amounts = json.loads((root / "examples" / f"amounts_{model}.json").read_text("utf-8"))
+        data = dict(json.loads(keys))
+        data.update(amounts)
+        built.update(
+            fields=dump_field_catalog(layout).encode("utf-8"),
+            keys=keys.encode("utf-8"),
+            data=json.dumps(data, indent=2, ensure_ascii=False).encode("utf-8"),
+            output=render_report(layout, data=data).encode("utf-8"),
+        )
+    return built
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--models", nargs="+", choices=sorted(MODELS), default=sorted(MODELS))
+    parser.add_argument(
+        "--xlsx", action="append", default=[], metavar="MODEL=PATH", help="XLSX of a model"
+    )
+    parser.add_argument("--from-csv", action="store_true", help="Use the CSV sheets as they are")
+    parser.add_argument("--force", action="store_true", help="Ignore the manifest")
+    parser.add_argument("--workers", "--jobs", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--root", type=Path, default=ROOT, help="Repository root")
+    args = parser.parse_args()
+
+    xlsx = dict(item.split("=", 1) for item in args.xlsx)
+    manifest_path = args.root / MANIFEST
+    try:
+        manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+    except (FileNotFoundError, ValueError):
+        manifest = {}
+
+    start = time.perf_counter()
+    plans = []
+    for model in args.models:
+        plan = plan_model(
+            args.root,
+            model,
+            MODELS[model],
+            manifest.get(model, {}),
+            xlsx=Path(xlsx[model]) if model in xlsx else None,
+            from_csv=args.from_csv,
+            force=args.force,
+        )
+        if plan is None:
+            print(f"{model}: up to date")
+        else:
+            plans.append(plan)
+
+    parsed = parse_sheets([path for plan in plans for path in plan.parse], args.workers)
+    for plan in plans:
+        spec = MODELS[plan.model]
+        records = [
+            plan.reused[Path(name).stem]
+            if Path(name).stem in plan.reused
+            else parsed[plan.csv_dir / name]
+            for name in plan.sheets
+        ]
+        layout = ReportLayout(name=plan.csv_dir.name, records=records).build_indexes()
+        outputs = _outputs(args.root, plan.model, spec)
+        written = []
+        for name, content in artifacts(args.root, plan.model, spec, layout).items():
+            path = outputs[name]
+            if _sha256(path) != hashlib.sha256(content).hexdigest():
+                path.parent.mkdir(parents=True, exist_ok=True)
+                path.write_bytes(content)
+                written.append(path.relative_to(args.root).as_posix())
+        manifest[plan.model] = {
+            "inputs": plan.inputs,
+            "sheets": plan.sheets,
+            "outputs": {name: _sha256(path) for name, path in outputs.items()},
+        }
+        print(
+            f"{plan.model}: parsed {len(plan.parse)}/{len(plan.sheets)} sheets, "
+            f"wrote {', '.join(written) or 'nothing (unchanged)'}"
+        )
+
+    manifest_path.write_text(json.dumps(manifest, indent=2, sort_keys=True), encoding="utf-8")
+    print(f"done in {time.perf_counter() - start:.2f}s", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -2,30 +2,39 @@
 set -euo pipefail
 
 ROOT="$(cd "$(dirname "$0")/.." && pwd)"
-XLSX="${1:-$ROOT/data/DR303e26v101.xlsx}"
-CSV_DIR="$ROOT/csv_x2c_303"
-XLSX_390="${2:-$ROOT/data/dr390e2025.xlsx}"
-CSV_DIR_390="$ROOT/csv_x2c_390"
+
+# Positionals are the 303 and 390 XLSX files; options (e.g. --force,
+# --workers N) go to the pipeline wherever they appear.
+POSITIONAL=()
+PASSTHROUGH=()
+while (($#)); do
+  case "$1" in
+    --workers|--jobs|--root)
+      PASSTHROUGH+=("$1" "${2:?$1 needs a value}")
+      shift 2
+      ;;
+    -*)
+      PASSTHROUGH+=("$1")
+      shift
+      ;;
+    *)
+      POSITIONAL+=("$1")
+      shift
+      ;;
+  esac
+done
+
+XLSX="${POSITIONAL[0]:-$ROOT/data/DR303e26v101.xlsx}"
+XLSX_390="${POSITIONAL[1]:-$ROOT/data/dr390e2025.xlsx}"
 
 if [[ ! -f "$XLSX" ]]; then
   echo "XLSX not found: $XLSX"
   exit 1
 fi
 
-PYTHONPATH="$ROOT" python3 "$ROOT/scripts/xlsx_to_csv.py" "$XLSX" "$CSV_DIR"
-PYTHONPATH="$ROOT" python3 "$ROOT/scripts/export_keys.py" "$CSV_DIR" --output "$ROOT/examples/keys_303.json"
-PYTHONPATH="$ROOT" python3 "$ROOT/scripts/export_fields.py" "$CSV_DIR" --output "$ROOT/examples/fields_303.json"
-PYTHONPATH="$ROOT" python3 "$ROOT/scripts/export_layout_json.py" "$CSV_DIR" "$ROOT/aeat_code2txt/layouts/layouts_303.json"
-PYTHONPATH="$ROOT" python3 "$ROOT/scripts/merge_data.py" \
-  "$ROOT/examples/amounts_303.json" \
-  "$ROOT/examples/keys_303.json" \
-  "$ROOT/examples/data_303.json"
-PYTHONPATH="$ROOT" python3 "$ROOT/scripts/render_report.py" \
-  "$CSV_DIR" \
-  --data-json "$ROOT/examples/data_303.json" \
-  --output "$ROOT/examples/output_303.txt"
-
+ARGS=(--models 303 --xlsx "303=$XLSX")
 if [[ -f "$XLSX_390" ]]; then
-  PYTHONPATH="$ROOT" python3 "$ROOT/scripts/xlsx_to_csv.py" "$XLSX_390" "$CSV_DIR_390"
-  PYTHONPATH="$ROOT" python3 "$ROOT/scripts/export_layout_json.py" "$CSV_DIR_390" "$ROOT/aeat_code2txt/layouts/layouts_390.json"
+  ARGS=(--models 303 390 --xlsx "303=$XLSX" --xlsx "390=$XLSX_390")
 fi
+
+PYTHONPATH="$ROOT" python3 "$ROOT/scripts/regenerate.py" "${ARGS[@]}" "${PASSTHROUGH[@]}"
@@ -3,10 +3,11 @@ from __future__ import annotations
 
 import argparse
 import json
+import sys
 from decimal import Decimal
 from pathlib import Path
 
-from aeat_code2txt import parse_layout_directory, render_report
+from aeat_code2txt import parse_layout_directory, render_report, render_to_stream
 
 
 def _load_amounts(path: Path) -> dict[str, Decimal]:
@@ -21,6 +22,13 @@ def _load_values(path: Path | None) -> dict[str, str]:
     return {str(k): str(v) for k, v in data.items()}
 
 
+def _iter_jsonl(path: Path):
+    with path.open("r", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
 def main() -> int:
     parser = argparse.ArgumentParser()
     parser.add_argument("layout_dir", type=Path, help="Directory with CSV sheets")
@@ -28,9 +36,29 @@ def main() -> int:
     parser.add_argument("--values-json", type=Path, help="JSON with extra values")
     parser.add_argument("--data-json", type=Path, help="Single JSON for codes + values")
     parser.add_argument("--output", type=Path, help="Output file path")
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Treat --data-json as JSON Lines (one return per line) and stream them to --output",
+    )
+    parser.add_argument(
+        "--encoding",
+        default="iso-8859-1",
+        help="Output encoding in --stream mode (default: iso-8859-1)",
+    )
     args = parser.parse_args()
 
     layout = parse_layout_directory(args.layout_dir)
+    if args.stream:
+        if not args.data_json:
+            raise SystemExit("--stream requires --data-json")
+        items = _iter_jsonl(args.data_json)
+        if args.output:
+            with args.output.open("wb") as fp:
+                render_to_stream(layout, items, fp, encoding=args.encoding)
+        else:
+            render_to_stream(layout, items, sys.stdout.buffer, encoding=args.encoding)
+        return 0
     if args.data_json:
         data = json.loads(args.data_json.read_text(encoding="utf-8"))
         text = render_report(layout, data=data)
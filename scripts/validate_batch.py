@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Validate many filed TXT returns in a process pool.
+
+Writes one JSON line per file (model, size, timing and issues) and prints a
+throughput summary to stderr. Exits with 1 when any file has issues or an
+unknown model.
+"""
+from __future__ import annotations
+
+import argparse
+import dataclasses
+import glob
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Iterator
+
+from aeat_code2txt import load_layout, validate_report
+from aeat_code2txt.archive import detect_model, iter_declaration_offsets
+from aeat_code2txt.layout_loader import preload
+
+_OPTIONS: dict[str, Any] = {}
+
+
+def _iter_paths(sources: list[str], pattern: str) -> Iterator[Path]:
+    for source in sources:
+        path = Path(source)
+        if path.is_dir():
+            yield from sorted(p for p in path.rglob(pattern) if p.is_file())
+        elif path.is_file():
+            yield path
+        else:
+            yield from (Path(p) for p in sorted(glob.glob(source, recursive=True)))
+
+
+def _init_worker(options: dict[str, Any]) -> None:
+    _OPTIONS.update(options)
+    preload(*([options["model"]] if options["model"] else []))
+
+
+def _validate_file(path: str) -> dict[str, Any]:
+    started = time.perf_counter()
+    encoding = _OPTIONS["encoding"]
+    result: dict[str, Any] = {"path": path, "model": None, "bytes": 0, "declarations": 0}
+    try:
+        data = Path(path).read_bytes()
+        result["bytes"] = len(data)
+        model = _OPTIONS["model"] or detect_model(data, encoding=encoding)
+        result["model"] = model
+        if model is None:
+            result["error"] = "Unknown model: no declaration header matches"
+        else:
+            layout = load_layout(model)
+            issues = []
+            offsets = list(iter_declaration_offsets(data, layout, encoding=encoding)) or [0]
+            for index, start in enumerate(offsets):
+                end = offsets[index + 1] if index + 1 < len(offsets) else len(data)
+                text = data[start:end].decode(encoding).rstrip("\r\n")
+                for issue in validate_report(text, layout, max_issues=_OPTIONS["max_issues"]):
+                    issues.append({"declaration": index, **dataclasses.asdict(issue)})
+            result["declarations"] = len(offsets)
+            result["issues"] = issues
+    except Exception as exc:
+        # One unreadable or malformed file must not abort the whole batch.
+        result["error"] = f"{type(exc).__name__}: {exc}"
+    result["seconds"] = round(time.perf_counter() - started, 6)
+    return result
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("sources", nargs="+", help="Files, directories or glob patterns")
+    parser.add_argument(
+        "--pattern", default="*.txt", help="File pattern inside directories (default: *.txt)"
+    )
+    parser.add_argument("--model", help="Force a model instead of detecting it per file")
+    parser.add_argument("--output", type=Path, help="JSONL report path (default: stdout)")
+    parser.add_argument("--workers", type=int, help="Worker processes (default: CPU count)")
+    parser.add_argument("--chunksize", type=int, default=16, help="Files per task (default: 16)")
+    parser.add_argument("--max-issues", type=int, help="Stop after N issues per declaration")
+    parser.add_argument("--encoding", default="iso-8859-1", help="File encoding")
+    args = parser.parse_args()
+
+    paths = [str(path) for path in _iter_paths(args.sources, args.pattern)]
+    options = {"model": args.model, "encoding": args.encoding, "max_issues": args.max_issues}
+    workers = args.workers or os.cpu_count() or 1
+    out = args.output.open("w", encoding="utf-8") if args.output else sys.stdout
+    files = failed = total_bytes = declarations = 0
+    started = time.perf_counter()
+    try:
+        with ProcessPoolExecutor(
+            max_workers=workers, initializer=_init_worker, initargs=(options,)
+        ) as executor:
+            for result in executor.map(_validate_file, paths, chunksize=args.chunksize):
+                files += 1
+                total_bytes += result["bytes"]
+                declarations += result["declarations"]
+                failed += bool(result.get("error") or result.get("issues"))
+                out.write(json.dumps(result, ensure_ascii=False) + "\n")
+    finally:
+        if args.output:
+            out.close()
+    elapsed = time.perf_counter() - started
+    rate = elapsed or float("inf")
+    print(
+        f"{files} files ({declarations} declarations, {total_bytes / 1e6:.2f} MB) "
+        f"in {elapsed:.2f}s with {workers} workers: "
+        f"{files / rate:.1f} files/s, {total_bytes / 1e6 / rate:.2f} MB/s; "
+        f"{failed} with issues",
+        file=sys.stderr,
+    )
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,50 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+from aeat_code2txt import load_layout, parse_report, render_report, render_to_stream
+from aeat_code2txt.archive import declaration_marker, detect_model, iter_reports, shard_ranges
+
+
+class ArchiveTestCase(unittest.TestCase):
+    def setUp(self):
+        self.layout = load_layout("303")
+        self.items = [{"01": str(n * 100), "identificacion_1_nif": f"NIF{n}"} for n in range(7)]
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = Path(self.tmp.name) / "archive.txt"
+        with self.path.open("wb") as fp:
+            render_to_stream(self.layout, self.items, fp)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_declaration_marker(self):
+        self.assertEqual(declaration_marker(self.layout), b"<T3030")
+        self.assertEqual(declaration_marker(load_layout("390")), b"<T3900")
+
+    def test_detect_model(self):
+        self.assertEqual(detect_model(self.path.read_bytes()), "303")
+        text = render_report(load_layout("390"), data={})
+        self.assertEqual(detect_model(text.encode("iso-8859-1")), "390")
+        self.assertIsNone(detect_model(b"<T3030", models=["390"]))
+        self.assertIsNone(detect_model(b"garbage"))
+
+    def test_iter_reports_yields_each_declaration(self):
+        expected = [
+            parse_report(render_report(self.layout, data=item), self.layout) for item in self.items
+        ]
+        self.assertEqual(list(iter_reports(self.path, self.layout)), expected)
+        projected = iter_reports(self.path, self.layout, fields=["identificacion_1_nif"])
+        nifs = [d["identificacion_1_nif"] for d in projected]
+        self.assertEqual(nifs, [f"NIF{n}" for n in range(7)])
+
+    def test_shards_cover_every_declaration_once(self):
+        seen = []
+        for start, end in shard_ranges(self.path, 3):
+            shard = iter_reports(self.path, self.layout, fields=["01"], start=start, end=end)
+            seen.extend(d["01"] for d in shard)
+        self.assertEqual(seen, [f"{n * 100:015d}00" for n in range(7)])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,129 @@
+import io
+import unittest
+from decimal import Decimal
+
+from aeat_code2txt import (
+    ParallelRenderer,
+    field_hook,
+    load_layout,
+    render_many,
+    render_report,
+    render_to_stream,
+)
+
+
+def upper_hook(field, raw, context):
+    return raw.upper()
+
+
+class RenderManyTestCase(unittest.TestCase):
+    def setUp(self):
+        self.layout = load_layout("303")
+        self.items = [
+            {"01": "1000", "03": "210", "ejercicio_de_devengo_eeee": "2025"},
+            {"01": Decimal("5.5"), "periodo": "1T"},
+        ]
+
+    def test_render_many_matches_render_report(self):
+        results = list(render_many(self.layout, self.items))
+        self.assertEqual([result.id for result in results], [0, 1])
+        for result, item in zip(results, self.items):
+            self.assertIsNone(result.error)
+            self.assertEqual(result.text, render_report(self.layout, data=item))
+
+    def test_render_many_collects_errors(self):
+        items = [{"nope": "1"}, {"03": "-1"}, self.items[0]]
+        results = list(render_many(self.layout, items, ids=["a", "b", "c"], strict=True))
+        self.assertEqual([result.id for result in results], ["a", "b", "c"])
+        self.assertIn("Unknown data keys", str(results[0].error))
+        self.assertIsInstance(results[1].error, ValueError)
+        self.assertIsNone(results[1].text)
+        self.assertIsNone(results[2].error)
+
+    def test_ids_must_match_items(self):
+        items = self.items + [self.items[0]]
+        for ids in (["a"], ["a", "b", "c", "d"]):
+            with self.subTest(ids=ids), self.assertRaises(ValueError):
+                list(render_many(self.layout, items, ids=ids))
+            with self.subTest(ids=ids, stream=True), self.assertRaises(ValueError):
+                render_to_stream(self.layout, items, io.BytesIO(), ids=ids)
+        with ParallelRenderer(self.layout, workers=1) as renderer:
+            with self.assertRaises(ValueError):
+                list(renderer.render_many(items, ids=["a"]))
+
+    def test_parallel_preserves_order_and_hooks(self):
+        items = [{"01": str(n), "ejercicio_de_devengo_eeee": f"y{n}"} for n in range(25)]
+        expected = list(render_many(self.layout, items, value_hooks=[upper_hook]))
+        with ParallelRenderer(
+            self.layout, workers=2, chunksize=4, value_hooks=[upper_hook]
+        ) as renderer:
+            results = list(renderer.render_many(items))
+        self.assertEqual(results, expected)
+        results = list(render_many(self.layout, items[:5], workers=2, chunksize=2))
+        self.assertEqual([r.text for r in results], [r.text for r in render_many(self.layout, items[:5])])
+
+    def test_parallel_rejects_unpicklable_hooks(self):
+        with self.assertRaises(TypeError):
+            ParallelRenderer(self.layout, workers=1, value_hooks=[lambda f, raw, ctx: raw])
+
+    def test_field_hooks_match_selective_global_hooks(self):
+        items = [{"01": "5", "periodo_pp": "1t", "ejercicio_de_devengo_eeee": "y2025"}]
+        selectors = [
+            ({"key": "periodo_pp"}, lambda record, field: field.key == "periodo_pp"),
+            ({"code": ["01", "03"]}, lambda record, field: field.code in ("01", "03")),
+            ({"record": "DP30300"}, lambda record, field: record.name == "DP30300"),
+            (
+                {"record": "DP30300", "raw_type": "An"},
+                lambda record, field: record.name == "DP30300" and field.raw_type.strip() == "An",
+            ),
+        ]
+        for selector, matches in selectors:
+            selected = {
+                id(field)
+                for record in self.layout.records
+                for field in record.fields
+                if matches(record, field)
+            }
+            seen = []
+
+            def targeted(field, raw, context):
+                seen.append(id(field))
+                return raw.upper()
+
+            def global_hook(field, raw, context):
+                return raw.upper() if id(field) in selected else raw
+
+            with self.subTest(selector=selector):
+                expected = list(render_many(self.layout, items, value_hooks=[global_hook]))
+                hooks = [field_hook(targeted, **selector)]
+                self.assertEqual(list(render_many(self.layout, items, value_hooks=hooks)), expected)
+                self.assertEqual(set(seen), selected)
+
+    def test_field_hooks_in_parallel(self):
+        items = [{"periodo_pp": f"{n}t", "ejercicio_de_devengo_eeee": "y2025"} for n in range(6)]
+        hooks = [field_hook(upper_hook, key="periodo_pp")]
+        expected = list(render_many(self.layout, items, value_hooks=hooks))
+        self.assertTrue(expected[1].text.startswith("<T3030y2021T"))
+        with ParallelRenderer(self.layout, workers=1, chunksize=2, value_hooks=hooks) as renderer:
+            self.assertEqual(list(renderer.render_many(items)), expected)
+
+    def test_render_to_stream_encodes_and_flushes(self):
+        items = [{"01": "1", "identificacion_1_apellidos_y_nombre_o_razon_social": "Peña"}] * 3
+        fp = io.BytesIO()
+        written = render_to_stream(self.layout, items, fp, buffer_size=1)
+        self.assertEqual(written, 3)
+        expected = render_report(self.layout, data=items[0]) + "\r\n"
+        self.assertEqual(fp.getvalue(), expected.encode("iso-8859-1") * 3)
+
+    def test_render_to_stream_errors(self):
+        items = [{"03": "-1"}, {"01": "1"}]
+        with self.assertRaises(ValueError):
+            render_to_stream(self.layout, items, io.BytesIO())
+        failed = []
+        fp = io.BytesIO()
+        self.assertEqual(render_to_stream(self.layout, items, fp, on_error=failed.append), 1)
+        self.assertEqual([result.id for result in failed], [0])
+
+
+if __name__ == "__main__":
+    unittest.main()
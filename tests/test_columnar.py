@@ -0,0 +1,73 @@
+import io
+import tempfile
+import unittest
+from pathlib import Path
+
+from aeat_code2txt import iter_reports, load_layout, render_to_stream
+
+try:
+    import numpy
+except ImportError:  # pragma: no cover - optional dependency
+    numpy = None
+
+try:
+    import pyarrow
+except ImportError:  # pragma: no cover - optional dependency
+    pyarrow = None
+
+
+@unittest.skipUnless(numpy, "numpy is not installed")
+class ColumnarTestCase(unittest.TestCase):
+    def setUp(self):
+        from aeat_code2txt.columnar import read_columns
+
+        self.read_columns = read_columns
+        self.layout = load_layout("303")
+        items = [
+            {"01": str(n), "14": str(-n / 100), "identificacion_1_nif": f" NIF{n}"}
+            for n in range(5)
+        ]
+        fp = io.BytesIO()
+        render_to_stream(self.layout, items, fp)
+        self.raw = fp.getvalue()
+
+    def test_columns_match_iter_reports(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "archive.txt"
+            path.write_bytes(self.raw)
+            columns = self.read_columns(path, self.layout)
+            rows = list(iter_reports(path, self.layout, typed=True))
+        self.assertEqual(columns["01"].tolist(), [0, 100, 200, 300, 400])
+        self.assertEqual(columns["14"].tolist(), [0, -1, -2, -3, -4])
+        for key, column in columns.items():
+            if column.dtype.kind == "U":
+                self.assertEqual(column.tolist(), [row[key] for row in rows], key)
+
+    def test_irregular_files_and_projection(self):
+        for raw in (b"junk\r\n" + self.raw, self.raw.replace(b"\r\n", b"\n"), self.raw[:-2]):
+            columns = self.read_columns(raw, self.layout, fields=["[01]", "identificacion_1_nif"])
+            self.assertEqual(sorted(columns), ["01", "identificacion_1_nif"])
+            self.assertEqual(columns["identificacion_1_nif"].tolist()[-1], "NIF4")
+        with self.assertRaises(ValueError):
+            self.read_columns(self.raw.replace(b"NIF4", b"NIF"), self.layout)
+
+    def test_empty_file(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "empty.txt"
+            path.write_bytes(b"")
+            columns = self.read_columns(path, self.layout)
+        expected = self.read_columns(b"", self.layout)
+        self.assertEqual(
+            [(key, column.dtype, len(column)) for key, column in columns.items()],
+            [(key, column.dtype, 0) for key, column in expected.items()],
+        )
+
+    @unittest.skipUnless(pyarrow, "pyarrow is not installed")
+    def test_arrow_table(self):
+        table = self.read_columns(self.raw, self.layout, fields=["01"], as_arrow=True)
+        self.assertEqual(table.column("01").to_pylist(), [0, 100, 200, 300, 400])
+        self.assertEqual(table.schema.field("01").metadata, {b"decimals": b"2"})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,139 @@
+import json
+import unittest
+from decimal import Decimal
+from pathlib import Path
+
+from aeat_code2txt import load_layout, render_report, render_report_bytes
+from aeat_code2txt.compiler import compile_record, compile_report
+from aeat_code2txt.layout import Field, RecordLayout
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+def _record():
+    fields = [
+        Field(
+            number=1,
+            position=1,
+            length=2,
+            raw_type="An",
+            description="Const",
+            validation="",
+            content="Constante \"AA\"",
+            const_value="AA",
+            key="const",
+        ),
+        Field(
+            number=2,
+            position=3,
+            length=5,
+            raw_type="N",
+            description="Code [01]",
+            validation="",
+            content="",
+            code="01",
+            decimals=2,
+            key="01",
+        ),
+        Field(
+            number=3,
+            position=10,
+            length=3,
+            raw_type="An",
+            description="Name",
+            validation="",
+            content="",
+            key="name",
+        ),
+    ]
+    return RecordLayout(name="TEST", fields=fields)
+
+
+class CompilerTestCase(unittest.TestCase):
+    def test_template_bakes_constants_and_gaps(self):
+        plan = compile_record(_record())
+        self.assertEqual(plan.length, 12)
+        self.assertEqual([slot.key for slot in plan.slots], ["01", "name"])
+        self.assertEqual(plan.template, "AA  ")
+
+    def test_compiled_matches_per_field_path(self):
+        record = _record()
+        plan = compile_record(record)
+        args = ({"01": Decimal("-1.5")}, {"name": "abcd"}, {}, {})
+        fast = plan.render(*args)
+        slow = plan.render(*args, value_hooks=[lambda field, raw, ctx: raw])
+        self.assertEqual(fast, "AAN0150  abc")
+        self.assertEqual(fast, slow)
+
+    def test_const_override_and_overflow(self):
+        plan = compile_record(_record())
+        self.assertTrue(plan.render({}, {}, {"const": "ZZ"}, {}).startswith("ZZ"))
+        with self.assertRaises(ValueError):
+            plan.render({"01": Decimal("1000")}, {}, {}, {})
+
+    def test_compiled_report_is_cached(self):
+        layout = load_layout("303")
+        self.assertIs(compile_report(layout), compile_report(layout))
+        self.assertIs(compile_report(layout).records[0], compile_record(layout.records[0]))
+
+    def test_render_report_matches_sample_output(self):
+        layout = load_layout("303")
+        data = json.loads((ROOT / "examples" / "data_303.json").read_text(encoding="utf-8"))
+        expected = (ROOT / "examples" / "output_303.txt").read_text(encoding="utf-8")
+        text = render_report(layout, data=data)
+        self.assertEqual(text.splitlines(), expected.splitlines())
+
+    def test_fixed_point_matches_decimal_rendering(self):
+        layout = load_layout("303")
+        data = json.loads((ROOT / "examples" / "data_303.json").read_text(encoding="utf-8"))
+        self.assertEqual(compile_report(layout).scale, 2)
+        variants = [
+            data,
+            {**data, "01": "12.345", "03": "1e2", "04": 7, "06": Decimal("0.10")},
+            {**data, "01": "0.05", "03": "-0", "28": 0.5},
+        ]
+        for item in variants:
+            with self.subTest(item=item.get("01")):
+                self.assertEqual(
+                    render_report(layout, data=item, fixed_point=True),
+                    render_report(layout, data=item),
+                )
+
+    def test_fixed_point_checks_sign_and_length(self):
+        layout = load_layout("303")
+        with self.assertRaisesRegex(ValueError, "Field length mismatch"):
+            render_report(layout, data={"01": "1" * 20}, fixed_point=True)
+        with self.assertRaisesRegex(ValueError, "Negative value not allowed"):
+            render_report(layout, data={"01": "-1"}, fixed_point=True)
+
+    def test_blank_image_matches_encoded_text(self):
+        layout = load_layout("303")
+        data = json.loads((ROOT / "examples" / "data_303.json").read_text(encoding="utf-8"))
+        key = next(key for key in data if not key.isdigit())
+        image = compile_report(layout).image()
+        self.assertEqual(len(image.blank), len(render_report(layout).encode("iso-8859-1")))
+        variants = [
+            ({}, None),
+            (data, None),
+            ({**data, key: "ÑANDÚ", "03": 0, "04": "7.5"}, None),
+            (data, {"constante": "X"}),
+        ]
+        for item, overrides in variants:
+            with self.subTest(overrides=overrides):
+                expected = render_report(layout, data=item, overrides=overrides)
+                self.assertEqual(
+                    render_report_bytes(layout, data=item, overrides=overrides),
+                    expected.encode("iso-8859-1"),
+                )
+        # Characters that do not fit the blank image fall back to encoding the text.
+        item = {**data, key: "€ñ"}
+        self.assertEqual(
+            render_report_bytes(layout, data=item, encoding="utf-8"),
+            render_report(layout, data=item).encode("utf-8"),
+        )
+        with self.assertRaisesRegex(ValueError, "Negative value not allowed"):
+            render_report_bytes(layout, data={"01": "-1"})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,64 @@
+import unittest
+from decimal import Decimal
+
+from aeat_code2txt import load_layout, render_report, validate_report
+from aeat_code2txt.formulas import build_formula_graph, compile_formula, evaluate_formula
+from aeat_code2txt.layout import Field, RecordLayout
+
+
+def _field(number, code, formula=None):
+    return Field(
+        number=number,
+        position=(number - 1) * 4 + 1,
+        length=4,
+        raw_type="N",
+        description=f"[{code}]",
+        validation="",
+        content="",
+        code=code,
+        formula=formula,
+        decimals=0,
+        key=code,
+    )
+
+
+class FormulaGraphTestCase(unittest.TestCase):
+    def test_compile_formula_terms(self):
+        compiled = compile_formula("[80]+[81] - [79]-[99] [12]")
+        self.assertEqual(
+            compiled.terms, ((1, "80"), (1, "81"), (-1, "79"), (-1, "99"), (-1, "12"))
+        )
+        self.assertIs(compile_formula("[80]+[81] - [79]-[99] [12]"), compiled)
+        self.assertEqual(compile_formula("").terms, ())
+        values = {"80": Decimal("1.5"), "79": Decimal("2"), "12": Decimal("1")}
+        self.assertEqual(evaluate_formula(compiled.formula, values), Decimal("-1.5"))
+
+    def test_graph_orders_cross_record_dependencies(self):
+        first = RecordLayout(name="A", fields=[_field(1, "3", "[2] + [1]"), _field(2, "1")])
+        second = RecordLayout(name="B", fields=[_field(1, "2", "[1] + [1]")])
+        graph = build_formula_graph([first, second])
+        self.assertEqual([node.code for node in graph.nodes], ["2", "3"])
+        computed = graph.evaluate({"1": Decimal(5)})
+        self.assertEqual(computed, {"2": Decimal(10), "3": Decimal(15)})
+
+    def test_graph_rejects_cycles(self):
+        record = RecordLayout(
+            name="A", fields=[_field(1, "1", "[2]"), _field(2, "2", "[3] - [1]"), _field(3, "3")]
+        )
+        with self.assertRaisesRegex(ValueError, "Formula cycle: 1 -> 2 -> 1"):
+            build_formula_graph([record])
+
+    def test_303_result_sees_totals_from_other_records(self):
+        layout = load_layout("303")
+        text = render_report(layout, data={"01": "100", "03": "21", "28": "50", "29": "10.5"})
+        data_64 = [node for node in build_formula_graph(layout.records).nodes if node.code == "64"]
+        self.assertEqual(data_64[0].compiled.codes, ("46", "58", "76"))
+        computed = build_formula_graph(layout.records).evaluate(
+            {"03": Decimal("21"), "29": Decimal("10.5")}
+        )
+        self.assertEqual(computed["64"], Decimal("10.5"))
+        self.assertEqual(validate_report(text, layout), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,77 @@
+import subprocess
+import sys
+import unittest
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+
+# Modules that rendering must not pull in.
+RENDER_EXCLUDES = (
+    "aeat_code2txt.archive",
+    "aeat_code2txt.parallel",
+    "aeat_code2txt.parser",
+    "aeat_code2txt.reverse",
+    "concurrent.futures",
+    "csv",
+    "multiprocessing",
+    "unicodedata",
+)
+# Heavy modules that resolving ``aeat_code2txt.render_report`` must not load.
+LAZY_MODULES = ("aeat_code2txt.service", "aeat_code2txt.columnar", "numpy")
+
+
+def _imported_modules(statement: str) -> set[str]:
+    """Modules imported by ``statement``, as listed by ``python -X importtime``."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        capture_output=True,
+        text=True,
+        check=True,
+        cwd=ROOT,
+    )
+    modules = set()
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        self_us, _, name = line[len("import time:") :].split("|")
+        if self_us.strip().isdigit():  # skip the column header
+            modules.add(name.strip())
+    return modules
+
+
+class ImportTimeTestCase(unittest.TestCase):
+    def test_render_import_stays_lean(self):
+        modules = _imported_modules("from aeat_code2txt import load_layout, render_report")
+        self.assertIn("aeat_code2txt.renderer", modules)
+        self.assertEqual(
+            [name for name in RENDER_EXCLUDES if name in modules], [], "render imports too much"
+        )
+
+    def test_render_leaves_heavy_modules_unloaded(self):
+        # Timing is left to the benchmarks; here only what gets loaded.
+        result = subprocess.run(
+            [
+                sys.executable,
+                "-c",
+                "import sys, aeat_code2txt; aeat_code2txt.render_report; "
+                f"print([name for name in {LAZY_MODULES!r} if name in sys.modules])",
+            ],
+            capture_output=True,
+            text=True,
+            check=True,
+            cwd=ROOT,
+        )
+        self.assertEqual(result.stdout.strip(), "[]")
+
+    def test_public_names_resolve_lazily(self):
+        import aeat_code2txt
+
+        for name in aeat_code2txt.__all__:
+            self.assertIsNotNone(getattr(aeat_code2txt, name))
+        self.assertIn("render_report", dir(aeat_code2txt))
+        with self.assertRaises(AttributeError):
+            aeat_code2txt.missing_name
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,107 @@
+import json
+import unittest
+import urllib.request
+from pathlib import Path
+
+from aeat_code2txt import (
+    Instrumentation,
+    compile_report,
+    field_hook,
+    load_layout,
+    parse_report,
+    render_report,
+    validate_report,
+)
+from aeat_code2txt.instrumentation import serve_prometheus
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+def upper_hook(field, raw, context):
+    return raw.upper()
+
+
+class InstrumentationTestCase(unittest.TestCase):
+    def setUp(self):
+        self.layout = load_layout("303")
+        self.data = json.loads((ROOT / "examples" / "data_303.json").read_text(encoding="utf-8"))
+        self.instrumentation = Instrumentation()
+
+    def test_render_is_unchanged_and_counted(self):
+        text = render_report(self.layout, data=self.data, instrumentation=self.instrumentation)
+        self.assertEqual(text, render_report(self.layout, data=self.data))
+        render_report(
+            self.layout,
+            data=self.data,
+            value_hooks=[upper_hook],
+            instrumentation=self.instrumentation,
+        )
+        snapshot = self.instrumentation.snapshot()
+        fields = sum(len(record.fields) for record in self.layout.records)
+        self.assertEqual(snapshot["counters"]['returns{operation="render"}'], 2)
+        self.assertEqual(snapshot["counters"]['records{operation="render"}'], 14)
+        self.assertEqual(snapshot["counters"]['fields{operation="render"}'], 2 * fields)
+        for phase in ("compile", "split", "formulas", "format", "join"):
+            self.assertEqual(snapshot["phases"][f"render.{phase}"]["calls"], 2)
+        hook = snapshot["hooks"][f"value:{__name__}.upper_hook"]
+        self.assertEqual(hook["calls"], fields)
+
+    def test_hooks_are_wrapped_once(self):
+        hooks = [upper_hook, field_hook(upper_hook, key="periodo_pp")]
+        timed = self.instrumentation.timed_hooks(hooks, "value")
+        self.assertEqual(timed, self.instrumentation.timed_hooks(hooks, "value"))
+        self.assertIs(timed[0], self.instrumentation.timed_hooks(hooks, "value")[0])
+        record = compile_report(self.layout).records[0]
+        for _ in range(3):
+            render_report(
+                self.layout,
+                data=self.data,
+                value_hooks=hooks,
+                instrumentation=self.instrumentation,
+            )
+        self.assertEqual(sum(key == tuple(timed) for key in record._hook_tables), 1)
+        calls = self.instrumentation.snapshot()["hooks"][f"value:{__name__}.upper_hook"]["calls"]
+        self.assertGreater(calls, 0)
+        self.assertEqual(calls % 3, 0)
+
+    def test_errors_are_counted(self):
+        with self.assertRaises(ValueError):
+            render_report(self.layout, data={"01": "-1"}, instrumentation=self.instrumentation)
+        self.assertEqual(
+            self.instrumentation.snapshot()["counters"]['errors{operation="render"}'], 1
+        )
+
+    def test_parse_and_validate_issues_by_type(self):
+        text = render_report(self.layout, data=self.data)
+        self.assertEqual(
+            parse_report(text, self.layout, instrumentation=self.instrumentation),
+            parse_report(text, self.layout),
+        )
+        lines = text.split("\r\n")
+        lines[0] = "X" + lines[0][1:]
+        broken = "\r\n".join(lines)
+        issues = validate_report(broken, self.layout, instrumentation=self.instrumentation)
+        self.assertTrue(issues)
+        self.assertEqual(issues, validate_report(broken, self.layout))
+        counters = self.instrumentation.snapshot()["counters"]
+        self.assertEqual(counters['records{operation="parse"}'], len(self.layout.records))
+        self.assertEqual(counters['issues{type="const"}'], len(issues))
+
+    def test_prometheus_text(self):
+        render_report(self.layout, data=self.data, instrumentation=self.instrumentation)
+        text = self.instrumentation.to_prometheus()
+        self.assertIn("# TYPE aeat_code2txt_returns_total counter", text)
+        self.assertIn('aeat_code2txt_returns_total{operation="render"} 1\n', text)
+        self.assertIn('aeat_code2txt_phase_calls_total{operation="render",phase="format"} 1', text)
+        server = serve_prometheus(self.instrumentation, port=0)
+        try:
+            url = f"http://127.0.0.1:{server.server_address[1]}/metrics"
+            with urllib.request.urlopen(url, timeout=5) as response:
+                self.assertEqual(response.read().decode("utf-8"), text)
+        finally:
+            server.shutdown()
+            server.server_close()
+
+
+if __name__ == "__main__":
+    unittest.main()
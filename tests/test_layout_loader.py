@@ -0,0 +1,167 @@
+import dataclasses
+import hashlib
+import json
+import marshal
+import os
+import pickle
+import tempfile
+import unittest
+from pathlib import Path
+
+from aeat_code2txt import layout_loader, parse_report, render_report
+from aeat_code2txt.layout import CompactField, Field, RecordLayout, ReportLayout
+from aeat_code2txt.layout_loader import load_layout, load_layout_json
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+class LayoutLoaderTestCase(unittest.TestCase):
+    def test_load_layout_is_memoized(self):
+        layout = load_layout("303")
+        self.assertIs(load_layout("303"), layout)
+        layout_loader.invalidate("303")
+        reloaded = load_layout("303")
+        self.assertIsNot(reloaded, layout)
+        self.assertEqual(reloaded, layout)
+
+    def test_preload_bundled_models(self):
+        layout_loader.invalidate()
+        layout_loader.preload()
+        self.assertEqual(layout_loader.bundled_models(), ["303", "390"])
+        self.assertEqual(set(layout_loader._LAYOUTS), {"303", "390"})
+
+    def test_load_layout_json_reloads_on_mtime_change(self):
+        payload = {
+            "name": "T",
+            "records": [
+                {
+                    "name": "R",
+                    "fields": [
+                        {
+                            "number": 1,
+                            "position": 1,
+                            "length": 2,
+                            "raw_type": "An",
+                            "description": "Const",
+                            "const_value": "<T",
+                        }
+                    ],
+                }
+            ],
+        }
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "layout.json"
+            path.write_text(json.dumps(payload), encoding="utf-8")
+            layout = load_layout_json(path)
+            self.assertIs(load_layout_json(path), layout)
+            field = layout.records[0].fields[0]
+            self.assertEqual((field.const_value, field.validation, field.code), ("<T", "", None))
+
+            payload["name"] = "U"
+            path.write_text(json.dumps(payload), encoding="utf-8")
+            stat = path.stat()
+            os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+            self.assertEqual(load_layout_json(path).name, "U")
+
+    def test_compact_layout_renders_and_parses_identically(self):
+        layout = load_layout("303")
+        compact = load_layout("303", compact=True)
+        self.assertIs(load_layout("303", compact=True), compact)
+        self.assertIsInstance(compact.records[0].fields[0], CompactField)
+        data = json.loads((ROOT / "examples" / "data_303.json").read_text(encoding="utf-8"))
+        text = render_report(layout, data=data)
+        self.assertEqual(render_report(compact, data=data), text)
+        self.assertEqual(parse_report(text, compact), parse_report(text, layout))
+        self.assertLess(len(pickle.dumps(compact)), len(pickle.dumps(layout)) / 2)
+
+    def test_compact_field_loads_text_lazily(self):
+        compact = load_layout("390", compact=True)
+        regular = load_layout("390")
+        field = compact.records[1].fields[5]
+        expected = regular.records[1].fields[5]
+        self.assertEqual(
+            (field.description, field.validation, field.content),
+            (expected.description, expected.validation, expected.content),
+        )
+        self.assertEqual(pickle.loads(pickle.dumps(field)), field)
+        with self.assertRaises(dataclasses.FrozenInstanceError):
+            field.length = 1
+
+    def test_bundled_blobs_match_json(self):
+        for model in layout_loader.bundled_models():
+            source = layout_loader._resource(model).read_bytes()
+            blob = layout_loader._resource(model, ".bin").read_bytes()
+            from_json = layout_loader._build_layout(json.loads(source), model)
+            self.assertEqual(layout_loader._load(source, blob, model, None), from_json)
+
+    def test_loaded_fields_equal_constructed_fields(self):
+        # The loader fills Field.__dict__ directly instead of calling __init__.
+        for model in layout_loader.bundled_models():
+            source = layout_loader._resource(model).read_bytes()
+            blob = layout_loader._resource(model, ".bin").read_bytes()
+            expected = [
+                Field(**raw)
+                for record in json.loads(source)["records"]
+                for raw in record.get("fields", [])
+            ]
+            for layout in (
+                layout_loader._build_layout(json.loads(source), model),
+                layout_loader._load(source, blob, model, None),
+            ):
+                loaded = [field for record in layout.records for field in record.fields]
+                self.assertEqual(loaded, expected)
+                self.assertEqual([vars(field) for field in loaded], [vars(f) for f in expected])
+                self.assertEqual(list(map(hash, loaded)), list(map(hash, expected)))
+
+    def test_load_layout_json_prefers_fresh_blob(self):
+        payload = {"name": "T", "records": [{"name": "R", "fields": []}]}
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "layout.json"
+            path.write_bytes(json.dumps(payload).encode("utf-8"))
+            # A blob with the source's hash but another name proves it is read.
+            digest = hashlib.sha256(path.read_bytes()).hexdigest()
+            blob = layout_loader.BLOB_MAGIC + marshal.dumps(
+                (layout_loader.BLOB_VERSION, digest, "FROM_BLOB", ())
+            )
+            path.with_suffix(".bin").write_bytes(blob)
+            self.assertEqual(load_layout_json(path).name, "FROM_BLOB")
+
+            payload["name"] = "U"
+            path.write_bytes(json.dumps(payload).encode("utf-8"))
+            stat = path.stat()
+            os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+            self.assertEqual(load_layout_json(path).name, "U")
+
+    def test_lookup_indexes_are_built_once(self):
+        layout = load_layout("303")
+        self.assertIn("known_keys", vars(layout))
+        self.assertIs(layout.field_by_code(), layout.field_by_code())
+        self.assertEqual(layout.record_by_code()["01"].name, "DP30301")
+        self.assertEqual(layout.field_by_code()["01"].code, "01")
+        self.assertEqual(
+            layout.record_lengths, tuple(record.length() for record in layout.records)
+        )
+        self.assertIn("identificacion_1_nif", layout.known_keys)
+        with self.assertRaises(TypeError):
+            layout.records[0].field_by_key()["x"] = None
+        restored = pickle.loads(pickle.dumps(layout))
+        self.assertNotIn("known_keys", vars(restored))
+        self.assertEqual(restored.known_keys, layout.known_keys)
+
+    def test_layouts_store_tuples(self):
+        fields = list(load_layout("303").records[0].fields)
+        record = RecordLayout(name="R", fields=fields)
+        records = [record]
+        report = ReportLayout(name="T", records=records)
+        self.assertEqual(report.known_keys, record.known_keys)
+        fields.pop()
+        records.clear()
+        self.assertIsInstance(record.fields, tuple)
+        self.assertIsInstance(report.records, tuple)
+        self.assertEqual(report.records, (record,))
+        self.assertIn(fields[-1], record.fields)
+        self.assertEqual(len(record.fields), len(fields) + 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,52 @@
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+class RegenerateTestCase(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.root = Path(tmp.name)
+        shutil.copytree(ROOT / "csv_x2c_390", self.root / "csv_x2c_390")
+
+    def _run(self, *args: str) -> str:
+        result = subprocess.run(
+            [sys.executable, str(ROOT / "scripts" / "regenerate.py"), "--models", "390"]
+            + ["--from-csv", "--root", str(self.root), *args],
+            capture_output=True,
+            text=True,
+            check=True,
+            env={**os.environ, "PYTHONPATH": str(ROOT)},
+        )
+        return result.stdout
+
+    def test_incremental_regeneration(self):
+        self.assertIn("parsed 10/10 sheets", self._run("--workers", "2"))
+        bundled = ROOT / "aeat_code2txt" / "layouts"
+        generated = self.root / "aeat_code2txt" / "layouts"
+        for name in ("layouts_390.json", "layouts_390.bin"):
+            self.assertEqual((generated / name).read_bytes(), (bundled / name).read_bytes())
+        self.assertIn("390: up to date", self._run())
+
+        sheet = sorted((self.root / "csv_x2c_390").glob("*.csv"))[0]
+        with sheet.open("a", encoding="utf-8") as f:
+            f.write("\n")
+        self.assertIn("parsed 1/10 sheets, wrote nothing", self._run())
+
+        (generated / "layouts_390.bin").unlink()
+        output = self._run()
+        self.assertIn("parsed 0/10 sheets", output)
+        self.assertEqual(
+            (generated / "layouts_390.bin").read_bytes(), (bundled / "layouts_390.bin").read_bytes()
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,81 @@
+import mmap
+import tempfile
+import unittest
+from decimal import Decimal
+from pathlib import Path
+
+from aeat_code2txt import load_layout, parse_report, render_report, validate_report
+from aeat_code2txt.reverse import iter_issues, parse_report_bytes
+
+DATA = {
+    "01": "1000",
+    "03": "210",
+    "identificacion_1_nif": "B1234567Ñ",
+    "devengo_2_ejercicio": "2025",
+    "devengo_2_periodo": "1T",
+}
+
+
+class ReverseBytesTestCase(unittest.TestCase):
+    def setUp(self):
+        self.layout = load_layout("303")
+        self.text = render_report(self.layout, data=DATA)
+        self.raw = self.text.encode("iso-8859-1")
+
+    def test_parse_report_bytes_matches_parse_report(self):
+        expected = parse_report(self.text, self.layout)
+        self.assertEqual(parse_report_bytes(self.raw, self.layout), expected)
+        lf = self.text.replace("\r\n", "\n").encode("iso-8859-1")
+        self.assertEqual(parse_report_bytes(memoryview(lf), self.layout), expected)
+
+    def test_projection_and_typed_values(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "303.txt"
+            path.write_bytes(self.raw)
+            with path.open("rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                fields = ["[03]", "identificacion_1_nif", "devengo_2_periodo"]
+                data = parse_report_bytes(mm, self.layout, fields=fields, typed=True)
+        expected = {
+            "03": Decimal("210.00"),
+            "identificacion_1_nif": "B1234567Ñ",
+            "devengo_2_periodo": "1T",
+        }
+        self.assertEqual(data, expected)
+        with self.assertRaises(KeyError):
+            parse_report_bytes(self.raw, self.layout, fields=["nope"])
+
+    def test_short_lines_are_tolerated(self):
+        lines = self.text.split("\r\n")
+        lines[0] = lines[0].rstrip()
+        text = "\r\n".join(lines)
+        data = parse_report_bytes(text.encode("iso-8859-1"), self.layout)
+        self.assertEqual(data, parse_report(text, self.layout))
+
+
+class ValidateReportTestCase(unittest.TestCase):
+    def setUp(self):
+        self.layout = load_layout("303")
+        self.text = render_report(self.layout, data=DATA)
+
+    def test_valid_report_has_no_issues(self):
+        self.assertEqual(validate_report(self.text, self.layout), [])
+
+    def test_issues_stream_in_line_order(self):
+        lines = self.text.split("\r\n")
+        lines[0] = "<X" + lines[0][2:]
+        # [01] is part of [27] in DP30301; break the total without touching its inputs.
+        lines[1] = lines[1].replace("00000000000000210", "00000000000000211", 1)
+        lines[3] = lines[3][:13] + "ABC" + lines[3][16:]
+        text = "\r\n".join(lines)
+        issues = iter_issues(text, self.layout)
+        first = next(issues)
+        self.assertEqual((first.record, first.message), ("DP30300", "Const mismatch: '<X'"))
+        messages = [issue.message for issue in issues]
+        self.assertTrue(any(m.startswith("Formula mismatch") for m in messages))
+        self.assertIn("Invalid number: '00ABC000000000000'", messages)
+        self.assertEqual(len(validate_report(text, self.layout, max_issues=2)), 2)
+        self.assertEqual(validate_report(text, self.layout, fail_fast=True), [first])
+
+
+if __name__ == "__main__":
+    unittest.main()
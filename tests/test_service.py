@@ -0,0 +1,95 @@
+import asyncio
+import json
+import unittest
+from pathlib import Path
+
+from aeat_code2txt import load_layout, render_report
+from aeat_code2txt.service import RenderService, ServiceOverloaded, _dispatch, serve
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+class RenderServiceTestCase(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.data = json.loads((ROOT / "examples" / "data_303.json").read_text(encoding="utf-8"))
+        self.expected = render_report(load_layout("303"), data=self.data)
+        self.service = RenderService(["303"], workers=1, max_in_flight=8, batch_size=4)
+
+    async def asyncTearDown(self):
+        await self.service.close()
+
+    async def test_render_and_validate(self):
+        texts = await asyncio.gather(*(self.service.render("303", self.data) for _ in range(20)))
+        self.assertEqual(texts, [self.expected] * 20)
+        self.assertEqual(await self.service.validate("303", self.expected), [])
+        self.assertEqual(self.service.in_flight, 0)
+
+    async def test_errors_and_unknown_models(self):
+        with self.assertRaisesRegex(ValueError, "Negative value not allowed"):
+            await self.service.render("303", {"01": "-1"})
+        with self.assertRaisesRegex(ValueError, "not served"):
+            await self.service.render("390", self.data)
+
+    async def test_timeout_releases_slot(self):
+        with self.assertRaises(asyncio.TimeoutError):
+            await self.service.render("303", self.data, timeout=0)
+        await self.service.render("303", self.data)
+        self.assertEqual(self.service.in_flight, 0)
+
+    async def test_backpressure(self):
+        service = RenderService(["303"], workers=1, max_in_flight=1, max_waiting=1)
+        try:
+            first = asyncio.ensure_future(service.render("303", self.data))
+            second = asyncio.ensure_future(service.render("303", self.data))
+            while service.waiting < 1:
+                await asyncio.sleep(0)
+            self.assertEqual(service.in_flight, 1)
+            with self.assertRaises(ServiceOverloaded):
+                await service.render("303", self.data)
+            self.assertEqual(await asyncio.gather(first, second), [self.expected] * 2)
+        finally:
+            await service.close()
+
+    async def test_http_stand_in(self):
+        server = await serve(self.service, port=0)
+        port = server.sockets[0].getsockname()[1]
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        try:
+            responses = []
+            for path, body in (
+                ("/render/303", json.dumps(self.data).encode()),
+                ("/validate/303", self.expected.encode("iso-8859-1")),
+                ("/render/999", b"{}"),
+            ):
+                writer.write(
+                    f"POST {path} HTTP/1.1\r\nContent-Length: {len(body)}\r\n\r\n".encode()
+                    + body
+                )
+                status = (await reader.readline()).split()[1]
+                headers = {}
+                while (line := await reader.readline()) != b"\r\n":
+                    name, _, value = line.decode().partition(":")
+                    headers[name.lower()] = value.strip()
+                payload = await reader.readexactly(int(headers["content-length"]))
+                responses.append((int(status), payload))
+        finally:
+            writer.close()
+            server.close()
+            await server.wait_closed()
+        self.assertEqual(responses[0], (200, self.expected.encode("iso-8859-1")))
+        self.assertEqual(responses[1], (200, b"[]"))
+        self.assertEqual(responses[2][0], 404)
+
+    async def test_unexpected_errors_are_500(self):
+        async def render(model, data):
+            raise RuntimeError("worker died")
+
+        self.service.render = render
+        with self.assertLogs("aeat_code2txt.service", "ERROR") as logs:
+            status, _, payload = await _dispatch(self.service, "POST", "/render/303", b"{}")
+        self.assertEqual((status, json.loads(payload)), (500, {"error": "internal error"}))
+        self.assertIn("worker died", logs.output[0])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,71 @@
+import json
+import unittest
+from decimal import Decimal
+from pathlib import Path
+
+from aeat_code2txt import RenderSession, load_layout, render_report
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+class RenderSessionTestCase(unittest.TestCase):
+    def setUp(self):
+        self.layout = load_layout("303")
+        self.data = json.loads((ROOT / "examples" / "data_303.json").read_text(encoding="utf-8"))
+
+    def _assert_matches(self, session, data):
+        self.assertEqual(session.text, render_report(self.layout, data=data))
+
+    def test_initial_render_matches_render_report(self):
+        session = RenderSession(self.layout, self.data)
+        self._assert_matches(session, self.data)
+        self.assertEqual(session.text, "\r\n".join(session.records))
+
+    def test_update_propagates_through_formulas(self):
+        session = RenderSession(self.layout, self.data)
+        before = session.computed
+        data = dict(self.data)
+        for changes in ({"01": 1500}, {"03": 12.5, "28": 0}, {"59": "250.75"}):
+            data.update(changes)
+            session.update(changes)
+            self._assert_matches(session, data)
+        self.assertNotEqual(session.computed, before)
+        self.assertEqual(session.computed, RenderSession(self.layout, data).computed)
+        self.assertNotEqual(session.computed["27"], before["27"])
+
+    def test_update_text_and_removal(self):
+        session = RenderSession(self.layout, self.data)
+        data = dict(self.data)
+        key = next(key for key in data if not key.isdigit())
+        session.update({key: "X", "01": None})
+        data[key] = "X"
+        del data["01"]
+        self._assert_matches(session, data)
+
+    def test_unchanged_records_are_kept(self):
+        session = RenderSession(self.layout, self.data)
+        records = session.records
+        session.update({"01": 1500})
+        changed = [i for i, (a, b) in enumerate(zip(records, session.records)) if a != b]
+        self.assertTrue(changed)
+        self.assertLess(len(changed), len(records))
+        for index, record in enumerate(session.records):
+            if index not in changed:
+                self.assertIs(record, records[index])
+
+    def test_failed_update_leaves_state_unchanged(self):
+        session = RenderSession(self.layout, self.data)
+        text, computed = session.text, session.computed
+        with self.assertRaises(ValueError):
+            session.update({"01": Decimal("1e30")})
+        self.assertEqual(session.text, text)
+        self.assertEqual(session.computed, computed)
+
+    def test_strict_rejects_unknown_keys(self):
+        session = RenderSession(self.layout, self.data, strict=True)
+        with self.assertRaises(ValueError):
+            session.update({"not_a_field": "1"})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,72 @@
+import io
+import json
+import unittest
+from decimal import Decimal
+
+from aeat_code2txt import PayloadGenerator, compile_report, load_layout, render_report
+from aeat_code2txt.synthetic import CHUNK_SIZE, write_jsonl
+
+
+class SyntheticTestCase(unittest.TestCase):
+    def test_payloads_render_and_formulas_agree(self):
+        for model in ("303", "390"):
+            layout = load_layout(model)
+            formulas = compile_report(layout).formulas
+            fields = {
+                field.code or field.key: field
+                for record in layout.records
+                for field in record.fields
+                if field.const_value is None
+            }
+            with self.subTest(model=model):
+                for data in PayloadGenerator(layout).payloads(50, seed=1):
+                    render_report(layout, data=data, strict=True)
+                    amounts = {
+                        code: Decimal(value)
+                        for code, value in data.items()
+                        if code.isdigit() and code not in formulas.codes
+                    }
+                    computed = formulas.evaluate(amounts)
+                    self.assertEqual({code: Decimal(data[code]) for code in computed}, computed)
+                    for name, value in data.items():
+                        if value.startswith("-"):
+                            self.assertEqual(fields[name].raw_type.strip(), "N")
+
+    def test_draws_are_rarely_rejected(self):
+        # 303 has an unsigned total of a difference, [87] = [110] - [78].
+        generator = PayloadGenerator(load_layout("303"))
+        draw = generator._draw
+        draws = []
+
+        def counted(rng):
+            draws.append(1)
+            return draw(rng)
+
+        generator._draw = counted
+        payloads = list(generator.payloads(200, seed=3))
+        self.assertLess(len(draws), 1.1 * len(payloads))
+        self.assertTrue(all(not payload["87"].startswith("-") for payload in payloads))
+
+    def test_seed_and_fill(self):
+        generator = PayloadGenerator(load_layout("303"), fill=0.2, computed=False)
+        first = list(generator.payloads(5, seed="a"))
+        self.assertEqual(first, list(generator.payloads(5, seed="a")))
+        self.assertNotEqual(first, list(generator.payloads(5, seed="b")))
+        self.assertEqual(first[3:], list(generator.payloads(2, seed="a", start=3)))
+        self.assertLess(max(map(len, first)), len(generator.inputs) / 2)
+
+    def test_jsonl_same_with_workers(self):
+        layout = load_layout("390")
+        count = CHUNK_SIZE + 3
+        serial, parallel = io.BytesIO(), io.BytesIO()
+        self.assertEqual(write_jsonl(layout, count, serial, seed=2), count)
+        write_jsonl(layout, count, parallel, seed=2, workers=2)
+        self.assertEqual(serial.getvalue(), parallel.getvalue())
+        lines = serial.getvalue().decode("utf-8").splitlines()
+        self.assertEqual(len(lines), count)
+        expected = next(PayloadGenerator(layout).payloads(1, seed=2, start=count - 1))
+        self.assertEqual(json.loads(lines[-1]), expected)
+
+
+if __name__ == "__main__":
+    unittest.main()
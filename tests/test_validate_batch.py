@@ -0,0 +1,55 @@
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+from aeat_code2txt import load_layout, render_report
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+class ValidateBatchTestCase(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.root = Path(tmp.name)
+        data = json.loads((ROOT / "examples" / "data_303.json").read_text(encoding="utf-8"))
+        self.text = render_report(load_layout("303"), data=data)
+
+    def _run(self, *names: str) -> tuple[int, dict[str, dict]]:
+        result = subprocess.run(
+            [sys.executable, str(ROOT / "scripts" / "validate_batch.py"), "--workers", "1"]
+            + [str(self.root / name) for name in names],
+            capture_output=True,
+            text=True,
+            env={**os.environ, "PYTHONPATH": str(ROOT)},
+        )
+        records = [json.loads(line) for line in result.stdout.splitlines()]
+        return result.returncode, {Path(record["path"]).name: record for record in records}
+
+    def test_good_and_bad_files(self):
+        (self.root / "good.txt").write_bytes(self.text.encode("iso-8859-1"))
+        lines = self.text.split("\r\n")
+        lines[1] = "X" + lines[1][1:]
+        (self.root / "bad.txt").write_bytes("\r\n".join(lines).encode("iso-8859-1"))
+        (self.root / "junk.txt").write_bytes(b"not a return\r\n")
+
+        code, records = self._run("good.txt")
+        self.assertEqual(code, 0)
+        self.assertEqual(records["good.txt"]["model"], "303")
+        self.assertEqual(records["good.txt"]["issues"], [])
+
+        code, records = self._run(".")
+        self.assertEqual(code, 1)
+        self.assertEqual(sorted(records), ["bad.txt", "good.txt", "junk.txt"])
+        self.assertEqual(records["good.txt"]["issues"], [])
+        self.assertTrue(records["bad.txt"]["issues"])
+        self.assertEqual(records["bad.txt"]["issues"][0]["declaration"], 0)
+        self.assertIn("Unknown model", records["junk.txt"]["error"])
+
+
+if __name__ == "__main__":
+    unittest.main()